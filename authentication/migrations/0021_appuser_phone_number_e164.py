@@ -0,0 +1,38 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:49
+
+from django.db import migrations, models
+from phonenumbers import parse, format_number, PhoneNumberFormat, NumberParseException
+
+
+def convert_phone_number_to_e164(phone_number):
+    # a copy of authentication.utilities.convert_phone_number_to_e164 as it was when the column was added
+    try:
+        region = "US"
+        if phone_number.startswith("+52"):
+            region = "MX"
+        return format_number(parse(phone_number, region=region), PhoneNumberFormat.E164)
+    except NumberParseException:
+        return None
+
+
+def fill_phone_number_e164(apps, schema_editor):
+    AppUser = apps.get_model("authentication", "AppUser")
+    app_users = list(AppUser.objects.only("id", "phone_number"))
+    for app_user in app_users:
+        app_user.phone_number_e164 = convert_phone_number_to_e164(app_user.phone_number)
+    AppUser.objects.bulk_update(app_users, ["phone_number_e164"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0020_alter_company_scac"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appuser",
+            name="phone_number_e164",
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+        migrations.RunPython(fill_phone_number_e164, migrations.RunPython.noop),
+    ]
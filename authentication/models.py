@@ -13,6 +13,8 @@ class AppUser(models.Model):
         on_delete=models.CASCADE,
     )
     phone_number = models.CharField(max_length=18, unique=True)  # nullable
+    # phone_number in E.164 format, kept in sync when the app user is saved, empty when it cannot be parsed
+    phone_number_e164 = models.CharField(max_length=16, null=True, blank=True)
     user_type = models.CharField(
         choices=[
             ("carrier", "carrier"),
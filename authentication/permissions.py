@@ -1,5 +1,19 @@
 from rest_framework import permissions
-import authentication.models as models
+from authentication.utilities import get_app_user_with_roles
+
+
+def get_request_app_user(request):
+    """Returns the app user of the request with its roles loaded, resolved once per request.
+
+    All the permission classes below share this lookup, so stacking them on a view costs a single query.
+    """
+    if not request.user or not request.user.is_authenticated:
+        return None
+    return get_app_user_with_roles(request.user.username, request=request)
+
+
+def has_role(app_user, *roles):
+    return app_user is not None and any(hasattr(app_user, role) for role in roles)
 
 
 class IsAppUser(permissions.BasePermission):
@@ -8,7 +22,7 @@ class IsAppUser(permissions.BasePermission):
 
     def has_permission(self, request, view):
 
-        return models.AppUser.objects.filter(user=request.user).exists()
+        return get_request_app_user(request) is not None
 
 
 class IsDispatcher(permissions.BasePermission):
@@ -16,11 +30,7 @@ class IsDispatcher(permissions.BasePermission):
     message = "User is not a dispatcher, fill out all of the profile's necessary information before trying again."
 
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-            return models.Dispatcher.objects.filter(app_user=app_user).exists()
-        except models.AppUser.DoesNotExist:
-            return False
+        return has_role(get_request_app_user(request), "dispatcher")
 
 
 class IsCarrier(permissions.BasePermission):
@@ -28,11 +38,7 @@ class IsCarrier(permissions.BasePermission):
     message = "User is not a carrier, fill out all of the profile's necessary information before trying again."
 
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-            return models.Carrier.objects.filter(app_user=app_user).exists()
-        except models.AppUser.DoesNotExist:
-            return False
+        return has_role(get_request_app_user(request), "carrier")
 
 
 class IsShipmentParty(permissions.BasePermission):
@@ -40,11 +46,7 @@ class IsShipmentParty(permissions.BasePermission):
     message = "User is not a shipment party, fill out all of the profile's necessary information before trying again."
 
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-            return models.ShipmentParty.objects.filter(app_user=app_user).exists()
-        except models.AppUser.DoesNotExist:
-            return False
+        return has_role(get_request_app_user(request), "shipmentparty")
 
 
 class IsShipmentPartyOrDispatcher(permissions.BasePermission):
@@ -52,15 +54,7 @@ class IsShipmentPartyOrDispatcher(permissions.BasePermission):
     message = "User is not a shipment party nor a dispatcher, fill out all of the profile's necessary information before trying again."
 
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-
-            return (
-                models.ShipmentParty.objects.filter(app_user=app_user).exists()
-                or models.Dispatcher.objects.filter(app_user=app_user).exists()
-            )
-        except models.AppUser.DoesNotExist:
-            return False
+        return has_role(get_request_app_user(request), "shipmentparty", "dispatcher")
 
 
 class IsShipmentPartyOrCarrier(permissions.BasePermission):
@@ -68,15 +62,7 @@ class IsShipmentPartyOrCarrier(permissions.BasePermission):
     message = "User is not a shipment party nor a carrier, fill out all of the profile's necessary information before trying again."
 
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-
-            return (
-                models.ShipmentParty.objects.filter(app_user=app_user).exists()
-                or models.Carrier.objects.filter(app_user=app_user).exists()
-            )
-        except models.AppUser.DoesNotExist:
-            return False
+        return has_role(get_request_app_user(request), "shipmentparty", "carrier")
 
 
 class HasRole(permissions.BasePermission):
@@ -84,43 +70,28 @@ class HasRole(permissions.BasePermission):
     message = "This user does not have a specified role; please complete your account and try again later."
 
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-            return (
-                models.ShipmentParty.objects.filter(app_user=app_user).exists()
-                or models.Dispatcher.objects.filter(app_user=app_user).exists()
-                or models.Carrier.objects.filter(app_user=app_user).exists()
-            )
-        except models.AppUser.DoesNotExist:
-            return False
+        return has_role(
+            get_request_app_user(request), "shipmentparty", "dispatcher", "carrier"
+        )
 
 
 class IsCompanyManager(permissions.BasePermission):
     message = "This user is not a company manager, if you believe this is an error, please contact support."
-    
+
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-            return app_user.user_type == "manager"
-        except models.AppUser.DoesNotExist:
-            return False
-        
+        app_user = get_request_app_user(request)
+        return app_user is not None and app_user.user_type == "manager"
+
 class IsNotCompanyManager(permissions.BasePermission):
     message = "This user is a company manager, if you believe this is an error, please contact support."
-    
+
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-            return app_user.user_type != "manager"
-        except models.AppUser.DoesNotExist:
-            return False
+        app_user = get_request_app_user(request)
+        return app_user is not None and app_user.user_type != "manager"
 
 class IsSupport(permissions.BasePermission):
     message = "This user is not a support agent."
-    
+
     def has_permission(self, request, view):
-        try:
-            app_user = models.AppUser.objects.get(user=request.user)
-            return app_user.user_type == "support"
-        except models.AppUser.DoesNotExist:
-            return False
\ No newline at end of file
+        app_user = get_request_app_user(request)
+        return app_user is not None and app_user.user_type == "support"
@@ -1,8 +1,16 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from authentication.models import AppUser
+from authentication.utilities import convert_phone_number_to_e164
 from notifications.models import  NotificationSetting
 
+
+@receiver(pre_save, sender=AppUser)
+def normalize_phone_number(sender, instance, **kwargs):
+    # parsed once here so the sms deliveries read it as is
+    instance.phone_number_e164 = convert_phone_number_to_e164(instance.phone_number)
+
+
 @receiver(post_save, sender=AppUser)
 def create_notification_setting(sender, instance, created, **kwargs):
     if created:
@@ -6,9 +6,35 @@ import random
 import os
 import re
 import requests
+from phonenumbers import parse, format_number, PhoneNumberFormat, NumberParseException
 from rest_framework.response import Response
 import rest_framework.exceptions as exceptions
 
+# every relation needed to resolve a user's roles and billing information
+APP_USER_RELATIONS = [
+    "user",
+    "shipmentparty",
+    "dispatcher",
+    "carrier",
+    "usertax__address",
+    "company__address",
+    "companyemployee__company__address",
+]
+
+
+def convert_phone_number_to_e164(phone_number: str):
+    """Convert phone number to e164 format"""
+    try:
+        region = "US"
+        if phone_number.startswith("+52"):
+            region = "MX"
+        phone_number = parse(phone_number, region=region)
+
+        return format_number(phone_number, PhoneNumberFormat.E164)
+
+    except NumberParseException:
+        return None
+
 
 def create_address(address, city, state, country, zip_code, created_by):
     try:
@@ -28,6 +54,55 @@ def create_address(address, city, state, country, zip_code, created_by):
         raise exceptions.ParseError(detail=f"{e.args[0]}")
 
 
+def get_app_user_with_roles(username, request=None):
+    """Returns the app user with its roles, tax information and company loaded in a single query.
+
+    When a request is given the result is memoized on it, so every later lookup of the same
+    username during that request (helpers, permissions and the view itself) reuses it.
+    """
+    cache = None
+    if request is not None:
+        http_request = getattr(request, "_request", request)
+        cache = http_request.__dict__.setdefault("_resolved_app_users", {})
+        if username in cache:
+            return cache[username]
+
+    try:
+        app_user = models.AppUser.objects.select_related(*APP_USER_RELATIONS).get(
+            user__username=username
+        )
+    except models.AppUser.DoesNotExist:
+        app_user = None
+
+    if cache is not None:
+        cache[username] = app_user
+    return app_user
+
+
+def get_app_users_with_roles(usernames, request):
+    """Resolves several usernames at once into the request memo of get_app_user_with_roles.
+
+    Returns a dict of username to app user, None for the usernames that do not exist.
+    """
+    http_request = getattr(request, "_request", request)
+    cache = http_request.__dict__.setdefault("_resolved_app_users", {})
+    missing = {username for username in usernames if username not in cache}
+    if missing:
+        app_users = models.AppUser.objects.select_related(*APP_USER_RELATIONS).filter(
+            user__username__in=[str(username) for username in missing]
+        )
+        found = {app_user.user.username: app_user for app_user in app_users}
+        for username in missing:
+            cache[username] = found.get(str(username))
+    return {username: cache[username] for username in usernames}
+
+
+def forget_app_user_with_roles(username, request):
+    """Drops the memoized app user of the username so the next lookup reloads its roles."""
+    http_request = getattr(request, "_request", request)
+    http_request.__dict__.get("_resolved_app_users", {}).pop(username, None)
+
+
 def generate_company_identiefier():
     identiefier = "".join(
         random.choice(string.ascii_uppercase + string.digits) for _ in range(10)
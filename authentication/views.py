@@ -664,7 +664,7 @@ class TaxInfoView(APIView):
     )
     def get(self, request, *args, **kwargs):
         app_user = ship_utils.get_app_user_by_username(
-            username=request.user.username)
+            username=request.user.username, request=request)
         res = ship_utils.get_user_tax_or_company(app_user=app_user)
 
         if isinstance(res, models.Company):
@@ -702,7 +702,7 @@ class AddRoleView(APIView):
         },
     )
     def post(self, request, *args, **kwargs):
-        app_user = models.AppUser.objects.get(user=request.user)
+        app_user = permissions.get_request_app_user(request)
         new_type = request.data.get("type", None)
 
         if new_type is None or new_type not in [
@@ -744,6 +744,7 @@ class AddRoleView(APIView):
 
             app_user.user_type = composed_type
             app_user.save()
+            utils.forget_app_user_with_roles(request.user.username, request)
             return Response(
                 status=status.HTTP_201_CREATED,
                 data=serializers.AppUserSerializer(app_user).data,
@@ -818,7 +819,7 @@ class SelectRoleView(APIView):
                 [{"details": "type field is required"}],
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        app_user = models.AppUser.objects.get(user=request.user)
+        app_user = permissions.get_request_app_user(request)
 
         new_type = request.data.get("type")
         if new_type is None or new_type not in app_user.user_type:
@@ -829,6 +830,7 @@ class SelectRoleView(APIView):
 
         app_user.selected_role = new_type
         app_user.save()
+        utils.forget_app_user_with_roles(request.user.username, request)
         return Response(
             status=status.HTTP_200_OK, data=serializers.AppUserSerializer(
                 app_user).data
@@ -0,0 +1,65 @@
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.core import signing
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError, AuthenticationFailed
+from freightmonster.settings.base import REST_AUTH
+
+
+# a ticket ends up in the access logs with the url, so it is only valid long enough to connect
+WEBSOCKET_TICKET_MAX_AGE = 30
+ticket_signer = signing.TimestampSigner(salt="chat.websocket-ticket")
+
+
+def get_websocket_ticket(user):
+    """Returns a ticket authenticating the websockets of the user for WEBSOCKET_TICKET_MAX_AGE seconds"""
+    return ticket_signer.sign(str(user.pk))
+
+
+@database_sync_to_async
+def get_user_from_ticket(ticket):
+    try:
+        user_id = ticket_signer.unsign(ticket, max_age=WEBSOCKET_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return AnonymousUser()
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first() or AnonymousUser()
+
+
+@database_sync_to_async
+def get_user_from_token(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Authenticates websockets with the JWT of the auth cookie, or a `ticket` query parameter.
+
+    The JWT is never read from the url where it would be logged, clients without the cookie
+    get a short lived ticket from notifications/websocket-ticket/ instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        user = AnonymousUser()
+        ticket = parse_qs(scope["query_string"].decode()).get("ticket", [None])[0]
+        if ticket is not None:
+            user = await get_user_from_ticket(ticket)
+        else:
+            for name, value in scope.get("headers", []):
+                if name == b"cookie":
+                    cookie = SimpleCookie(value.decode())
+                    if REST_AUTH["JWT_AUTH_COOKIE"] in cookie:
+                        user = await get_user_from_token(
+                            cookie[REST_AUTH["JWT_AUTH_COOKIE"]].value
+                        )
+
+        scope = dict(scope)
+        scope["user"] = user
+        return await super().__call__(scope, receive, send)
@@ -1 +1,6 @@
-websocket_urlpatterns = []
\ No newline at end of file
+from django.urls import path
+from notifications.consumers import NotificationConsumer
+
+websocket_urlpatterns = [
+    path("ws/notifications/", NotificationConsumer.as_asgi()),
+]
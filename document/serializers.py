@@ -40,7 +40,7 @@ class UploadFileSerializer(serializers.Serializer):
                 )
             else:
                 uploaded_file.name = name
-                utils.upload_to_gcs(uploaded_file)
+                utils.upload_file(uploaded_file)
                 uploaded_by = get_object_or_404(
                     auth_models.AppUser, id=validated_data["uploaded_by"]
                 )
@@ -54,11 +54,20 @@ class UploadFileSerializer(serializers.Serializer):
                 return Response(status=status.HTTP_201_CREATED)
 
 
+class RetrieveFileListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        files = list(data.all() if hasattr(data, "all") else data)
+        # the urls of the page are signed concurrently, the files then read them from the cache
+        utils.generate_signed_urls([file.name for file in files])
+        return super().to_representation(files)
+
+
 class RetrieveFileSerializer(serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
 
     class Meta:
         model = models.UploadedFile
+        list_serializer_class = RetrieveFileListSerializer
         fields = [
             "id",
             "name",
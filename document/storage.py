@@ -0,0 +1,157 @@
+"""Storage of the uploaded files, the backend is picked with STORAGE_BACKEND.
+
+GCSStorage keeps the files in Google Cloud Storage. LocalStorage keeps them under LOCAL_STORAGE_DIR, one
+directory per bucket, and its signed urls point to a route of the app checking an HMAC signature, so the
+document and support flows run and are load tested on one machine, enabled with LOCAL_STORAGE=True.
+Every backend has the same methods, taking the bucket and the name of the object under STORAGE_PREFIX.
+"""
+import os
+import hmac
+import time
+import shutil
+import hashlib
+import threading
+import environ
+from datetime import datetime, timedelta
+from urllib.parse import quote, urlencode
+from django.utils.module_loading import import_string
+from freightmonster.settings.base import (
+    BASE_DIR,
+    STORAGE_BACKEND,
+    STORAGE_PREFIX,
+    LOCAL_STORAGE_DIR,
+    LOCAL_STORAGE_URL,
+)
+
+if os.getenv("ENV") == "DEV":
+    from freightmonster.settings.dev import SECRET_KEY
+elif os.getenv("ENV") == "STAGING":
+    from freightmonster.settings.staging import SECRET_KEY
+else:
+    from freightmonster.settings.local import SECRET_KEY
+
+
+class GCSStorage:
+    """Google Cloud Storage, the client and the signing credentials are built once per process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.client = None
+        self.signing_credentials = None
+
+    def get_client(self):
+        # imported here so the local storage runs without the google libraries
+        from google.cloud import storage
+        from google.oauth2 import service_account
+
+        with self.lock:
+            if self.client is None:
+                if os.getenv("ENV") == "LOCAL":
+                    env = environ.Env()
+                    env.read_env(os.path.join(BASE_DIR, ".local.env"))
+                    service_account_file_path = env("SA_CREDS")
+                    credentials = service_account.Credentials.from_service_account_file(
+                        os.path.join(BASE_DIR, service_account_file_path)
+                    )
+                    self.client = storage.Client(credentials=credentials)
+                else:
+                    self.client = storage.Client()
+        return self.client
+
+    def get_signing_creds(self):
+        """Service account keys sign locally, the credentials of the compute engine sign through the IAM API"""
+        from google.auth import compute_engine
+        from google.auth.credentials import Signing
+        from google.auth.transport import requests
+
+        credentials = self.get_client()._credentials
+        with self.lock:
+            if self.signing_credentials is None:
+                if isinstance(credentials, Signing):
+                    self.signing_credentials = credentials
+                else:
+                    auth_request = requests.Request()
+                    self.signing_credentials = compute_engine.IDTokenCredentials(
+                        auth_request, "", service_account_email=credentials.service_account_email
+                    )
+        return self.signing_credentials
+
+    def get_blob(self, bucket_name, name):
+        return self.get_client().bucket(bucket_name).blob(STORAGE_PREFIX + name)
+
+    def upload(self, bucket_name, name, uploaded_file, content_type=None):
+        self.get_blob(bucket_name, name).upload_from_file(uploaded_file, content_type=content_type)
+
+    def open(self, bucket_name, name):
+        """Returns a file object streaming the object in chunks"""
+        return self.get_blob(bucket_name, name).open("rb")
+
+    def signed_url(self, bucket_name, name, expiration):
+        # signed without asking the bucket whether the object exists, a missing object answers 404 to the url
+        return self.get_blob(bucket_name, name).generate_signed_url(
+            version="v4",
+            expiration=datetime.utcnow() + timedelta(seconds=expiration),
+            method="GET",
+            credentials=self.get_signing_creds(),
+        )
+
+    def delete(self, bucket_name, name):
+        self.get_blob(bucket_name, name).delete()
+
+
+class LocalStorage:
+    """Files on the local disk, served by the app through time limited urls signed with the secret key"""
+
+    def get_path(self, bucket_name, name):
+        root = os.path.realpath(LOCAL_STORAGE_DIR)
+        bucket_dir = os.path.realpath(os.path.join(root, bucket_name))
+        path = os.path.realpath(os.path.join(bucket_dir, STORAGE_PREFIX + name))
+        # names like ../../etc/passwd stay out of the bucket
+        if os.path.dirname(bucket_dir) != root or os.path.commonpath([bucket_dir, path]) != bucket_dir:
+            raise FileNotFoundError(name)
+        return path
+
+    def upload(self, bucket_name, name, uploaded_file, content_type=None):
+        path = self.get_path(bucket_name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as stored_file:
+            shutil.copyfileobj(uploaded_file, stored_file)
+
+    def open(self, bucket_name, name):
+        return open(self.get_path(bucket_name, name), "rb")
+
+    def signed_url(self, bucket_name, name, expiration):
+        expires = int(time.time()) + expiration
+        query = urlencode({"expires": expires, "signature": sign(bucket_name, name, expires)})
+        return f"{LOCAL_STORAGE_URL}/docs/local-files/{quote(bucket_name)}/{quote(name)}?{query}"
+
+    def delete(self, bucket_name, name):
+        os.remove(self.get_path(bucket_name, name))
+
+
+def sign(bucket_name, name, expires):
+    message = f"{bucket_name}/{name}:{expires}".encode()
+    return hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def is_signature_valid(bucket_name, name, expires, signature):
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    return expires >= time.time() and hmac.compare_digest(
+        sign(bucket_name, name, expires), signature or ""
+    )
+
+
+backend = None
+backend_lock = threading.Lock()
+
+
+def get_storage():
+    """Returns the storage backend of the process, created on first use"""
+    global backend
+    with backend_lock:
+        if backend is None:
+            backend = import_string(STORAGE_BACKEND)()
+    return backend
@@ -5,4 +5,5 @@ urlpatterns = [
     path("file/", views.FileUploadView.as_view()),
     path("billing/", views.BillingDocumentsView.as_view()),
     path("validate-rc/", views.ValidateFinalAgreementView.as_view()),
+    path("local-files/<bucket_name>/<path:name>", views.LocalFileView.as_view()),
 ]
\ No newline at end of file
@@ -1,16 +1,12 @@
 # python imports
 import os
-import environ
-from datetime import datetime, timedelta
-
-# third party imports
-from google.cloud import storage
-from google.auth import compute_engine
-from google.oauth2 import service_account
-from google.auth.transport import requests
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # module imports
-from freightmonster.settings.base import BASE_DIR
+from document.storage import get_storage
+from freightmonster.settings.base import SIGNED_URL_EXPIRATION
 
 if os.getenv("ENV") == "DEV":
     from freightmonster.settings.dev import GS_BUCKET_NAME
@@ -19,63 +15,61 @@ elif os.getenv("ENV") == "STAGING":
 else:
     from freightmonster.settings.local import GS_BUCKET_NAME
 
+# a cached url is served while it has at least 10 minutes left
+SIGNED_URL_CACHE_TTL = SIGNED_URL_EXPIRATION - 600
+SIGNED_URL_CACHE_SIZE = 10000
+SIGNED_URL_WORKERS = 8
 
-def generate_signed_url(object_name, bucket_name=GS_BUCKET_NAME, expiration=3600):
-    """Generates a signed URL for downloading an object from a bucket."""
-    try:
-        storage_client = get_storage_client()
-        print(bucket_name)
-        bucket = storage_client.get_bucket(bucket_name)
-        blob = bucket.blob("pdfs/" + object_name)
-        if not blob.exists():
-            raise NameError
-
-        signing_creds = get_signing_creds(storage_client._credentials)
-        url = blob.generate_signed_url(
-            version="v4",
-            expiration=datetime.utcnow() + timedelta(seconds=expiration),
-            method="GET",
-            credentials=signing_creds,
-        )
+lock = threading.Lock()
+# (bucket name, object name) => (url, time until which it is served)
+signed_urls = {}
+signing_pool = ThreadPoolExecutor(max_workers=SIGNED_URL_WORKERS, thread_name_prefix="sign-url")
 
-        return url
 
-    except NameError:
-        print(f"Error: Object {object_name} not found in bucket {bucket_name}")
-        return None
+def generate_signed_url(object_name, bucket_name=GS_BUCKET_NAME, expiration=SIGNED_URL_EXPIRATION):
+    """Generates a signed URL for downloading an object from a bucket, or returns the cached one."""
+    key = (bucket_name, object_name)
+    cached = signed_urls.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
 
+    try:
+        url = get_storage().signed_url(bucket_name, object_name, expiration)
     except (BaseException) as e:
         print(f"Unexpected {e=}, {type(e)=}")
         return None
 
+    with lock:
+        if len(signed_urls) >= SIGNED_URL_CACHE_SIZE:
+            # the dict keeps the insertion order, the oldest urls are dropped first
+            for old_key in list(signed_urls)[: SIGNED_URL_CACHE_SIZE // 10]:
+                del signed_urls[old_key]
+        signed_urls[key] = (url, time.monotonic() + min(SIGNED_URL_CACHE_TTL, expiration - 60))
+    return url
 
-def upload_to_gcs(uploaded_file, bucket_name=GS_BUCKET_NAME):
-    """Uploads a file to the bucket."""
-    storage_client = get_storage_client()
-    bucket = storage_client.get_bucket(bucket_name)
-    blob = bucket.blob("pdfs/" + uploaded_file.name)
-    blob.upload_from_file(uploaded_file, content_type=uploaded_file.content_type)
 
+def generate_signed_urls(object_names, bucket_name=GS_BUCKET_NAME):
+    """Generates the signed URLs of several objects, the ones missing from the cache are signed concurrently.
 
-def get_storage_client():
-    if os.getenv("ENV") == "LOCAL":
-        env = environ.Env()
-        env.read_env(os.path.join(BASE_DIR, ".local.env"))
-        service_account_file_path = env("SA_CREDS")
-        credentials = service_account.Credentials.from_service_account_file(
-            os.path.join(BASE_DIR, service_account_file_path)
-        )
-        storage_client = storage.Client(credentials=credentials)
-        return storage_client
-    else:
-        storage_client = storage.Client()
-        return storage_client
+    Returns a dict of object name to url, None for the urls that could not be signed.
+    """
+    object_names = list(dict.fromkeys(object_names))
+    urls = signing_pool.map(
+        lambda object_name: generate_signed_url(object_name, bucket_name=bucket_name),
+        object_names,
+    )
+    return dict(zip(object_names, urls))
 
 
-def get_signing_creds(credentials):
-    """Returns a signing credentials object."""
-    auth_request = requests.Request()
-    signing_credentials = compute_engine.IDTokenCredentials(
-        auth_request, "", service_account_email=credentials.service_account_email
+def upload_file(uploaded_file, bucket_name=GS_BUCKET_NAME):
+    """Uploads a file to the bucket under its name."""
+    get_storage().upload(
+        bucket_name, uploaded_file.name, uploaded_file, content_type=uploaded_file.content_type
     )
-    return signing_credentials
+
+
+def delete_file(object_name, bucket_name=GS_BUCKET_NAME):
+    """Deletes a file from the bucket, its cached signed URL is forgotten."""
+    get_storage().delete(bucket_name, object_name)
+    with lock:
+        signed_urls.pop((bucket_name, object_name), None)
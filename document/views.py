@@ -1,5 +1,6 @@
 # python imports
 import uuid
+import mimetypes
 
 # DRF imports
 from rest_framework import status
@@ -8,16 +9,18 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.mixins import ListModelMixin
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 
 # Django import
 from django.db.models import Q
+from django.http import FileResponse, Http404
 from django.utils import timezone
 from django.db.models.query import QuerySet
 from django.shortcuts import get_object_or_404
 
 # module imports
 import document.models as models
+import document.storage as storage
 import shipment.models as ship_models
 import shipment.utilities as ship_utils
 import document.serializers as serializers
@@ -62,13 +65,13 @@ class FileUploadView(GenericAPIView, ListModelMixin):
         load_id = request.query_params.get("load")
         if load_id:
             load = get_object_or_404(ship_models.Load, id=load_id)
-            app_user = ship_utils.get_app_user_by_username(request.user.username)
+            app_user = ship_utils.get_app_user_by_username(
+                request.user.username, request=request
+            )
 
-            shipment = get_object_or_404(ship_models.Shipment, id=load.shipment.id)
-            shipment_admins = ship_models.ShipmentAdmin.objects.filter(shipment=shipment.id).values_list("admin", flat=True)
+            shipment_admins = ship_models.ShipmentAdmin.objects.filter(shipment=load.shipment_id).values_list("admin", flat=True)
 
-            filters = Q(created_by=app_user.id)
-            filters = ship_utils.apply_load_access_filters_for_user(filters, app_user)
+            filters = ship_utils.get_load_access_filter(app_user)
             filters &= Q(id=load_id)
             queryset = ship_models.Load.objects.filter(filters)
 
@@ -153,7 +156,9 @@ class BillingDocumentsView(APIView):
             try:
                 load = ship_models.Load.objects.get(id=load_id)
                 final_agreement = models.FinalAgreement.objects.get(load_id=load_id)
-                app_user = ship_utils.get_app_user_by_username(request.user.username)
+                app_user = ship_utils.get_app_user_by_username(
+                    request.user.username, request=request
+                )
 
                 if app_user.selected_role == "dispatcher":
                     return self._handle_dispatcher(request, load, final_agreement)
@@ -181,9 +186,11 @@ class BillingDocumentsView(APIView):
                 )
 
     def _handle_dispatcher(self, request, load, final_agreement):
-        user = ship_utils.get_dispatcher_by_username(request.user.username)
+        user = ship_utils.get_dispatcher_by_username(
+            request.user.username, request=request
+        )
 
-        if user != load.dispatcher:
+        if user.id != load.dispatcher_id:
             return Response(
                 [{"details": NOT_AUTH_MSG}],
                 status=status.HTTP_403_FORBIDDEN,
@@ -194,9 +201,11 @@ class BillingDocumentsView(APIView):
         )
 
     def _handle_carrier(self, request, load, final_agreement):
-        user = ship_utils.get_carrier_by_username(request.user.username)
+        user = ship_utils.get_carrier_by_username(
+            request.user.username, request=request
+        )
 
-        if user != load.carrier:
+        if user.id != load.carrier_id:
             return Response(
                 [{"details": NOT_AUTH_MSG}],
                 status=status.HTTP_403_FORBIDDEN,
@@ -207,14 +216,16 @@ class BillingDocumentsView(APIView):
         )
 
     def _handle_shipment_party(self, request, load, final_agreement):
-        user = ship_utils.get_shipment_party_by_username(request.user.username)
+        user = ship_utils.get_shipment_party_by_username(
+            request.user.username, request=request
+        )
 
-        if user != load.customer and user != load.shipper and user != load.consignee:
+        if user.id not in (load.customer_id, load.shipper_id, load.consignee_id):
             return Response(
                 [{"details": NOT_AUTH_MSG}],
                 status=status.HTTP_403_FORBIDDEN,
             )
-        elif user == load.customer:
+        elif user.id == load.customer_id:
             return Response(
                 status=status.HTTP_200_OK,
                 data=serializers.CustomerFinalAgreementSerializer(final_agreement).data,
@@ -270,12 +281,16 @@ class ValidateFinalAgreementView(APIView):
         load_id = request.query_params.get("load")
         load = get_object_or_404(ship_models.Load, id=load_id)
         final_agreement = get_object_or_404(models.FinalAgreement, load_id=load_id)
-        app_user = ship_utils.get_app_user_by_username(request.user.username)
+        app_user = ship_utils.get_app_user_by_username(
+            request.user.username, request=request
+        )
         data = {}
 
         if app_user.selected_role == "dispatcher":
-            dispatcher = ship_utils.get_dispatcher_by_username(request.user.username)
-            if dispatcher != load.dispatcher:
+            dispatcher = ship_utils.get_dispatcher_by_username(
+                request.user.username, request=request
+            )
+            if dispatcher.id != load.dispatcher_id:
                 return Response(
                     [{"details": NOT_AUTH_MSG}],
                     status=status.HTTP_403_FORBIDDEN,
@@ -284,8 +299,10 @@ class ValidateFinalAgreementView(APIView):
             data["did_carrier_agree"] = final_agreement.did_carrier_agree
 
         elif app_user.selected_role == "carrier":
-            carrier = ship_utils.get_carrier_by_username(request.user.username)
-            if carrier != load.carrier:
+            carrier = ship_utils.get_carrier_by_username(
+                request.user.username, request=request
+            )
+            if carrier.id != load.carrier_id:
                 return Response(
                     [{"details": NOT_AUTH_MSG}],
                     status=status.HTTP_403_FORBIDDEN,
@@ -293,8 +310,10 @@ class ValidateFinalAgreementView(APIView):
             data["did_carrier_agree"] = final_agreement.did_carrier_agree
 
         elif app_user.selected_role == SHIPMENT_PARTY:
-            customer = ship_utils.get_shipment_party_by_username(request.user.username)
-            if customer != load.customer:
+            customer = ship_utils.get_shipment_party_by_username(
+                request.user.username, request=request
+            )
+            if customer.id != load.customer_id:
                 return Response(
                     [{"details": NOT_AUTH_MSG}],
                     status=status.HTTP_403_FORBIDDEN,
@@ -337,7 +356,9 @@ class ValidateFinalAgreementView(APIView):
         load = request.data["load"]
         load = get_object_or_404(ship_models.Load, id=load)
         final_agreement = get_object_or_404(models.FinalAgreement, load_id=load.id)
-        app_user = ship_utils.get_app_user_by_username(request.user.username)
+        app_user = ship_utils.get_app_user_by_username(
+            request.user.username, request=request
+        )
 
         try:
             if app_user.selected_role == SHIPMENT_PARTY:
@@ -365,9 +386,9 @@ class ValidateFinalAgreementView(APIView):
 
     def _handle_customer_acceptance(self, request, load: ship_models.Load, final_agreement: models.FinalAgreement):
         customer = ship_utils.get_shipment_party_by_username(
-                    request.user.username
+            request.user.username, request=request
         )
-        if customer != load.customer:
+        if customer.id != load.customer_id:
             raise exceptions.PermissionDenied(
                 NOT_AUTH_MSG
             )
@@ -382,7 +403,7 @@ class ValidateFinalAgreementView(APIView):
         data = serializers.CustomerFinalAgreementSerializer(
             final_agreement
         ).data
-        if load.dispatcher.app_user != customer.app_user:
+        if load.dispatcher.app_user_id != customer.app_user_id:
             handle_notification(
                 app_user=load.dispatcher.app_user,
                 load=load,
@@ -393,8 +414,10 @@ class ValidateFinalAgreementView(APIView):
         return data    
 
     def _handle_carrier_acceptance(self, request, load: ship_models.Load, final_agreement: models.FinalAgreement):
-        carrier = ship_utils.get_carrier_by_username(request.user.username)
-        if carrier != load.carrier:
+        carrier = ship_utils.get_carrier_by_username(
+            request.user.username, request=request
+        )
+        if carrier.id != load.carrier_id:
             raise exceptions.PermissionDenied(
                 NOT_AUTH_MSG
             )
@@ -408,7 +431,7 @@ class ValidateFinalAgreementView(APIView):
         final_agreement.carrier_uuid = uuid.uuid4()
         final_agreement.save()
         data = serializers.CarrierFinalAgreementSerializer(final_agreement).data
-        if load.dispatcher.app_user != carrier.app_user:
+        if load.dispatcher.app_user_id != carrier.app_user_id:
             handle_notification(
                 app_user=load.dispatcher.app_user,
                 load=load,
@@ -416,4 +439,28 @@ class ValidateFinalAgreementView(APIView):
                 sender=carrier.app_user,
             )
         
-        return data
\ No newline at end of file
+        return data
+
+
+class LocalFileView(APIView):
+    """Serves the files of the local storage to the holders of a signed url, like the signed urls of GCS."""
+
+    # the signature is the authorization, and load tests are not throttled
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    @extend_schema(exclude=True)
+    def get(self, request, bucket_name, name, *args, **kwargs):
+        if not isinstance(storage.get_storage(), storage.LocalStorage):
+            raise Http404
+        if not storage.is_signature_valid(
+            bucket_name, name, request.query_params.get("expires"), request.query_params.get("signature")
+        ):
+            raise exceptions.PermissionDenied("The url is invalid or expired.")
+        try:
+            stored_file = storage.get_storage().open(bucket_name, name)
+        except FileNotFoundError:
+            raise Http404
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return FileResponse(stored_file, content_type=content_type)
@@ -1,13 +1,18 @@
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from chat import routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'freightmonster.settings')
 
+# the apps must be loaded before the consumers import their models
+django_asgi_app = get_asgi_application()
+
+from chat import routing
+from chat.middleware import JWTAuthMiddleware
+
 application = ProtocolTypeRouter({
-  "http": get_asgi_application(),
-  "websocket": (
+  "http": django_asgi_app,
+  "websocket": JWTAuthMiddleware(
         URLRouter(
             routing.websocket_urlpatterns
         )
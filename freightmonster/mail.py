@@ -0,0 +1,74 @@
+import time
+import smtplib
+import threading
+from functools import lru_cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from freightmonster.settings.base import EMAIL_CONNECTION_MAX_IDLE
+
+FROM_EMAIL = "notifications@freightslayer.com"
+
+local = threading.local()
+
+
+@lru_cache(maxsize=None)
+def get_email_template(template):
+    """Returns the compiled template, it is parsed once per process"""
+    return get_template(template)
+
+
+def build_email(subject, template, to, context):
+    """Renders an html email from the notifications address"""
+    html_content = get_email_template(template).render(context)
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=html_content,
+        from_email=FROM_EMAIL,
+        to=[to],
+        reply_to=[FROM_EMAIL],
+    )
+    message.attach_alternative(html_content, "text/html")
+    message.content_subtype = "html"
+    message.mixed_subtype = "related"
+    return message
+
+
+def get_mail_connection():
+    """Returns the mail connection of the current thread, it stays open between batches unless it was idle for too long."""
+    connection = getattr(local, "connection", None)
+    if connection is None:
+        connection = local.connection = get_connection()
+        local.used_at = time.monotonic()
+    if time.monotonic() - local.used_at > EMAIL_CONNECTION_MAX_IDLE:
+        # servers drop idle sessions, start a new one rather than failing on the first message
+        connection.close()
+    return connection
+
+
+def send_emails(messages):
+    """Sends the messages over the connection of the current thread, a single SMTP session serves the whole batch.
+
+    Returns the error of every message, None for the ones that were sent.
+    """
+    connection = get_mail_connection()
+    errors = [send_email_over(connection, message) for message in messages]
+    local.used_at = time.monotonic()
+    return errors
+
+
+def send_email_over(connection, message):
+    error = None
+    for _ in range(2):
+        try:
+            # an opened connection is kept open by send_messages instead of being closed after the message
+            connection.open()
+            if connection.send_messages([message]):
+                return None
+            return RuntimeError("The email has no recipients.")
+        except smtplib.SMTPServerDisconnected as e:
+            # the server ended the session, reconnect once
+            connection.close()
+            error = e
+        except Exception as e:
+            return e
+    return error
@@ -0,0 +1,71 @@
+from django.db.models import QuerySet
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+
+MAX_PAGE_SIZE = 100
+
+
+class LimitedPageNumberPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination over the newest rows first, deep pages cost the same as the first one."""
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+
+
+class ListPagination(BasePagination):
+    """Page number pagination, or cursor pagination when `?pagination=cursor` or a `cursor` is sent.
+
+    Page number mode stays the default for backwards compatibility, it counts every row and
+    its pages get slower the deeper they are, so large lists should be walked with cursors.
+    """
+
+    def __init__(self):
+        self.paginator = LimitedPageNumberPagination()
+
+    def _use_cursor(self, request):
+        query_params = request.query_params
+        return (
+            query_params.get("pagination", None) == "cursor"
+            or IdCursorPagination.cursor_query_param in query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # cursors are built from the ordering of a queryset, a plain list keeps page numbers
+        if self._use_cursor(request) and isinstance(queryset, QuerySet):
+            self.paginator = IdCursorPagination()
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = LimitedPageNumberPagination().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                "name": "pagination",
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` to paginate with cursors instead of page numbers.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            {
+                "name": IdCursorPagination.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": IdCursorPagination.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+        ]
+        return parameters
@@ -0,0 +1,110 @@
+"""Moves the rows past their retention window to archive tables, and deletes the archived rows past theirs.
+
+The rows are handled in chunks, each chunk in a short transaction of its own, so the hot tables are never
+locked for long and an interrupted run is resumed by the next one.
+"""
+import time
+from datetime import timedelta
+from django.apps import apps
+from django.db import transaction
+from django.utils.module_loading import import_string
+from django.utils import timezone
+from freightmonster.settings.base import RETENTION_WINDOWS, RETENTION_CHUNK_SIZE
+
+# model => archive model, field dating its rows, and function called with the values of the archived rows
+# after their commit
+RETENTION_MODELS = {
+    "notifications.Notification": (
+        "notifications.ArchivedNotification",
+        "created_at",
+        "notifications.counters.uncount_archived_notifications",
+    ),
+    "logs.Log": ("logs.ArchivedLog", "timestamp", None),
+}
+
+
+def archive_rows(
+    queryset, archive_model, date_field, chunk_size=RETENTION_CHUNK_SIZE, pause=0, on_archived=None
+):
+    """Moves the rows of the queryset to the archive model, oldest first, returns the number of moved rows
+
+    The archive model has the fields of the model, with the same names, and keeps their ids. `on_archived`
+    is called with the values of each chunk's rows once the chunk is committed.
+    """
+    model_fields = {field.attname for field in queryset.model._meta.concrete_fields}
+    fields = [
+        field.attname
+        for field in archive_model._meta.concrete_fields
+        if field.attname in model_fields
+    ]
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.order_by(date_field, "id").select_for_update().values(*fields)[:chunk_size]
+            )
+            if not rows:
+                break
+            # a chunk archived by an interrupted run is not archived twice
+            archive_model.objects.bulk_create(
+                [archive_model(**row) for row in rows], ignore_conflicts=True
+            )
+            queryset.model.objects.filter(id__in=[row["id"] for row in rows]).delete()
+            if on_archived is not None:
+                # not called for a chunk rolled back, its rows are still in the table
+                transaction.on_commit(lambda rows=rows: on_archived(rows))
+        moved += len(rows)
+        if len(rows) < chunk_size:
+            break
+        time.sleep(pause)
+    return moved
+
+
+def delete_rows(queryset, date_field, chunk_size=RETENTION_CHUNK_SIZE, pause=0):
+    """Deletes the rows of the queryset, oldest first, returns the number of deleted rows"""
+    deleted = 0
+    while True:
+        ids = list(
+            queryset.order_by(date_field, "id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        queryset.model.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+        if len(ids) < chunk_size:
+            break
+        time.sleep(pause)
+    return deleted
+
+
+def apply_retention(label, chunk_size=RETENTION_CHUNK_SIZE, pause=0, dry_run=False):
+    """Archives and deletes the rows of a model past the windows of RETENTION_WINDOWS, returns their numbers"""
+    archive_label, date_field, on_archived = RETENTION_MODELS[label]
+    model = apps.get_model(label)
+    archive_model = apps.get_model(archive_label)
+    windows = RETENTION_WINDOWS.get(label, {})
+    now = timezone.now()
+
+    to_archive = model.objects.none()
+    if windows.get("archive_after") is not None:
+        to_archive = model.objects.filter(
+            **{f"{date_field}__lt": now - timedelta(days=windows["archive_after"])}
+        )
+    to_delete = archive_model.objects.none()
+    if windows.get("delete_after") is not None:
+        to_delete = archive_model.objects.filter(
+            **{f"{date_field}__lt": now - timedelta(days=windows["delete_after"])}
+        )
+    if dry_run:
+        return to_archive.count(), to_delete.count()
+
+    archived = archive_rows(
+        to_archive,
+        archive_model,
+        date_field,
+        chunk_size=chunk_size,
+        pause=pause,
+        on_archived=import_string(on_archived) if on_archived else None,
+    )
+    deleted = delete_rows(to_delete, date_field, chunk_size=chunk_size, pause=pause)
+    return archived, deleted
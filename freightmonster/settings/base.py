@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -10,6 +11,7 @@ EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_USE_TLS = True
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
+EMAIL_CONNECTION_MAX_IDLE = 60  # seconds an SMTP session is reused for, see freightmonster/mail.py
 
 # Application definition
 INSTALLED_APPS = [
@@ -112,7 +114,7 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "freightmonster.pagination.ListPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -209,3 +211,59 @@ DEFENDER_LOCK_OUT_BY_IP_AND_USERNAME = True
 # Twilio settings
 TWILIO_ACCOUNT_SID = "AC5b70bf9a9a982fe3f4c1cea70f86f757"
 TWILIO_PHONE_NUMBER = "+18445071806"
+TWILIO_MESSAGING_SERVICE_SID = "MGfeb0e973e4fc789955bfa78fddbd7fa7"
+# class sending the sms, see notifications/sms.py
+SMS_TRANSPORT = "notifications.sms.TwilioTransport"
+
+# Notification deliveries, sent from the outbox by `python manage.py deliver_notifications`
+NOTIFICATION_DELIVERY_WORKERS = {"email": 4, "sms": 2}
+NOTIFICATION_DELIVERY_BATCH_SIZE = {"email": 50, "sms": 20}  # deliveries a worker sends per batch
+NOTIFICATION_DELIVERY_MAX_ATTEMPTS = 6
+NOTIFICATION_DELIVERY_BACKOFF = 30  # seconds, doubled after every failed attempt
+NOTIFICATION_DELIVERY_CLAIM_TIMEOUT = 300  # seconds before a delivery claimed by a dead worker is retried
+
+NOTIFICATION_SETTINGS_CACHE_TIMEOUT = 3600  # seconds, the cached settings are forgotten when they are saved
+# Redis holding the unread notification counters, see notifications/counters.py, without it they are counted
+# from the database. Set by the environment settings
+NOTIFICATION_COUNTERS_REDIS_URL = None
+
+# Retention applied by `python manage.py apply_retention`: days before a row is moved to its archive table and
+# days before an archived row is deleted, None keeps the rows
+RETENTION_WINDOWS = {
+    "notifications.Notification": {"archive_after": 90, "delete_after": 365},
+    "logs.Log": {"archive_after": 180, "delete_after": 730},
+}
+RETENTION_CHUNK_SIZE = 1000  # rows moved or deleted per transaction
+
+# Storage of the uploaded files, see document/storage.py, the buckets are set by the environment settings
+STORAGE_BACKEND = "document.storage.GCSStorage"
+STORAGE_PREFIX = "pdfs/"
+SIGNED_URL_EXPIRATION = 3600  # seconds
+# Local disk storage, its signed urls are served by the app itself
+LOCAL_STORAGE = os.getenv("LOCAL_STORAGE") == "True"
+LOCAL_STORAGE_DIR = os.getenv(
+    "LOCAL_STORAGE_DIR", os.path.join(tempfile.gettempdir(), "freightmonster_storage")
+)
+LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "http://localhost:8000")
+if LOCAL_STORAGE:
+    STORAGE_BACKEND = "document.storage.LocalStorage"
+
+# Log entries are buffered by every process and written together, see logs/utilities.py
+LOG_BUFFER_SIZE = 100
+LOG_FLUSH_INTERVAL = 2  # seconds
+# entries kept while the database can not be reached, the oldest ones are dropped past it
+LOG_BUFFER_MAX_SIZE = 10000
+
+# Local stand-ins of the SMTP server and of Twilio, they write the deliveries to files instead of sending them
+NOTIFICATION_STAND_INS = os.getenv("NOTIFICATION_STAND_INS") == "True"
+NOTIFICATION_STAND_INS_DIR = os.getenv(
+    "NOTIFICATION_STAND_INS_DIR", os.path.join(tempfile.gettempdir(), "freightmonster_stand_ins")
+)
+# share of the deliveries the stand-ins fail on purpose, to exercise the retries
+NOTIFICATION_STAND_INS_FAILURE_RATE = float(os.getenv("NOTIFICATION_STAND_INS_FAILURE_RATE", "0"))
+# seconds every stand-in delivery takes, like the round trip to a real provider
+NOTIFICATION_STAND_INS_LATENCY = float(os.getenv("NOTIFICATION_STAND_INS_LATENCY", "0"))
+if NOTIFICATION_STAND_INS:
+    EMAIL_BACKEND = "notifications.stand_ins.StandInEmailBackend"
+    EMAIL_FILE_PATH = os.path.join(NOTIFICATION_STAND_INS_DIR, "emails")
+    SMS_TRANSPORT = "notifications.stand_ins.StandInSMSTransport"
@@ -98,6 +98,16 @@ CHANNEL_LAYERS = {
 
 DEFENDER_REDIS_URL = f"redis://{MEMORYSTOREIP}:6379/0"
 
+NOTIFICATION_COUNTERS_REDIS_URL = f"redis://{MEMORYSTOREIP}:6379/1"
+
+# shared by the processes, so a cached notification setting is forgotten by all of them when it changes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{MEMORYSTOREIP}:6379/2",
+    }
+}
+
 GS_BUCKET_NAME = "dev_freight_uploaded_files"
 GS_COMPANY_MANAGER_BUCKET_NAME = "dev_freight_company_manager_files"
 
@@ -0,0 +1,3 @@
+import os
+
+NOTIFICATION_COUNTERS_REDIS_URL = os.getenv("NOTIFICATION_COUNTERS_REDIS_URL")
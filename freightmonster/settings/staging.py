@@ -120,6 +120,16 @@ CHANNEL_LAYERS = {
 
 DEFENDER_REDIS_URL = f"redis://{MEMORYSTOREIP}:6379/0"
 
+NOTIFICATION_COUNTERS_REDIS_URL = f"redis://{MEMORYSTOREIP}:6379/1"
+
+# shared by the processes, so a cached notification setting is forgotten by all of them when it changes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{MEMORYSTOREIP}:6379/2",
+    }
+}
+
 TWILIO_AUTH_TOKEN = client.access_secret_version(
     request={
         "name": f"projects/{os.getenv('PROJ_ID')}/secrets/{os.getenv('TWILIO_AUTH_TOKEN')}/versions/latest"
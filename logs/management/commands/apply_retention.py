@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+import freightmonster.retention as retention
+from freightmonster.settings.base import RETENTION_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the notifications and logs past their retention window to their archive tables, and deletes the "
+        "archived rows past theirs, see RETENTION_WINDOWS. Meant to run daily, the rows are handled in small "
+        "transactions so it can run next to the traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help=f"Models to apply the retention to, among {', '.join(retention.RETENTION_MODELS)}. All of them by default.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=RETENTION_CHUNK_SIZE,
+            help="Rows moved or deleted per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between two chunks, to leave room to the traffic.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the rows that would be archived and deleted without touching them.",
+        )
+
+    def handle(self, *args, **options):
+        labels = options["models"] or list(retention.RETENTION_MODELS)
+        unknown = [label for label in labels if label not in retention.RETENTION_MODELS]
+        if unknown:
+            raise CommandError(f"No retention is defined for {', '.join(unknown)}.")
+        if options["chunk_size"] < 1:
+            raise CommandError("The chunk size must be positive.")
+
+        for label in labels:
+            archived, deleted = retention.apply_retention(
+                label,
+                chunk_size=options["chunk_size"],
+                pause=options["pause"],
+                dry_run=options["dry_run"],
+            )
+            if options["dry_run"]:
+                message = f"{label}: would archive {archived} rows and delete {deleted} archived rows."
+            else:
+                message = f"{label}: archived {archived} rows and deleted {deleted} archived rows."
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the index is built without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("logs", "0002_alter_log_details"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="log",
+            index=models.Index(
+                fields=["app_user", "-timestamp"], name="log_app_user_timestamp_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0021_appuser_phone_number_e164"),
+        ("logs", "0003_log_log_app_user_timestamp_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedLog",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("action", models.CharField(max_length=100)),
+                ("model", models.CharField(max_length=100)),
+                ("details", models.JSONField()),
+                ("timestamp", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="archivedlog",
+            name="app_user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="authentication.appuser",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedlog",
+            index=models.Index(fields=["archived_at"], name="archived_log_at_idx"),
+        ),
+    ]
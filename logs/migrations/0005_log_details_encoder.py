@@ -0,0 +1,27 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:01
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("logs", "0004_archivedlog"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivedlog",
+            name="details",
+            field=models.JSONField(
+                encoder=django.core.serializers.json.DjangoJSONEncoder
+            ),
+        ),
+        migrations.AlterField(
+            model_name="log",
+            name="details",
+            field=models.JSONField(
+                encoder=django.core.serializers.json.DjangoJSONEncoder
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0021_appuser_phone_number_e164"),
+        ("logs", "0005_log_details_encoder"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedlog",
+            name="company",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="authentication.company",
+            ),
+        ),
+        migrations.AddField(
+            model_name="log",
+            name="company",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="authentication.company",
+            ),
+        ),
+    ]
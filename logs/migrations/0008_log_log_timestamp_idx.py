@@ -0,0 +1,20 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:29
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the index is built without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("logs", "0007_archivedlog_archived_log_timestamp_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="log",
+            index=models.Index(fields=["timestamp"], name="log_timestamp_idx"),
+        ),
+    ]
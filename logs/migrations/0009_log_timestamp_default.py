@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:29
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("logs", "0008_log_log_timestamp_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="log",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
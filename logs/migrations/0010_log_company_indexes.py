@@ -0,0 +1,44 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:48
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+GIN_INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=["details"], name="log_details_gin_idx"
+)
+
+
+def add_gin_index(apps, schema_editor):
+    # GIN indexes only exist on postgres, the other databases go without it
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS log_details_gin_idx ON logs_log USING gin (details)"
+        )
+
+
+def remove_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS log_details_gin_idx")
+
+
+class Migration(migrations.Migration):
+    # the indexes are built without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("logs", "0009_log_timestamp_default"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="log",
+            index=models.Index(
+                fields=["company", "-timestamp"], name="log_company_timestamp_idx"
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(add_gin_index, remove_gin_index)],
+            state_operations=[migrations.AddIndex(model_name="log", index=GIN_INDEX)],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:48
+
+from django.db import migrations, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def set_log_companies(apps, schema_editor):
+    Log = apps.get_model("logs", "Log")
+    CompanyEmployee = apps.get_model("authentication", "CompanyEmployee")
+    company = Subquery(
+        CompanyEmployee.objects.filter(app_user=OuterRef("app_user")).values("company")[:1]
+    )
+    last_id = Log.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    # every range of ids is committed on its own, so the table is never locked for the whole backfill
+    for start in range(0, last_id, BACKFILL_BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Log.objects.filter(
+                id__gt=start, id__lte=start + BACKFILL_BATCH_SIZE, company__isnull=True
+            ).update(company=company)
+
+
+class Migration(migrations.Migration):
+    # the backfill commits batch by batch instead of in one transaction
+    atomic = False
+
+    dependencies = [
+        ("authentication", "0021_appuser_phone_number_e164"),
+        ("logs", "0010_log_company_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(set_log_companies, migrations.RunPython.noop),
+    ]
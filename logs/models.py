@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from django.contrib.postgres.indexes import GinIndex
 import authentication.models as auth_models
 # Create your models here.
 
@@ -6,10 +9,46 @@ import authentication.models as auth_models
 class Log(models.Model):
     app_user = models.ForeignKey(
         to=auth_models.AppUser, on_delete=models.CASCADE)
+    # the company of the app user, copied so the logs of a company are read without joining its employees
+    company = models.ForeignKey(
+        to=auth_models.Company, null=True, on_delete=models.CASCADE)
     action = models.CharField(max_length=100, null=False, blank=False)
     model = models.CharField(max_length=100, null=False, blank=False)
-    details = models.JSONField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # the change tracked values of the models, like dates and decimals, are encoded as strings
+    details = models.JSONField(encoder=DjangoJSONEncoder)
+    # set when the entry is recorded, it is written later by the log buffer
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["app_user", "-timestamp"], name="log_app_user_timestamp_idx"),
+            models.Index(fields=["timestamp"], name="log_timestamp_idx"),
+            models.Index(fields=["company", "-timestamp"], name="log_company_timestamp_idx"),
+            # postgres only, serves the containment lookups like details__contains={"new": {"id": 123}}
+            GinIndex(fields=["details"], name="log_details_gin_idx"),
+        ]
 
     def __str__(self):
         return self.app_user.user.username + " " + self.action + " " + self.model
+
+
+class ArchivedLog(models.Model):
+    """A log past its retention window, moved out of the logs table by `python manage.py apply_retention`."""
+
+    id = models.BigIntegerField(primary_key=True)
+    app_user = models.ForeignKey(
+        to=auth_models.AppUser, on_delete=models.CASCADE, related_name="+")
+    company = models.ForeignKey(
+        to=auth_models.Company, null=True, on_delete=models.CASCADE, related_name="+")
+    action = models.CharField(max_length=100, null=False, blank=False)
+    model = models.CharField(max_length=100, null=False, blank=False)
+    details = models.JSONField(encoder=DjangoJSONEncoder)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["archived_at"], name="archived_log_at_idx"),
+            # the archived logs are deleted by their timestamp
+            models.Index(fields=["timestamp"], name="archived_log_timestamp_idx"),
+        ]
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+import logs.models as models
+import authentication.models as auth_models
+
+
+@receiver(post_save, sender=auth_models.CompanyEmployee)
+def set_employee_log_company(sender, instance, created, **kwargs):
+    # the logs written before the app user joined the company are listed with its logs
+    if created:
+        models.Log.objects.filter(app_user=instance.app_user_id, company__isnull=True).update(
+            company=instance.company_id
+        )
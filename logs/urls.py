@@ -4,4 +4,5 @@ import logs.views as views
 urlpatterns = [
     path("list/", views.ListLogsView.as_view()),
     path("log/<id>/", views.ListLogsView.as_view()),
+    path("export/<file_format>/", views.ExportLogsView.as_view()),
 ]
@@ -1,37 +1,122 @@
+import atexit
+import threading
+from django.db import close_old_connections, InterfaceError, OperationalError
+from django.utils import timezone
 import logs.models as models
 import authentication.models as auth_models
+from freightmonster.settings.base import LOG_BUFFER_SIZE, LOG_BUFFER_MAX_SIZE, LOG_FLUSH_INTERVAL
 
 
-def handle_log(user, action, model, details, log_fields=[]):
-    app_user = auth_models.AppUser.objects.get(user=user)
+class LogBuffer:
+    """Buffers the log entries of the process and writes them with one bulk_create
 
-    log_json = {}
-    if action.lower() == "create" or action.lower() == "reject" or action.lower() == "update status" or action.lower() == "delete":
-        log_json["old"] = None
-        log_json["new"] = {}
-        for field in log_fields:
-            log_json["new"][field] = details[field]
-    else:
-        log_json["old"] = {}
-        log_json["new"] = {}
-        for field in log_fields:
-            log_json["old"][field] = details["old"][field]
-            log_json["new"][field] = details["new"][field]
+    A background thread writes the entries once LOG_BUFFER_SIZE of them are waiting, or LOG_FLUSH_INTERVAL
+    seconds after its last write, the requests only append to the buffer. When the batch fails its entries
+    are written one by one, and the ones that could not reach the database are queued again. What is left
+    is written when the process exits.
+    """
 
-    log = models.Log(app_user=app_user, action=action,
-                     model=model, details=log_json)
-    log.save()
+    def __init__(self, size, interval, max_size):
+        self.size = size
+        self.interval = interval
+        self.max_size = max_size
+        self.entries = []
+        self.lock = threading.Lock()
+        self.full = threading.Event()
+        self.stopped = threading.Event()
+        self.flusher = None
 
+    def add(self, entry):
+        with self.lock:
+            self.entries.append(entry)
+            if len(self.entries) >= self.size:
+                self.full.set()
+            if self.flusher is None:
+                # started on the first entry, after the process was forked by the server
+                self.flusher = threading.Thread(target=self.flush_periodically, daemon=True)
+                self.flusher.start()
 
-def get_original_instance_and_original_request(request, instance):
-    original_instance = {}
-    original_request = {}
-    for field in request.data:
+    def flush(self):
+        """Writes the buffered entries, returns False when some of them were queued again"""
+        with self.lock:
+            entries, self.entries = self.entries, []
+            self.full.clear()
+        if not entries:
+            return True
+        failed = self.write(entries)
+        if not failed:
+            return True
+        with self.lock:
+            self.entries = failed + self.entries
+            dropped = len(self.entries) - self.max_size
+            if dropped > 0:
+                print(f"Dropped {dropped} log entries, the database can not be reached.")
+                self.entries = self.entries[dropped:]
+        return False
+
+    def write(self, entries):
+        """Writes the entries, returns the ones that could not reach the database"""
         try:
-            if str(getattr(instance, field)) != request.data[field]:
-                original_instance[field] = str(getattr(instance, field))
-                original_request[field] = request.data[field]
-        except AttributeError:
-            continue
+            models.Log.objects.bulk_create(entries)
+            return []
+        except (OperationalError, InterfaceError) as e:
+            print(f"Unexpected {e=}, {type(e)=}")
+            return entries
+        except Exception as e:
+            print(f"Unexpected {e=}, {type(e)=}")
+
+        # a single bad entry fails the whole batch, the other ones are still written
+        failed = []
+        for entry in entries:
+            try:
+                entry.save(force_insert=True)
+            except (OperationalError, InterfaceError) as e:
+                print(f"Unexpected {e=}, {type(e)=}")
+                failed.append(entry)
+            except Exception as e:
+                print(f"Unexpected {e=}, {type(e)=}")
+        return failed
+
+    def flush_periodically(self):
+        while not self.stopped.is_set():
+            self.full.wait(self.interval)
+            # the thread keeps its connection between writes, unless it expired or broke
+            close_old_connections()
+            if not self.flush():
+                # a full buffer would retry right away, the database is given the interval to come back
+                self.stopped.wait(self.interval)
+
+    def stop(self):
+        """Stops the background thread then writes what is left, called when the process exits"""
+        self.stopped.set()
+        self.full.set()
+        if self.flusher is not None:
+            # bounded, so a hanging database does not keep the process from exiting
+            self.flusher.join(self.interval * 5)
+        self.flush()
+
+
+log_buffer = LogBuffer(LOG_BUFFER_SIZE, LOG_FLUSH_INTERVAL, LOG_BUFFER_MAX_SIZE)
+atexit.register(log_buffer.stop)
+
+
+def record_log(app_user, action, model, new, old=None):
+    """Queues a log entry of the app user, `new` and `old` are the logged fields and their values
 
-    return original_instance, original_request
\ No newline at end of file
+    The entry gets its time and the company of the app user now, not when the buffer is written.
+    """
+    try:
+        # loaded with the app user of the request, see get_app_user_with_roles
+        company_id = app_user.companyemployee.company_id
+    except auth_models.CompanyEmployee.DoesNotExist:
+        company_id = None
+    log_buffer.add(
+        models.Log(
+            app_user_id=app_user.id,
+            company_id=company_id,
+            action=action,
+            model=model,
+            details={"old": old, "new": new},
+            timestamp=timezone.now(),
+        )
+    )
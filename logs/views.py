@@ -1,31 +1,141 @@
+# Python imports
+import csv
+import json
+
 # Django imports
-from django.shortcuts import get_object_or_404
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.core.serializers.json import DjangoJSONEncoder
 
 # DRF imports
+from rest_framework.views import APIView
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated
+import rest_framework.exceptions as exceptions
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
 
 # app imports
 import logs.models as models
 import logs.serializers as serializers
-import manager.models as manager_models
 import authentication.models as auth_models
 import authentication.permissions as permissions
 
+# Third Party imports
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+
+EXPORT_FIELDS = ["id", "app_user", "action", "model", "details", "timestamp"]
+EXPORT_CHUNK_SIZE = 2000
+
+LOG_FILTER_PARAMETERS = [
+    OpenApiParameter("model", OpenApiTypes.STR, description="Model of the logged record, like Load."),
+    OpenApiParameter("action", OpenApiTypes.STR, description="Logged action, like Create or Update."),
+    OpenApiParameter("user", OpenApiTypes.STR, description="Username of the employee who acted."),
+    OpenApiParameter("record", OpenApiTypes.INT, description="Id of the logged record, combined with model."),
+    OpenApiParameter("since", OpenApiTypes.DATETIME, description="Oldest timestamp, included."),
+    OpenApiParameter("until", OpenApiTypes.DATETIME, description="Newest timestamp, excluded."),
+]
+
+
+class CompanyLogsMixin:
+    """Logs of the employees of the requesting manager's company, filtered by the query params"""
 
-class ListLogsView(GenericAPIView, ListModelMixin, RetrieveModelMixin):
+    def get_company_logs(self):
+        app_user = permissions.get_request_app_user(self.request)
+        try:
+            company = app_user.company
+        except auth_models.Company.DoesNotExist:
+            raise exceptions.NotFound("No company is managed by this user.")
+
+        queryset = models.Log.objects.filter(company=company)
+        query_params = self.request.query_params
+        for param in ["model", "action"]:
+            if query_params.get(param):
+                queryset = queryset.filter(**{param: query_params[param]})
+        if query_params.get("user"):
+            queryset = queryset.filter(app_user__user__username=query_params["user"])
+        if query_params.get("record"):
+            try:
+                record = int(query_params["record"])
+            except ValueError:
+                raise exceptions.ValidationError({"record": "The record must be an id."})
+            if connection.vendor == "postgresql":
+                # answered by the GIN index of details
+                queryset = queryset.filter(details__contains={"new": {"id": record}})
+            else:
+                queryset = queryset.filter(details__new__id=record)
+        for param, lookup in [("since", "timestamp__gte"), ("until", "timestamp__lt")]:
+            if query_params.get(param):
+                timestamp = parse_datetime(query_params[param])
+                if timestamp is None:
+                    raise exceptions.ValidationError({param: "The date must be an ISO 8601 datetime."})
+                queryset = queryset.filter(**{lookup: timestamp})
+        return queryset.order_by("-timestamp", "-id")
+
+
+class ListLogsView(CompanyLogsMixin, GenericAPIView, ListModelMixin, RetrieveModelMixin):
     permission_classes = [IsAuthenticated, permissions.IsCompanyManager]
     serializer_class = serializers.LogSerializer
     queryset = models.Log.objects.all()
+    lookup_field = "id"
 
+    @extend_schema(parameters=LOG_FILTER_PARAMETERS)
     def get(self, request, *args, **kwargs):
         if "id" in kwargs:
             return self.retrieve(request, *args, **kwargs)
         return self.list(request, *args, **kwargs)
 
     def get_queryset(self):
-        manager = get_object_or_404(
-            auth_models.AppUser, user=self.request.user)
-        company = manager_models.Company.objects.get(manager=manager)
-        return models.Log.objects.filter(app_user__companyemployee__company=company)
+        return self.get_company_logs().select_related("app_user__user")
+
+
+class Echo:
+    """A file like object returning what is written to it, for csv writers feeding a streaming response"""
+
+    def write(self, value):
+        return value
+
+
+class ExportLogsView(CompanyLogsMixin, APIView):
+    """Streams the filtered logs of the company as NDJSON or CSV, read from a server-side cursor in chunks"""
+
+    permission_classes = [IsAuthenticated, permissions.IsCompanyManager]
+
+    @extend_schema(parameters=LOG_FILTER_PARAMETERS, responses={200: OpenApiTypes.BINARY})
+    def get(self, request, *args, **kwargs):
+        file_format = kwargs["file_format"]
+        if file_format not in ["ndjson", "csv"]:
+            raise exceptions.NotFound("Logs are exported as ndjson or csv.")
+
+        rows = self.get_company_logs().values_list(
+            "id", "app_user__user__username", "action", "model", "details", "timestamp"
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        if file_format == "ndjson":
+            content = (
+                json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + "\n"
+                for row in rows
+            )
+            content_type = "application/x-ndjson"
+        else:
+            content = self.get_csv_lines(rows)
+            content_type = "text/csv"
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="logs.{file_format}"'
+        return response
+
+    def get_csv_lines(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for log_id, username, action, model, details, timestamp in rows:
+            yield writer.writerow(
+                [
+                    log_id,
+                    username,
+                    action,
+                    model,
+                    json.dumps(details, cls=DjangoJSONEncoder),
+                    timestamp.isoformat(),
+                ]
+            )
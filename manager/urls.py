@@ -27,6 +27,7 @@ urlpatterns = [
     path("billing/", views.EmployeeBillingDocumentsView.as_view()),
 
     path("notifications/", views.ListEmpoloyeeNotificationsView.as_view()),
+    path("notifications/mark-seen/", views.ManagerBulkSeenNotificationView.as_view()),
     path("notifications/<id>/", views.ManagerUpdateNotificationView.as_view()),
 
     path("dashboard/", views.DashboardView.as_view()),
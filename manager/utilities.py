@@ -1,5 +1,3 @@
-
-from django.db.models import Q
 from rest_framework import exceptions
 import shipment.models as ship_models
 from django.db.models.query import QuerySet
@@ -17,25 +15,11 @@ def check_manager_can_view_load(load_id, user):
         company=company
     ).values_list("app_user", flat=True)
     
-    not_created_by_employee = load.created_by.id not in company_employees
-    not_customer_employee = load.customer.app_user.id not in company_employees
-    not_shipper_employee = load.shipper.app_user.id not in company_employees
-    not_consignee_employee = load.consignee.app_user.id not in company_employees
-    not_dispatcher_employee = load.dispatcher.app_user.id not in company_employees
-    
-    if load.carrier:
-        not_carrier_employee = load.carrier.app_user.id not in company_employees
-    else:
-        not_carrier_employee = True
+    employee_participates = ship_models.LoadParticipant.objects.filter(
+        load=load, app_user__in=company_employees
+    ).exists()
 
-    if (
-        not_created_by_employee
-        and not_customer_employee
-        and not_shipper_employee
-        and not_consignee_employee
-        and not_dispatcher_employee
-        and not_carrier_employee
-    ):
+    if not employee_participates:
         raise exceptions.PermissionDenied(
             detail="You don't have access to view this load's information")
     return load, company_employees
@@ -45,18 +29,10 @@ def check_manager_can_view_load_queryset(queryset: QuerySet, user):
     manager = get_object_or_404(
         auth_models.AppUser, user=user)
     company = get_object_or_404(auth_models.Company, manager=manager)
-    queryset = (
-        queryset.filter(
-            Q(created_by__companyemployee__company=company)
-            | Q(customer__app_user__companyemployee__company=company)
-            | Q(shipper__app_user__companyemployee__company=company)
-            | Q(consignee__app_user__companyemployee__company=company)
-            | Q(dispatcher__app_user__companyemployee__company=company)
-            | Q(carrier__app_user__companyemployee__company=company)
-        )
-        .distinct()
-        .order_by("-id")
+    participations = ship_models.LoadParticipant.objects.filter(
+        app_user__companyemployee__company=company
     )
+    queryset = queryset.filter(id__in=participations.values("load")).order_by("-id")
 
     return queryset
 
@@ -16,19 +16,21 @@ import rest_framework.exceptions as exceptions
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import serializers as drf_serializers
-from rest_framework.pagination import PageNumberPagination
+from freightmonster.pagination import ListPagination
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
 
 # Module imports
 import manager.utilities as utils
 import document.models as doc_models
 import shipment.models as ship_models
+import shipment.utilities as ship_utils
 import manager.serializers as serializers
 import authentication.models as auth_models
 import document.serializers as doc_serializers
 import shipment.serializers as ship_serializers
 import authentication.permissions as permissions
 import notifications.models as notif_models
+import notifications.counters as notif_counters
 import notifications.serializers as notif_serializers
 
 # ThirdParty imports
@@ -61,7 +63,7 @@ class ListEmployeesLoadsView(GenericAPIView, ListModelMixin):
     serializer_class = ship_serializers.LoadListSerializer
     queryset = ship_models.Load.objects.all()
     lookup_field = "id"
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
 
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
@@ -150,7 +152,7 @@ class FilterEmployeeLoadsView(GenericAPIView, ListModelMixin):
     serializer_class = ship_serializers.LoadListSerializer
     queryset = ship_models.Load.objects.all()
     lookup_field = "shipment"
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
 
     def post(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
@@ -196,7 +198,7 @@ class ListEmployeesContactsView(GenericAPIView, ListModelMixin):
     serializer_class = serializers.ManagerContactListSerializer
     queryset = ship_models.Contact.objects.all()
     lookup_field = "id"
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
 
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
@@ -257,7 +259,7 @@ class ListEmployeesFacilitiesView(GenericAPIView, ListModelMixin):
     permission_classes = [IsAuthenticated, permissions.IsCompanyManager]
     serializer_class = ship_serializers.FacilitySerializer
     queryset = ship_models.Facility.objects.all()
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
 
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
@@ -316,7 +318,7 @@ class ListEmployeesShipmentsView(GenericAPIView, ListModelMixin, RetrieveModelMi
     permission_classes = [IsAuthenticated, permissions.IsCompanyManager]
     serializer_class = ship_serializers.ShipmentSerializer
     queryset = ship_models.Shipment.objects.all()
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
     lookup_field = "id"
 
     def get(self, request, *args, **kwargs):
@@ -413,7 +415,7 @@ class ListEmployeesShipmentAdminsView(GenericAPIView, ListModelMixin):
             shipment_id = self.request.GET.get("id")
             queryset = queryset.filter(shipment=shipment_id)
         else:
-            queryset = []
+            queryset = queryset.none()
 
         return queryset
 
@@ -602,7 +604,7 @@ class ListEmpoloyeeNotificationsView(GenericAPIView, ListModelMixin):
     permission_classes = [IsAuthenticated, permissions.IsCompanyManager]
     serializer_class = notif_serializers.ManagerNotificationSerializer
     queryset = notif_models.Notification.objects.all()
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
 
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
@@ -659,10 +661,15 @@ class ManagerUpdateNotificationView(GenericAPIView, UpdateModelMixin):
         request.data["manager_seen"] = request.data["seen"]
         del request.data["seen"]
 
+        was_seen = instance.manager_seen
         serializer = self.get_serializer(
             instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        if instance.manager_seen != was_seen:
+            notif_counters.change_unread_counters(
+                company_deltas={company.id: -1 if instance.manager_seen else 1}
+            )
 
         if getattr(instance, "_prefetched_objects_cache", None):
             instance._prefetched_objects_cache = {}
@@ -670,10 +677,78 @@ class ManagerUpdateNotificationView(GenericAPIView, UpdateModelMixin):
         return Response(serializer.data)
 
 
+class ManagerBulkSeenNotificationView(APIView):
+    permission_classes = (IsAuthenticated, permissions.IsCompanyManager)
+
+    @extend_schema(
+        request=notif_serializers.NotificationBulkSeenSerializer,
+        responses={
+            200: inline_serializer(
+                name="ManagerBulkSeenNotification",
+                fields={"updated": drf_serializers.IntegerField()},
+            )
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        """
+        Acknowledge employee notifications
+
+            Marks the listed notifications of your employees, or all of them up to an id, as seen by the manager at once
+
+            **Example**
+                >>> ids: [1, 2, 3]
+                >>> up_to: 3
+        """
+        serializer = notif_serializers.NotificationBulkSeenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        app_user = permissions.get_request_app_user(request)
+        company = get_object_or_404(auth_models.Company, manager=app_user)
+        company_employees = auth_models.CompanyEmployee.objects.filter(
+            company=company
+        ).values("app_user")
+
+        notifications = notif_models.Notification.objects.filter(user__in=company_employees)
+        if "ids" in serializer.validated_data:
+            ids = serializer.validated_data["ids"]
+            if notif_models.Notification.objects.filter(id__in=ids).exclude(
+                user__in=company_employees
+            ).exists():
+                raise exceptions.PermissionDenied(
+                    detail="You can only update the notifications of your employees."
+                )
+            notifications = notifications.filter(id__in=ids)
+        else:
+            notifications = notifications.filter(id__lte=serializer.validated_data["up_to"])
+
+        updated = notifications.filter(manager_seen=False).update(manager_seen=True)
+        notif_counters.change_unread_counters(company_deltas={company.id: -updated})
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated, permissions.IsCompanyManager]
 
     @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="year",
+                description="year of the monthly chart, defaults to the current year",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="start_date",
+                description="start of the monthly chart's date range (YYYY-MM-DD), overrides year",
+                required=False,
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="end_date",
+                description="end of the monthly chart's date range (YYYY-MM-DD), overrides year",
+                required=False,
+                type=OpenApiTypes.DATE,
+            ),
+        ],
         responses={
             200: inline_serializer(
                 name="Dashboard",
@@ -717,73 +792,28 @@ class DashboardView(APIView):
         filter_query = utils.check_manager_can_view_load_queryset(
             queryset=filter_query, user=self.request.user
         )
-        if filter_query.exists() is False:
+        start, end = ship_utils.get_dashboard_period(request.query_params)
+        rollups = ship_models.LoadStatusRollup.objects.filter(
+            company__manager__user=request.user
+        )
+        if ship_utils.is_whole_months_period(start, end):
+            result = ship_utils.get_dashboard_stats_from_rollup(rollups, start, end)
+        else:
+            result = ship_utils.get_dashboard_stats(filter_query, start, end)
+        if result is None:
             raise exceptions.NotFound(detail="No loads found.")
         delivered_loads = filter_query.filter(status="Delivered")
-        result = {}
-        cards = {}
-        cards["total"] = filter_query.count()
-        cards["pending"] = filter_query.filter(
-            status__in=[
-                "Created",
-                AWAITING_CUSTOMER,
-                ASSIGNING_CARRIER,
-                AWAITING_CARRIER,
-                AWAITING_DISPATCHER,
-            ]
-        ).count()
-
-        cards["ready_for_pick_up"] = filter_query.filter(
-            status=READY_FOR_PICKUP).count()
-        cards["in_transit"] = filter_query.filter(status=IN_TRANSIT).count()
-        cards["delivered"] = delivered_loads.count()
-        cards["canceled"] = filter_query.filter(status="Canceled").count()
-
-        # loads = filter_query.order_by("-id")[:3]
-
-        # loads = ship_serializers.LoadListSerializer(loads, many=True).data
-        # cards["loads"] = loads
-        result["cards"] = cards
-        result["chart"] = []
-
         year = datetime.now().year
-        for i in range(1, 13):
-            monthly_loads = filter_query.filter(
-                created_at__month=i, created_at__year=year)
-            obj = {}
-            obj["name"] = datetime.strptime(str(i), "%m").strftime("%b")
-            if monthly_loads.exists() is False:
-                obj["total"] = 0
-                obj["pending"] = 0
-                obj["ready_for_pick_up"] = 0
-                obj["in_transit"] = 0
-                obj["delivered"] = 0
-                obj["canceled"] = 0
-                result["chart"].append(obj)
-                continue
-            obj["total"] = monthly_loads.count()
-            obj["pending"] = monthly_loads.filter(
-                status__in=[
-                    "Created",
-                    AWAITING_CUSTOMER,
-                    ASSIGNING_CARRIER,
-                    AWAITING_CARRIER,
-                    AWAITING_DISPATCHER,
-                ]
-            ).count()
-
-            obj["ready_for_pick_up"] = monthly_loads.filter(
-                status=READY_FOR_PICKUP
-            ).count()
-            obj["in_transit"] = monthly_loads.filter(status=IN_TRANSIT).count()
-            obj["delivered"] = monthly_loads.filter(status="Delivered").count()
-            obj["canceled"] = monthly_loads.filter(status="Canceled").count()
-            result["chart"].append(obj)
 
         # getting number of FTL,LTL, heavy haul loads
-        ftl = filter_query.filter(load_type="FTL").count()
-        ltl = filter_query.filter(load_type="LTL").count()
-        heavy_haul = filter_query.filter(weight__gte=80000).count()
+        load_types = rollups.aggregate(
+            ftl=Sum("count", filter=Q(load_type="FTL"), default=0),
+            ltl=Sum("count", filter=Q(load_type="LTL"), default=0),
+            heavy_haul=Sum("count", filter=Q(heavy_haul=True), default=0),
+        )
+        ftl = load_types["ftl"]
+        ltl = load_types["ltl"]
+        heavy_haul = load_types["heavy_haul"]
 
         result["load_types"] = {
             "ftl": ftl,
@@ -12,6 +12,8 @@ class NotificationSettingAdmin(admin.ModelAdmin):
         "user",
         "is_allowed",
         "methods",
+        "delivery_mode",
+        "digest_window",
         "add_as_contact",
         "add_to_load",
         "got_offer",
@@ -0,0 +1,88 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+import notifications.models as models
+import authentication.models as auth_models
+import notifications.serializers as serializers
+from notifications.utilities import (
+    get_notification_group,
+    get_manager_notification_group,
+)
+
+# notifications sent back at most when a client resumes, it lists the older ones over http
+RESUME_LIMIT = 100
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """Pushes the new notifications of the connected user, and to managers the ones of their employees.
+
+    A client reconnecting with `?last_id=<id>` first receives the notifications created after that id.
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        self.app_user = await database_sync_to_async(
+            auth_models.AppUser.objects.filter(user=user).first
+        )()
+        if self.app_user is None:
+            await self.close()
+            return
+
+        self.notification_groups = [get_notification_group(self.app_user.id)]
+        if self.app_user.user_type == "manager":
+            self.notification_groups.append(get_manager_notification_group(self.app_user.id))
+        # join before reading the missed notifications so nothing is created in between unseen
+        for group in self.notification_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+
+        self.resumed = set()
+        last_id = parse_qs(self.scope["query_string"].decode()).get("last_id", [None])[0]
+        if last_id is not None and last_id.isdigit():
+            missed, complete = await database_sync_to_async(self.get_missed_notifications)(
+                int(last_id)
+            )
+            for kind, notification in missed:
+                self.resumed.add((kind, notification["id"]))
+                await self.send_json({"type": kind, "notification": notification})
+            await self.send_json({"type": "resumed", "complete": complete})
+
+    async def disconnect(self, code):
+        for group in getattr(self, "notification_groups", []):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # the socket only pushes, reading and updating notifications stays on the http endpoints
+        pass
+
+    async def notification_created(self, event):
+        if (event["kind"], event["notification"]["id"]) in self.resumed:
+            return
+        await self.send_json({"type": event["kind"], "notification": event["notification"]})
+
+    def get_missed_notifications(self, last_id):
+        notifications = models.Notification.objects.select_related("user__user", "sender__user")
+        missed = [
+            ("notification", serializers.NotificationSerializer(notification).data)
+            for notification in notifications.filter(
+                user=self.app_user, id__gt=last_id
+            ).order_by("id")[: RESUME_LIMIT + 1]
+        ]
+        if self.app_user.user_type == "manager":
+            employees = auth_models.CompanyEmployee.objects.filter(
+                company__manager=self.app_user
+            ).values("app_user")
+            missed += [
+                ("manager_notification", serializers.ManagerNotificationSerializer(notification).data)
+                for notification in notifications.filter(
+                    user__in=employees, id__gt=last_id
+                ).order_by("id")[: RESUME_LIMIT + 1]
+            ]
+            missed.sort(key=lambda item: item[1]["id"])
+        return missed[:RESUME_LIMIT], len(missed) <= RESUME_LIMIT
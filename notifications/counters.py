@@ -0,0 +1,188 @@
+"""Unread notification counters kept in Redis, per user and per company for the managers' feed.
+
+The counters are changed with INCRBY so concurrent writers never lose an update, a missing counter is
+filled from the database the first time it is read and `python manage.py reconcile_notification_counters`
+corrects any drift. Without Redis the counts are read from the database.
+"""
+from collections import Counter
+
+import redis
+import django.conf
+from django.db.models import Count
+
+import notifications.models as models
+import authentication.models as auth_models
+
+NOTIFICATION_COUNTERS_REDIS_URL = getattr(django.conf.settings, "NOTIFICATION_COUNTERS_REDIS_URL", None)
+
+redis_client = (
+    redis.Redis.from_url(NOTIFICATION_COUNTERS_REDIS_URL, socket_timeout=0.5)
+    if NOTIFICATION_COUNTERS_REDIS_URL
+    else None
+)
+
+# only change counters that exist, a missing one is filled from the database when it is read
+INCREMENT_EXISTING = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return redis.call("INCRBY", KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+def get_user_counter_key(app_user_id):
+    return f"notifications:unread:user:{app_user_id}"
+
+
+def get_company_counter_key(company_id):
+    return f"notifications:unread:company:{company_id}"
+
+
+def count_user_unread(app_user_id):
+    return models.Notification.objects.filter(user=app_user_id, seen=False).count()
+
+
+def count_company_unread(company_id):
+    return models.Notification.objects.filter(
+        user__companyemployee__company=company_id, manager_seen=False
+    ).count()
+
+
+def change_unread_counters(user_deltas=None, company_deltas=None):
+    """Adds the deltas, keyed by app user id and company id, to the counters"""
+    if redis_client is None:
+        return
+    changes = [
+        (get_user_counter_key(app_user_id), delta)
+        for app_user_id, delta in (user_deltas or {}).items()
+        if delta
+    ] + [
+        (get_company_counter_key(company_id), delta)
+        for company_id, delta in (company_deltas or {}).items()
+        if delta
+    ]
+    if not changes:
+        return
+    try:
+        increment = redis_client.register_script(INCREMENT_EXISTING)
+        pipeline = redis_client.pipeline(transaction=False)
+        for key, delta in changes:
+            increment(keys=[key], args=[delta], client=pipeline)
+        pipeline.execute()
+    except redis.RedisError as e:
+        # the counters are dropped so they are filled again from the database
+        print(f"Unexpected {e=}, {type(e)=}")
+        forget_unread_counters([key for key, _ in changes])
+
+
+def count_created_notifications(notifications, companies):
+    """Counter deltas of new notifications, `companies` maps app user ids to the company they work for"""
+    user_deltas = Counter(notification.user_id for notification in notifications)
+    company_deltas = Counter(
+        companies[notification.user_id].id
+        for notification in notifications
+        if notification.user_id in companies
+    )
+    return user_deltas, company_deltas
+
+
+def uncount_archived_notifications(rows):
+    """Takes the archived unread notifications, given as values of their rows, off the counters once they are committed"""
+    user_deltas = Counter(row["user_id"] for row in rows if not row["seen"])
+    manager_unread = [row["user_id"] for row in rows if not row["manager_seen"]]
+    companies = dict(
+        auth_models.CompanyEmployee.objects.filter(app_user__in=set(manager_unread)).values_list(
+            "app_user_id", "company_id"
+        )
+    ) if manager_unread else {}
+    company_deltas = Counter(
+        companies[app_user_id] for app_user_id in manager_unread if app_user_id in companies
+    )
+    change_unread_counters(
+        {app_user_id: -delta for app_user_id, delta in user_deltas.items()},
+        {company_id: -delta for company_id, delta in company_deltas.items()},
+    )
+
+
+def forget_unread_counters(keys):
+    if redis_client is None or not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        print(f"Unexpected {e=}, {type(e)=}")
+
+
+def get_unread_count(key, count_from_database):
+    if redis_client is not None:
+        try:
+            count = redis_client.get(key)
+            if count is not None:
+                return max(int(count), 0)
+            count = count_from_database()
+            redis_client.set(key, count, nx=True)
+            return count
+        except redis.RedisError as e:
+            print(f"Unexpected {e=}, {type(e)=}")
+    return count_from_database()
+
+
+def get_unread_counts(app_user: auth_models.AppUser):
+    """Unread notifications of the user, and of the employees of the company they manage"""
+    counts = {
+        "unread": get_unread_count(
+            get_user_counter_key(app_user.id), lambda: count_user_unread(app_user.id)
+        )
+    }
+    if app_user.user_type == "manager":
+        company_id = (
+            auth_models.Company.objects.filter(manager=app_user).values_list("id", flat=True).first()
+        )
+        counts["manager_unread"] = (
+            get_unread_count(
+                get_company_counter_key(company_id), lambda: count_company_unread(company_id)
+            )
+            if company_id is not None
+            else 0
+        )
+    return counts
+
+
+def reconcile_unread_counters():
+    """Sets every counter to the count of the database, returns the number of counters that had drifted
+
+    Counters changed while the counts are read can be off by those changes until the next run.
+    """
+    if redis_client is None:
+        return 0
+    counts = {
+        get_user_counter_key(row["user"]): row["count"]
+        for row in models.Notification.objects.filter(seen=False)
+        .values("user")
+        .annotate(count=Count("id"))
+    }
+    counts.update(
+        {
+            get_company_counter_key(row["user__companyemployee__company"]): row["count"]
+            for row in models.Notification.objects.filter(
+                manager_seen=False, user__companyemployee__company__isnull=False
+            )
+            .values("user__companyemployee__company")
+            .annotate(count=Count("id"))
+        }
+    )
+    keys = [key.decode() for key in redis_client.scan_iter(match="notifications:unread:*", count=1000)]
+    for key in keys:
+        counts.setdefault(key, 0)
+
+    drifted = 0
+    keys = list(counts)
+    for start in range(0, len(keys), 1000):
+        batch = keys[start : start + 1000]
+        pipeline = redis_client.pipeline(transaction=False)
+        for key, current in zip(batch, redis_client.mget(batch)):
+            if current is None or int(current) != counts[key]:
+                drifted += current is not None
+                pipeline.set(key, counts[key])
+        pipeline.execute()
+    return drifted
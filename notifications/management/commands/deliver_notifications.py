@@ -0,0 +1,84 @@
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+import notifications.utilities as utils
+from freightmonster.settings.base import (
+    NOTIFICATION_DELIVERY_WORKERS,
+    NOTIFICATION_DELIVERY_BATCH_SIZE,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the emails and sms waiting in the notification outbox. Every channel has its own pool of workers, "
+        "so a slow provider only holds back its own deliveries, and every worker sends its emails in batches over one SMTP session."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the deliveries that are due and exit instead of polling the outbox.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2,
+            help="Seconds to wait when no delivery is due.",
+        )
+
+    def handle(self, *args, **options):
+        pools = {
+            channel: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"deliver-{channel}")
+            for channel, workers in NOTIFICATION_DELIVERY_WORKERS.items()
+        }
+        running = {channel: set() for channel in pools}
+        sent = failed = 0
+        try:
+            while True:
+                claimed = 0
+                for channel, pool in pools.items():
+                    for future in [future for future in running[channel] if future.done()]:
+                        running[channel].remove(future)
+                        results = future.result()
+                        sent += results.count(True)
+                        failed += results.count(False)
+
+                    free_workers = NOTIFICATION_DELIVERY_WORKERS[channel] - len(running[channel])
+                    if free_workers <= 0:
+                        continue
+                    batch_size = NOTIFICATION_DELIVERY_BATCH_SIZE[channel]
+                    deliveries = utils.claim_notification_deliveries(
+                        channel, free_workers * batch_size, worker=uuid.uuid4().hex
+                    )
+                    claimed += len(deliveries)
+                    for start in range(0, len(deliveries), batch_size):
+                        running[channel].add(
+                            pool.submit(self._deliver, deliveries[start : start + batch_size])
+                        )
+
+                futures = set().union(*running.values())
+                if claimed:
+                    continue
+                if futures:
+                    wait(futures, timeout=options["poll_interval"], return_when=FIRST_COMPLETED)
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["poll_interval"])
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Sent {sent} notifications, {failed} failed attempts.")
+        )
+
+    def _deliver(self, deliveries):
+        # the workers are long lived threads, drop their database connection once it is broken or too old
+        close_old_connections()
+        return utils.deliver_notifications(deliveries)
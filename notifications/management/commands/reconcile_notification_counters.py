@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+import notifications.counters as counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Sets the unread notification counters kept in Redis to the counts of the database. "
+        "Meant to run periodically to correct the drift left by failed or racing updates."
+    )
+
+    def handle(self, *args, **options):
+        if counters.redis_client is None:
+            self.stdout.write("No Redis is configured for the counters, nothing to reconcile.")
+            return
+        drifted = counters.reconcile_unread_counters()
+        self.stdout.write(self.style.SUCCESS(f"Corrected {drifted} drifted counters."))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the indexes are built without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("notifications", "0004_notification_manager_seen"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "seen", "-id"], name="notification_user_seen_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "manager_seen", "-id"],
+                name="notification_manager_seen_idx",
+            ),
+        ),
+    ]
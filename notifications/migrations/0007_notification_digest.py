@@ -0,0 +1,43 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:55
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0006_notificationdelivery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationdelivery",
+            name="coalesce_key",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="notificationdelivery",
+            name="digest",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="notificationsetting",
+            name="delivery_mode",
+            field=models.CharField(
+                choices=[("immediate", "immediate"), ("digest", "digest")],
+                default="immediate",
+                max_length=9,
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationsetting",
+            name="digest_window",
+            field=models.PositiveSmallIntegerField(
+                default=15,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(1440),
+                ],
+            ),
+        ),
+    ]
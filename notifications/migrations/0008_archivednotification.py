@@ -0,0 +1,51 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0021_appuser_phone_number_e164"),
+        ("notifications", "0007_notification_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedNotification",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("message", models.TextField()),
+                ("url", models.URLField()),
+                ("seen", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField()),
+                ("manager_seen", models.BooleanField(default=False)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="archivednotification",
+            name="sender",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="authentication.appuser",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivednotification",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="authentication.appuser",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivednotification",
+            index=models.Index(
+                fields=["archived_at"], name="archived_notification_at_idx"
+            ),
+        ),
+    ]
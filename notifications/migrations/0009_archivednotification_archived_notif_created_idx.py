@@ -0,0 +1,22 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:19
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the index is built without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("notifications", "0008_archivednotification"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="archivednotification",
+            index=models.Index(
+                fields=["created_at"], name="archived_notif_created_idx"
+            ),
+        ),
+    ]
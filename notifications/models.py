@@ -1,4 +1,6 @@
 from django.db import models
+from django.utils import timezone
+from django.core.validators import MinValueValidator, MaxValueValidator
 from authentication.models import AppUser
 
 
@@ -11,6 +13,36 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     manager_seen = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "seen", "-id"], name="notification_user_seen_idx"),
+            models.Index(
+                fields=["user", "manager_seen", "-id"], name="notification_manager_seen_idx"
+            ),
+            models.Index(fields=["created_at"], name="notification_created_at_idx"),
+        ]
+
+
+class ArchivedNotification(models.Model):
+    """A notification past its retention window, moved out of the notifications table by `python manage.py apply_retention`."""
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(to=AppUser, on_delete=models.CASCADE, null=False, related_name="+")
+    sender = models.ForeignKey(to=AppUser, on_delete=models.CASCADE, null=True, related_name="+")
+    message = models.TextField(null=False)
+    url = models.URLField(null=False)
+    seen = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    manager_seen = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["archived_at"], name="archived_notification_at_idx"),
+            # the archived notifications are deleted by their creation date
+            models.Index(fields=["created_at"], name="archived_notif_created_idx"),
+        ]
+
 
 class NotificationSetting(models.Model):
     user = models.OneToOneField(to=AppUser, on_delete=models.CASCADE, null=False)
@@ -27,4 +59,52 @@ class NotificationSetting(models.Model):
     add_as_shipment_admin = models.BooleanField(default=True)
     load_status_changed = models.BooleanField(default=True)
     RC_approved = models.BooleanField(default=True)
+    # digest users get one email or sms summing up the notifications of a window instead of one per notification
+    delivery_mode = models.CharField(
+        choices=[("immediate", "immediate"), ("digest", "digest")],
+        default="immediate",
+        max_length=9,
+    )
+    digest_window = models.PositiveSmallIntegerField(
+        default=15, validators=[MinValueValidator(1), MaxValueValidator(1440)]
+    )  # minutes
     updated_at = models.DateTimeField(auto_now=True)
+
+
+class NotificationDelivery(models.Model):
+    """An email or sms waiting in the outbox, written in the transaction of the notification and sent by the deliver_notifications workers."""
+
+    user = models.ForeignKey(to=AppUser, on_delete=models.CASCADE, null=False)
+    channel = models.CharField(
+        choices=[("email", "email"), ("sms", "sms")], max_length=5, null=False
+    )
+    message = models.TextField(null=False)
+    url = models.URLField(null=True)
+    status = models.CharField(
+        choices=[
+            ("pending", "pending"),
+            ("sending", "sending"),
+            ("sent", "sent"),
+            ("failed", "failed"),
+        ],
+        default="pending",
+        max_length=7,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True, default="")
+    claimed_at = models.DateTimeField(null=True)
+    last_error = models.TextField(blank=True, default="")
+    digest = models.BooleanField(default=False)
+    # a pending digest delivery is replaced by a newer one with the same key, like the status of a load
+    coalesce_key = models.CharField(max_length=64, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["channel", "status", "next_attempt_at"], name="delivery_channel_due_idx"
+            ),
+            models.Index(fields=["claimed_by"], name="delivery_claimed_by_idx"),
+        ]
@@ -58,6 +58,20 @@ class ManagerNotificationSerializer(serializers.ModelSerializer):
 
         return rep
 
+class NotificationBulkSeenSerializer(serializers.Serializer):
+    """Notifications to mark at once, either a list of ids or every notification up to an id."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000
+    )
+    up_to = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("up_to" in attrs):
+            raise serializers.ValidationError("Either ids or up_to is required.")
+        return attrs
+
+
 class NotificationSettingSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.NotificationSetting
@@ -72,6 +86,8 @@ class NotificationSettingSerializer(serializers.ModelSerializer):
             "add_as_shipment_admin": {"required": False},
             "load_status_changed": {"required": False},
             "RC_approved": {"required": False},
+            "delivery_mode": {"required": False},
+            "digest_window": {"required": False},
             "updated_at": {"required": False},
         }
         read_only_fields = (
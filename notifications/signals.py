@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+import authentication.models as auth_models
+import notifications.models as models
+import notifications.counters as counters
+import notifications.utilities as utils
+
+
+@receiver(post_save, sender=auth_models.CompanyEmployee)
+@receiver(post_delete, sender=auth_models.CompanyEmployee)
+def forget_company_unread_counter(sender, instance, **kwargs):
+    # the employees' notifications counted by the company changed, it is counted again on its next read
+    counters.forget_unread_counters([counters.get_company_counter_key(instance.company_id)])
+
+
+@receiver(post_save, sender=models.NotificationSetting)
+@receiver(post_delete, sender=models.NotificationSetting)
+def forget_cached_notification_setting(sender, instance, **kwargs):
+    # after the commit, so the cache is not filled again with the old setting in the meantime
+    transaction.on_commit(lambda: utils.forget_notification_setting(instance.user_id))
@@ -0,0 +1,77 @@
+"""Sms sending through a pluggable transport, SMS_TRANSPORT names the class used by every worker.
+
+A transport only has to implement `send(to, body)` and raise when the message is not accepted, the
+stand-in of notifications/stand_ins.py replaces Twilio in tests and benchmarks.
+"""
+import os
+import threading
+from django.utils.module_loading import import_string
+from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
+from freightmonster.settings.base import (
+    SMS_TRANSPORT,
+    TWILIO_ACCOUNT_SID,
+    TWILIO_PHONE_NUMBER,
+    TWILIO_MESSAGING_SERVICE_SID,
+)
+
+if os.getenv("ENV") == "DEV":
+    from freightmonster.settings.dev import TWILIO_AUTH_TOKEN
+elif os.getenv("ENV") == "STAGING":
+    from freightmonster.settings.staging import TWILIO_AUTH_TOKEN
+else:
+    from freightmonster.settings.local import TWILIO_AUTH_TOKEN
+
+
+class TwilioTransport:
+    """Sends the sms through the Twilio API, every thread keeps its own client and HTTP session alive."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def get_client(self):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = Client(
+                TWILIO_ACCOUNT_SID,
+                TWILIO_AUTH_TOKEN,
+                http_client=TwilioHttpClient(pool_connections=True, timeout=10),
+            )
+        return client
+
+    def send(self, to, body):
+        return self.get_client().messages.create(
+            to=to,
+            from_=TWILIO_PHONE_NUMBER,
+            body=body,
+            messaging_service_sid=TWILIO_MESSAGING_SERVICE_SID,
+        )
+
+
+transport = None
+transport_lock = threading.Lock()
+
+
+def get_sms_transport():
+    """Returns the transport shared by the workers of the process, created on first use"""
+    global transport
+    with transport_lock:
+        if transport is None:
+            transport = import_string(SMS_TRANSPORT)()
+    return transport
+
+
+def send_sms_messages(messages):
+    """Sends (to, body) pairs, `to` being an E.164 phone number, over the session of the current thread.
+
+    Returns the error of every message, None for the ones that were sent.
+    """
+    sms_transport = get_sms_transport()
+    errors = []
+    for to, body in messages:
+        try:
+            sms_transport.send(to, body)
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+    return errors
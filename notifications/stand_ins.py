@@ -0,0 +1,61 @@
+"""Local stand-ins of the email and sms providers, enabled with NOTIFICATION_STAND_INS=True.
+
+Emails are written to NOTIFICATION_STAND_INS_DIR/emails and sms are appended to NOTIFICATION_STAND_INS_DIR/sms.jsonl,
+a share of both can be failed on purpose with NOTIFICATION_STAND_INS_FAILURE_RATE and NOTIFICATION_STAND_INS_LATENCY
+adds the round trip of a real provider to every message, for benchmarks.
+"""
+import os
+import json
+import uuid
+import random
+import time
+import smtplib
+import threading
+from django.utils import timezone
+from django.core.mail.backends.filebased import EmailBackend
+from freightmonster.settings.base import (
+    NOTIFICATION_STAND_INS_DIR,
+    NOTIFICATION_STAND_INS_LATENCY,
+    NOTIFICATION_STAND_INS_FAILURE_RATE,
+)
+
+SMS_FILE_PATH = os.path.join(NOTIFICATION_STAND_INS_DIR, "sms.jsonl")
+
+
+def is_failing():
+    return random.random() < NOTIFICATION_STAND_INS_FAILURE_RATE
+
+
+class StandInEmailBackend(EmailBackend):
+    """Writes the emails to files like the file based backend, failing some of them like a flaky SMTP server."""
+
+    def send_messages(self, email_messages):
+        if NOTIFICATION_STAND_INS_LATENCY:
+            time.sleep(NOTIFICATION_STAND_INS_LATENCY * len(email_messages))
+        if email_messages and is_failing():
+            raise smtplib.SMTPServerDisconnected("Stand-in SMTP server failure.")
+        return super().send_messages(email_messages)
+
+
+class StandInSMSTransport:
+    """Accepts the sms like Twilio would, the sent messages are appended to SMS_FILE_PATH."""
+
+    lock = threading.Lock()
+
+    def send(self, to, body):
+        if NOTIFICATION_STAND_INS_LATENCY:
+            time.sleep(NOTIFICATION_STAND_INS_LATENCY)
+        if is_failing():
+            raise RuntimeError("Stand-in Twilio failure.")
+
+        message = {
+            "sid": "SM" + uuid.uuid4().hex,
+            "to": to,
+            "body": body,
+            "date_created": timezone.now().isoformat(),
+        }
+        with self.lock:
+            os.makedirs(NOTIFICATION_STAND_INS_DIR, exist_ok=True)
+            with open(SMS_FILE_PATH, "a") as sms_file:
+                sms_file.write(json.dumps(message) + "\n")
+        return message
@@ -5,6 +5,9 @@ urlpatterns = [
     path("settings/", views.NotificationSettingView.as_view()),
     path("settings/<id>/", views.NotificationSettingView.as_view()),
     path("update/<id>/", views.UpdateNotificationView.as_view()),
+    path("unread-count/", views.UnreadNotificationCountView.as_view()),
+    path("mark-seen/", views.BulkSeenNotificationView.as_view()),
+    path("websocket-ticket/", views.WebsocketTicketView.as_view()),
     # Fixed URL - always insert above
     path("", views.NotificationView.as_view()),
 ]
\ No newline at end of file
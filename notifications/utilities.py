@@ -1,89 +1,87 @@
 import os
-from django.utils.html import strip_tags
-from django.template.loader import get_template
-from django.core.mail import EmailMultiAlternatives
+import random
+import asyncio
+import string
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Min
+from django.utils import timezone
+from freightmonster.mail import build_email, send_emails
 from shipment.models import Load, Shipment
-from twilio.rest import Client
 from authentication.models import AppUser, CompanyEmployee, Company
 import notifications.models as models
-from phonenumbers import parse, format_number, PhoneNumberFormat, NumberParseException
+import notifications.counters as counters
+import notifications.serializers as serializers
+from notifications.sms import send_sms_messages
 from freightmonster.settings.base import (
-    TWILIO_ACCOUNT_SID,
-    TWILIO_PHONE_NUMBER,
+    NOTIFICATION_DELIVERY_BACKOFF,
+    NOTIFICATION_DELIVERY_MAX_ATTEMPTS,
+    NOTIFICATION_DELIVERY_CLAIM_TIMEOUT,
+    NOTIFICATION_SETTINGS_CACHE_TIMEOUT,
 )
 
-if os.getenv("ENV") == "DEV":
-    from freightmonster.settings.dev import TWILIO_AUTH_TOKEN
-elif os.getenv("ENV") == "STAGING":
-    from freightmonster.settings.staging import TWILIO_AUTH_TOKEN
-else:
-    from freightmonster.settings.local import TWILIO_AUTH_TOKEN
-
 
 # file deepcode ignore AttributeLoadOnNone: because these fields are not nullable
 # everytime the function is called some of the fields are supposed to be null
 
 
-def trigger_send_email_notification(subject, template, to, message, url):
-    """Trigger sending email notification to user"""
+def build_notification_email(subject, template, to, message, url):
     username = to.split("@")[0].capitalize()
-    html_content = get_template(template).render(
-        {
+    return build_email(
+        subject=subject,
+        template=template,
+        to=to,
+        context={
             "username": username,
             "message": message,
             "url": url,
-        }
+        },
     )
 
-    text_content = strip_tags(html_content)
-    message = EmailMultiAlternatives(
-        subject=subject,
-        body=html_content,
-        from_email="notifications@freightslayer.com",
-        to=[to],
-        reply_to=["notifications@freightslayer.com"],
-    )
-    message.attach_alternative(html_content, "text/html")
-    message.content_subtype = "html"
-    message.mixed_subtype = "related"
-    res = message.send()
-    print(res)
 
+def build_notification_digest_email(to, deliveries):
+    username = to.split("@")[0].capitalize()
+    return build_email(
+        subject="FreightSlayer Notifications",
+        template="send_notification.html",
+        to=to,
+        context={
+            "username": username,
+            "message": f"Here is what happened since our last message, {len(deliveries)} new notifications:",
+            "notifications": [
+                {"message": delivery.message, "url": delivery.url} for delivery in deliveries
+            ],
+        },
+    )
 
-def convert_phone_number_to_e164(phone_number: str):
-    """Convert phone number to e164 format"""
-    try:
-        region = "US"
-        if phone_number.startswith("+52"):
-            region = "MX"
-        phone_number = parse(phone_number, region=region)
-
-        return format_number(phone_number, PhoneNumberFormat.E164)
 
-    except NumberParseException:
-        return None
+def get_notification_digest_sms(deliveries):
+    body = f"Hey {deliveries[0].user.user.username}, {len(deliveries)} new notifications: " + " | ".join(
+        delivery.message for delivery in deliveries
+    )
+    if len(body) > SMS_DIGEST_MAX_LENGTH:
+        body = body[: SMS_DIGEST_MAX_LENGTH - 3] + "..."
+    return body
 
 
-def trigger_send_sms_notification(app_user: AppUser, sid, token, phone_number, message):
-    """Trigger sending sms notification to user"""
-    client = Client(sid, token)
-    app_user_phone_number = convert_phone_number_to_e164(app_user.phone_number)
-    if app_user_phone_number is None:
-        print("Invalid phone number format.")
-        return False
+# a digest sms is cut to two segments, the full messages are in the app
+SMS_DIGEST_MAX_LENGTH = 320
 
-    try:
-        response = client.messages.create(
-            to=app_user_phone_number,
-            from_=phone_number,
-            body=message,
-            messaging_service_sid="MGfeb0e973e4fc789955bfa78fddbd7fa7",
-        )
-        print(response)
-        return True
-    except Exception as e:
-        print(f"Unexpected {e=}, {type(e)=}")
-        return False
+# notification action => setting of the user allowing its emails and sms
+ACTION_SETTINGS = {
+    "add_as_contact": "add_as_contact",
+    "add_to_load": "add_to_load",
+    "add_to_loads": "add_to_load",
+    "got_offer": "got_offer",
+    "offer_updated": "offer_updated",
+    "add_as_shipment_admin": "add_as_shipment_admin",
+    "load_status_changed": "load_status_changed",
+    "RC_approved": "RC_approved",
+    "assign_carrier": "load_status_changed",
+}
 
 
 # main
@@ -93,118 +91,510 @@ def handle_notification(
     load=None,
     sender: AppUser = None,
     shipment=None,
+    loads=None,
 ):
-    handle_notification_for_manager(app_user, action, load, sender, shipment)
     """Handle the notification to user's prefrences"""
-    try:
-        notification_setting = models.NotificationSetting.objects.get(user=app_user)
-    except models.NotificationSetting.DoesNotExist:
-        return False
-    if notification_setting.is_allowed:
-        action_to_attr_mapping = {
-            "add_as_contact": "add_as_contact",
-            "add_to_load": "add_to_load",
-            "got_offer": "got_offer",
-            "offer_updated": "offer_updated",
-            "add_as_shipment_admin": "add_as_shipment_admin",
-            "load_status_changed": "load_status_changed",
-            "RC_approved": "RC_approved",
-            "assign_carrier": "load_status_changed",
-        }
+    notified = handle_notifications(
+        [app_user], action, load=load, sender=sender, shipment=shipment, loads=loads
+    )
+    return app_user.id in notified
 
-        message, url = get_notification_msg_and_url(
-            action, load, shipment, app_user, sender
-        )
-        notification = models.Notification.objects.create(
-            user=app_user, sender=sender, message=message, url=url
-        )
-        notification.save()
-        if action in action_to_attr_mapping and getattr(
-            notification_setting, action_to_attr_mapping[action]
-        ):
-            send_notification(app_user, message, url)
-            return True
-        else:
-            return False
-    else:
-        return False
 
-def handle_notification_for_manager(
-    app_user: AppUser,
+@transaction.atomic
+def handle_notifications(
+    app_users,
     action,
     load=None,
     sender: AppUser = None,
     shipment=None,
+    loads=None,
+    roles=None,
 ):
-    # Get Company Manager if exists
+    """Notify app users, and the managers of their companies, of the same event
+
+    The settings and managers of all the users are loaded at once, the notifications are inserted with one
+    bulk_create and their emails and sms are queued in one batch. `roles` maps app user ids to their roles
+    in the load when they are already known. Returns the ids of the users whose emails or sms were queued.
+    """
+    app_users = list({app_user.id: app_user for app_user in app_users}.values())
+    app_user_ids = [app_user.id for app_user in app_users]
+    companies = {
+        employee.app_user_id: employee.company
+        for employee in CompanyEmployee.objects.filter(
+            app_user__in=app_user_ids
+        ).select_related("company__manager__user")
+    }
+    managers = {
+        app_user_id: company.manager
+        for app_user_id, company in companies.items()
+        if company.manager is not None
+    }
+    notification_settings = get_notification_settings(
+        app_user_ids + [manager.id for manager in managers.values()]
+    )
+    setting = ACTION_SETTINGS.get(action)
+    # only the latest status of a load is worth a digest entry
+    coalesce_key = f"{action}:{load.id}" if action == "load_status_changed" and load else ""
+
+    notifications = []
+    deliveries = []
+    notified = set()
+    for app_user in app_users:
+        user_roles = roles.get(app_user.id) if roles is not None else None
+        manager = managers.get(app_user.id)
+        manager_notification_setting = notification_settings.get(manager.id) if manager else None
+        if (
+            manager_notification_setting is not None
+            and manager_notification_setting.is_allowed
+            and setting is not None
+            and getattr(manager_notification_setting, setting)
+        ):
+            message, url = get_notification_msg_and_url_for_manager(
+                action, load, shipment, app_user, sender, loads, user_roles
+            )
+            deliveries += get_notification_deliveries(
+                manager, manager_notification_setting, message, url, coalesce_key
+            )
+
+        notification_setting = notification_settings.get(app_user.id)
+        if notification_setting is None or not notification_setting.is_allowed:
+            continue
+        message, url = get_notification_msg_and_url(
+            action, load, shipment, app_user, sender, loads, user_roles
+        )
+        notifications.append(
+            models.Notification(user=app_user, sender=sender, message=message, url=url)
+        )
+        if setting is not None and getattr(notification_setting, setting):
+            deliveries += get_notification_deliveries(
+                app_user, notification_setting, message, url, coalesce_key
+            )
+            notified.add(app_user.id)
+
+    models.Notification.objects.bulk_create(notifications)
+    models.NotificationDelivery.objects.bulk_create(schedule_digest_deliveries(deliveries))
+    transaction.on_commit(
+        lambda: counters.change_unread_counters(
+            *counters.count_created_notifications(notifications, companies)
+        )
+    )
+    transaction.on_commit(lambda: push_notifications(notifications, managers))
+    return notified
+
+
+def get_notification_setting_cache_key(app_user_id):
+    return f"notification_setting_{app_user_id}"
+
+
+def get_notification_settings(app_user_ids):
+    """Returns the notification settings of app users by their ids, the ones missing from the cache are read with one query"""
+    keys = {
+        get_notification_setting_cache_key(app_user_id): app_user_id
+        for app_user_id in set(app_user_ids)
+    }
     try:
-        company = CompanyEmployee.objects.get(app_user=app_user).company
-        manager = company.manager
-        if manager:
-            try:
-                manager_notification_setting = models.NotificationSetting.objects.get(user=manager)
-            except models.NotificationSetting.DoesNotExist:
-                return
-
-            if manager_notification_setting.is_allowed:
-                action_to_attr_mapping = {
-                    "add_as_contact": "add_as_contact",
-                    "add_to_load": "add_to_load",
-                    "got_offer": "got_offer",
-                    "offer_updated": "offer_updated",
-                    "add_as_shipment_admin": "add_as_shipment_admin",
-                    "load_status_changed": "load_status_changed",
-                    "RC_approved": "RC_approved",
-                    "assign_carrier": "load_status_changed",
-                }
-
-                message, url = get_notification_msg_and_url_for_manager(
-                    action, load, shipment, app_user, sender
-                )
-                if action in action_to_attr_mapping and getattr(
-                    manager_notification_setting, action_to_attr_mapping[action]
-                ):
-                    send_notification(manager, message, url)
-    except CompanyEmployee.DoesNotExist:
+        cached = cache.get_many(keys)
+    except Exception as e:
+        # the settings are read from the database while the cache is unavailable
+        print(f"Unexpected {e=}, {type(e)=}")
+        cached = {}
+    notification_settings = {
+        notification_setting.user_id: notification_setting
+        for notification_setting in cached.values()
+    }
+    missing = [app_user_id for key, app_user_id in keys.items() if key not in cached]
+    if not missing:
+        return notification_settings
+
+    found = {
+        notification_setting.user_id: notification_setting
+        for notification_setting in models.NotificationSetting.objects.filter(user__in=missing)
+    }
+    try:
+        cache.set_many(
+            {
+                get_notification_setting_cache_key(app_user_id): notification_setting
+                for app_user_id, notification_setting in found.items()
+            },
+            NOTIFICATION_SETTINGS_CACHE_TIMEOUT,
+        )
+    except Exception as e:
+        print(f"Unexpected {e=}, {type(e)=}")
+    notification_settings.update(found)
+    return notification_settings
+
+
+def forget_notification_setting(app_user_id):
+    try:
+        cache.delete(get_notification_setting_cache_key(app_user_id))
+    except Exception as e:
+        print(f"Unexpected {e=}, {type(e)=}")
+
+
+def get_notification_group(app_user_id):
+    return f"notifications_{app_user_id}"
+
+
+def get_manager_notification_group(manager_id):
+    return f"manager_notifications_{manager_id}"
+
+
+def push_notifications(notifications, managers):
+    """Push new notifications to the websockets of their users, and the manager view of them to their managers
+
+    `managers` maps app user ids to the manager of their company.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not notifications:
         return
+    messages = []
+    for notification in notifications:
+        messages.append(
+            (
+                get_notification_group(notification.user_id),
+                {
+                    "type": "notification.created",
+                    "kind": "notification",
+                    "notification": serializers.NotificationSerializer(notification).data,
+                },
+            )
+        )
+        manager = managers.get(notification.user_id)
+        if manager is not None:
+            messages.append(
+                (
+                    get_manager_notification_group(manager.id),
+                    {
+                        "type": "notification.created",
+                        "kind": "manager_notification",
+                        "notification": serializers.ManagerNotificationSerializer(
+                            notification
+                        ).data,
+                    },
+                )
+            )
+
+    async def send_messages():
+        # a single event loop round trip for the whole batch, the sends run concurrently
+        return await asyncio.gather(
+            *[channel_layer.group_send(group, message) for group, message in messages],
+            return_exceptions=True,
+        )
+
+    try:
+        results = async_to_sync(send_messages)()
+    except Exception as e:
+        results = [e]
+    for e in results:
+        if isinstance(e, Exception):
+            # the clients that missed the push get the notification when they resume or list them
+            print(f"Unexpected {e=}, {type(e)=}")
 
-def send_notification(app_user: AppUser, message, url=None):
-    """Send the notification to user's preferred method(s)"""
-    notification_setting = models.NotificationSetting.objects.get(user=app_user)
 
-    if notification_setting.methods == "none":
-        return False
-    elif notification_setting.methods == "email":
-        trigger_send_email_notification(
+def get_notification_deliveries(
+    app_user: AppUser,
+    notification_setting: models.NotificationSetting,
+    message,
+    url=None,
+    coalesce_key="",
+):
+    """Outbox rows sending the notification to user's preferred method(s), the deliver_notifications workers send them
+
+    The rows of digest users are due at the end of their digest window, see schedule_digest_deliveries.
+    """
+    channels = {
+        "none": [],
+        "email": ["email"],
+        "sms": ["sms"],
+        "both": ["email", "sms"],
+    }[notification_setting.methods]
+    if "sms" in channels and not app_user.phone_number_e164:
+        print("Invalid phone number format.")
+        channels.remove("sms")
+
+    digest = notification_setting.delivery_mode == "digest"
+    deliveries = [
+        models.NotificationDelivery(
+            user=app_user,
+            channel=channel,
             message=message,
-            to=app_user.user.email,
-            subject="FreightSlayer Notification",
-            template="send_notification.html",
             url=url,
+            digest=digest,
+            coalesce_key=coalesce_key if digest else "",
+        )
+        for channel in channels
+    ]
+    for delivery in deliveries:
+        # read by schedule_digest_deliveries, not stored
+        delivery.digest_window = notification_setting.digest_window
+    return deliveries
+
+
+def schedule_digest_deliveries(deliveries):
+    """Sets when the digest deliveries are due, and drops the pending ones they coalesce
+
+    A digest delivery joins the pending digest of its user and channel, or opens a new one ending after the
+    user's digest window, so the deliver_notifications workers claim and send the whole window at once.
+    A delivery with a coalesce key replaces the pending digest deliveries of the same user, channel and key.
+    Returns the deliveries to insert.
+    """
+    digest_deliveries = [delivery for delivery in deliveries if delivery.digest]
+    if not digest_deliveries:
+        return deliveries
+
+    pending = models.NotificationDelivery.objects.filter(
+        status="pending",
+        digest=True,
+        attempts=0,
+        user__in={delivery.user_id for delivery in digest_deliveries},
+    )
+    windows = {
+        (window["user"], window["channel"]): window["due"]
+        for window in pending.values("user", "channel").annotate(due=Min("next_attempt_at"))
+    }
+    now = timezone.now()
+    latest = {}
+    for delivery in digest_deliveries:
+        key = (delivery.user_id, delivery.channel)
+        if key not in windows:
+            windows[key] = now + timedelta(minutes=delivery.digest_window)
+        delivery.next_attempt_at = windows[key]
+        if delivery.coalesce_key:
+            latest[key + (delivery.coalesce_key,)] = delivery
+
+    if latest:
+        coalesced = Q()
+        for user_id, channel, coalesce_key in latest:
+            coalesced |= Q(user=user_id, channel=channel, coalesce_key=coalesce_key)
+        pending.filter(coalesced).delete()
+    return [
+        delivery
+        for delivery in deliveries
+        if not delivery.coalesce_key
+        or latest[(delivery.user_id, delivery.channel, delivery.coalesce_key)] is delivery
+    ]
+
+
+def claim_notification_deliveries(channel, limit, worker):
+    """Claims the due deliveries of a channel for a worker, a delivery claimed by a dead worker is due again after a timeout
+
+    A digest is claimed whole, with every due digest delivery of its user and channel, so the batch can go
+    over the limit by the rest of the digests it reached.
+    """
+    now = timezone.now()
+    due = Q(status="pending", next_attempt_at__lte=now) | Q(
+        status="sending",
+        claimed_at__lt=now - timedelta(seconds=NOTIFICATION_DELIVERY_CLAIM_TIMEOUT),
+    )
+    due_deliveries = list(
+        models.NotificationDelivery.objects.filter(due, channel=channel)
+        .order_by("next_attempt_at")
+        .values_list("id", "digest", "user")[:limit]
+    )
+    if not due_deliveries:
+        return []
+    ids = [delivery_id for delivery_id, digest, _ in due_deliveries if not digest]
+    digest_users = {user_id for _, digest, user_id in due_deliveries if digest}
+    # the due filter is checked again by the update, a delivery claimed by another worker in the meantime is skipped
+    models.NotificationDelivery.objects.filter(due, channel=channel).filter(
+        Q(id__in=ids) | Q(digest=True, user__in=digest_users)
+    ).update(status="sending", claimed_by=worker, claimed_at=now)
+    return list(
+        models.NotificationDelivery.objects.filter(
+            claimed_by=worker, status="sending"
+        ).select_related("user__user")
+    )
+
+
+def group_notification_deliveries(deliveries):
+    """Groups the digest deliveries of the same user, each other delivery is a group of its own"""
+    groups = []
+    digests = {}
+    for delivery in sorted(deliveries, key=lambda delivery: delivery.id):
+        if not delivery.digest:
+            groups.append([delivery])
+        elif delivery.user_id in digests:
+            digests[delivery.user_id].append(delivery)
+        else:
+            digests[delivery.user_id] = [delivery]
+            groups.append(digests[delivery.user_id])
+    return groups
+
+
+def deliver_notifications(deliveries):
+    """Send claimed deliveries of a channel, the messages of the batch share one SMTP session or HTTP session
+
+    The digest deliveries of a user are sent as one summary message, they all get the result of that message.
+    """
+    if not deliveries:
+        return []
+    groups = group_notification_deliveries(deliveries)
+    if deliveries[0].channel == "email":
+        errors = send_emails(
+            [
+                build_notification_email(
+                    message=group[0].message,
+                    to=group[0].user.user.email,
+                    subject="FreightSlayer Notification",
+                    template="send_notification.html",
+                    url=group[0].url,
+                )
+                if len(group) == 1
+                else build_notification_digest_email(group[0].user.user.email, group)
+                for group in groups
+            ]
         )
-    elif notification_setting.methods == "sms":
-        trigger_send_sms_notification(
-            app_user=app_user,
-            sid=TWILIO_ACCOUNT_SID,
-            token=TWILIO_AUTH_TOKEN,
-            phone_number=TWILIO_PHONE_NUMBER,
-            message=f"Hey {app_user.user.username}, " + message,
+    else:
+        errors = send_sms_messages(
+            [
+                (
+                    group[0].user.phone_number_e164,
+                    f"Hey {group[0].user.user.username}, " + group[0].message
+                    if len(group) == 1
+                    else get_notification_digest_sms(group),
+                )
+                for group in groups
+            ]
         )
-    elif notification_setting.methods == "both":
-        trigger_send_email_notification(
-            message=message,
-            to=app_user.user.email,
-            subject="FreightSlayer Notification",
-            template="send_notification.html",
-            url=url,
+
+    return [
+        record_delivery_result(delivery, error)
+        for group, error in zip(groups, errors)
+        for delivery in group
+    ]
+
+
+def record_delivery_result(delivery: models.NotificationDelivery, error=None):
+    """Marks a delivery as sent, or schedules its retry with an exponential backoff"""
+    deliveries = models.NotificationDelivery.objects.filter(
+        id=delivery.id, claimed_by=delivery.claimed_by
+    )
+    attempts = delivery.attempts + 1
+    if error is None:
+        deliveries.update(
+            status="sent", attempts=attempts, last_error="", sent_at=timezone.now()
         )
-        trigger_send_sms_notification(
-            app_user=app_user,
-            sid=TWILIO_ACCOUNT_SID,
-            token=TWILIO_AUTH_TOKEN,
-            phone_number=TWILIO_PHONE_NUMBER,
-            message=f"Hey {app_user.user.username}, " + message,
+        return True
+
+    print(f"Unexpected {error=}, {type(error)=}")
+    if attempts >= NOTIFICATION_DELIVERY_MAX_ATTEMPTS:
+        deliveries.update(status="failed", attempts=attempts, last_error=str(error))
+    else:
+        # the jitter spreads the retries of deliveries that failed together, except a digest that is retried as a whole
+        backoff = NOTIFICATION_DELIVERY_BACKOFF * 2 ** (attempts - 1)
+        if not delivery.digest:
+            backoff *= random.uniform(0.5, 1.5)
+        deliveries.update(
+            status="pending",
+            attempts=attempts,
+            last_error=str(error),
+            claimed_by="",
+            next_attempt_at=timezone.now() + timedelta(seconds=backoff),
         )
+    return False
+
+
+APP_URL = f"https://{os.getenv('ENV', '').lower()}.freightslayer.com/login?redirect="
+
+
+class NotificationTemplate:
+    """A notification message and url compiled once, rendering them only reads the fields they use"""
+
+    formatter = string.Formatter()
+
+    def __init__(self, message, url):
+        self.message = message
+        self.url = APP_URL + url
+        self.fields = {
+            field
+            for text in (message, url)
+            for _, field, _, _ in self.formatter.parse(text)
+            if field
+        }
+
+    def render(self, load, shipment, app_user, sender, loads, roles):
+        context = {}
+        for field in self.fields:
+            if field == "sender":
+                context[field] = f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username})"
+            elif field == "employee":
+                context[field] = f"{app_user.user.first_name.capitalize()} {app_user.user.last_name.capitalize()}"
+            elif field == "roles":
+                if roles is None:
+                    roles = find_user_roles_in_a_load(load, app_user)
+                context[field] = ", ".join(roles)
+            elif field == "load_count":
+                context[field] = len(loads)
+            elif field.startswith("load_"):
+                context[field] = getattr(load, field[len("load_"):])
+            elif field.startswith("shipment_"):
+                context[field] = getattr(shipment, field[len("shipment_"):])
+        return self.message.format(**context), self.url.format(**context)
+
+
+CONTACT_URL = "/contact"
+LOAD_URL = "/load-details/{load_id}"
+SHIPMENT_URL = "/shipment-details/{shipment_id}"
+LOAD_STATUS_CHANGED_MESSAGE = "Kindly be informed that there has been a recent update regarding the load '{load_name}' status,  and it is now {load_status}."
+RC_APPROVED_MESSAGE = "{sender} has approved the rate confirmation for the load '{load_name}'."
+
+# notification action => template of the user's notification and template of the manager's notification
+NOTIFICATION_TEMPLATES = {
+    "add_as_contact": (
+        NotificationTemplate("{sender} has added you as a contact.", CONTACT_URL),
+        NotificationTemplate("{sender} has added your employee ({employee}) as a contact.", CONTACT_URL),
+    ),
+    "add_to_load": (
+        NotificationTemplate("{sender} has added you to the load {load_name} as a {roles}", LOAD_URL),
+        NotificationTemplate(
+            "{sender} has added your employee ({employee}) to the load {load_name} as a {roles}", LOAD_URL
+        ),
+    ),
+    "add_to_loads": (
+        NotificationTemplate(
+            "{sender} has added you to {load_count} loads of the shipment '{shipment_name}'.", SHIPMENT_URL
+        ),
+        NotificationTemplate(
+            "{sender} has added your employee ({employee}) to {load_count} loads of the shipment '{shipment_name}'.",
+            SHIPMENT_URL,
+        ),
+    ),
+    "got_offer": (
+        NotificationTemplate("{sender} has sent you an offer for the load '{load_name}'.", LOAD_URL),
+        NotificationTemplate(
+            "{sender} has sent your employee ({employee}) an offer for the load '{load_name}'.", LOAD_URL
+        ),
+    ),
+    "offer_updated": (
+        NotificationTemplate("{sender} has countered your offer on the load '{load_name}'.", LOAD_URL),
+        NotificationTemplate(
+            "{sender} has countered your employee's ({employee}) offer on the load '{load_name}'.", LOAD_URL
+        ),
+    ),
+    "add_as_shipment_admin": (
+        NotificationTemplate(
+            "{sender} has added you as a shipment admin on shipment '{shipment_name}'.", SHIPMENT_URL
+        ),
+        NotificationTemplate(
+            "{sender} has added your employee ({employee}) as a shipment admin on shipment '{shipment_name}'.",
+            SHIPMENT_URL,
+        ),
+    ),
+    "load_status_changed": (
+        NotificationTemplate(LOAD_STATUS_CHANGED_MESSAGE, LOAD_URL),
+        NotificationTemplate(LOAD_STATUS_CHANGED_MESSAGE, LOAD_URL),
+    ),
+    "RC_approved": (
+        NotificationTemplate(RC_APPROVED_MESSAGE, LOAD_URL),
+        NotificationTemplate(RC_APPROVED_MESSAGE, LOAD_URL),
+    ),
+    "assign_carrier": (
+        NotificationTemplate("{sender} assigned you as a carrier for the load '{load_name}'.", LOAD_URL),
+        NotificationTemplate(
+            "{sender} assigned your employee ({employee}) as a carrier for the load '{load_name}'.", LOAD_URL
+        ),
+    ),
+}
 
 
 def get_notification_msg_and_url(
@@ -213,101 +603,28 @@ def get_notification_msg_and_url(
     shipment: Shipment = None,
     app_user: AppUser = None,
     sender: AppUser = None,
+    loads=None,
+    roles=None,
 ):
     """Get the notification message based on the action"""
-    environment = os.getenv("ENV").lower()
-    if action == "add_as_contact":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has added you as a contact.",
-            f"https://{environment}.freightslayer.com/login?redirect=/contact",
-        )
-    elif action == "add_to_load":
-        roles = find_user_roles_in_a_load(load, app_user)
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has added you to the load {load.name} as a {', '.join(roles)}",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "got_offer":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has sent you an offer for the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "offer_updated":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has countered your offer on the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "add_as_shipment_admin":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has added you as a shipment admin on shipment '{shipment.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/shipment-details/{shipment.id}",
-        )
-    elif action == "load_status_changed":
-        return (
-            f"Kindly be informed that there has been a recent update regarding the load '{load.name}' status,  and it is now {load.status}.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "RC_approved":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has approved the rate confirmation for the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "assign_carrier":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) assigned you as a carrier for the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    
+    if action not in NOTIFICATION_TEMPLATES:
+        return None
+    return NOTIFICATION_TEMPLATES[action][0].render(load, shipment, app_user, sender, loads, roles)
+
+
 def get_notification_msg_and_url_for_manager(
     action,
     load: Load = None,
     shipment: Shipment = None,
     app_user: AppUser = None,
     sender: AppUser = None,
+    loads=None,
+    roles=None,
 ):
-    """Get the notification message based on the action"""
-    environment = os.getenv("ENV").lower()
-    if action == "add_as_contact":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has added your employee ({app_user.user.first_name.capitalize()} {app_user.user.last_name.capitalize()}) as a contact.",
-            f"https://{environment}.freightslayer.com/login?redirect=/contact",
-        )
-    elif action == "add_to_load":
-        roles = find_user_roles_in_a_load(load, app_user)
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has added your employee ({app_user.user.first_name.capitalize()} {app_user.user.last_name.capitalize()}) to the load {load.name} as a {', '.join(roles)}",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "got_offer":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has sent your employee ({app_user.user.first_name.capitalize()} {app_user.user.last_name.capitalize()}) an offer for the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "offer_updated":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has countered your employee's ({app_user.user.first_name.capitalize()} {app_user.user.last_name.capitalize()}) offer on the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "add_as_shipment_admin":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has added your employee ({app_user.user.first_name.capitalize()} {app_user.user.last_name.capitalize()}) as a shipment admin on shipment '{shipment.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/shipment-details/{shipment.id}",
-        )
-    elif action == "load_status_changed":
-        return (
-            f"Kindly be informed that there has been a recent update regarding the load '{load.name}' status,  and it is now {load.status}.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "RC_approved":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) has approved the rate confirmation for the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
-    elif action == "assign_carrier":
-        return (
-            f"{sender.user.first_name.capitalize()} {sender.user.last_name.capitalize()} ({sender.user.username}) assigned your employee ({app_user.user.first_name.capitalize()} {app_user.user.last_name.capitalize()}) as a carrier for the load '{load.name}'.",
-            f"https://{environment}.freightslayer.com/login?redirect=/load-details/{load.id}",
-        )
+    """Get the notification message of the employee's manager based on the action"""
+    if action not in NOTIFICATION_TEMPLATES:
+        return None
+    return NOTIFICATION_TEMPLATES[action][1].render(load, shipment, app_user, sender, loads, roles)
 
 
 def find_user_roles_in_a_load(load: Load, app_user: AppUser):
@@ -1,19 +1,27 @@
 # Module imports
 import notifications.models as models
+import notifications.counters as counters
 import authentication.models as auth_models
 import notifications.serializers as serializers
 import authentication.permissions as permissions
+from chat.middleware import get_websocket_ticket
 
 # Django imports
 from django.shortcuts import get_object_or_404
 
 # DRF imports
 from rest_framework import status
+from rest_framework.views import APIView
 from rest_framework.response import Response
+import rest_framework.exceptions as exceptions
+from rest_framework import serializers as drf_serializers
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.mixins import UpdateModelMixin, RetrieveModelMixin, ListModelMixin
 
+# Third Party imports
+from drf_spectacular.utils import extend_schema, inline_serializer
+
 
 class NotificationSettingView(GenericAPIView, UpdateModelMixin, RetrieveModelMixin):
     permission_classes = (IsAuthenticated, permissions.IsAppUser)
@@ -97,11 +105,105 @@ class UpdateNotificationView(GenericAPIView, UpdateModelMixin):
         if instance.user != app_user:
             return Response(status=status.HTTP_403_FORBIDDEN)
 
+        was_seen = instance.seen
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        if instance.seen != was_seen:
+            counters.change_unread_counters(
+                user_deltas={instance.user_id: -1 if instance.seen else 1}
+            )
 
         if getattr(instance, "_prefetched_objects_cache", None):
             instance._prefetched_objects_cache = {}
 
         return Response(serializer.data)
+
+
+class BulkSeenNotificationView(APIView):
+    permission_classes = (IsAuthenticated, permissions.IsAppUser)
+
+    @extend_schema(
+        request=serializers.NotificationBulkSeenSerializer,
+        responses={
+            200: inline_serializer(
+                name="BulkSeenNotification",
+                fields={"updated": drf_serializers.IntegerField()},
+            )
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        """
+        Mark notifications as seen
+
+            Marks the listed notifications, or every notification up to an id, as seen at once
+
+            **Example**
+                >>> ids: [1, 2, 3]
+                >>> up_to: 3
+        """
+        serializer = serializers.NotificationBulkSeenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        app_user = permissions.get_request_app_user(request)
+
+        notifications = models.Notification.objects.filter(user=app_user)
+        if "ids" in serializer.validated_data:
+            ids = serializer.validated_data["ids"]
+            if models.Notification.objects.filter(id__in=ids).exclude(user=app_user).exists():
+                raise exceptions.PermissionDenied(
+                    detail="You can only update your own notifications."
+                )
+            notifications = notifications.filter(id__in=ids)
+        else:
+            notifications = notifications.filter(id__lte=serializer.validated_data["up_to"])
+
+        updated = notifications.filter(seen=False).update(seen=True)
+        counters.change_unread_counters(user_deltas={app_user.id: -updated})
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+
+class UnreadNotificationCountView(APIView):
+    permission_classes = (IsAuthenticated, permissions.IsAppUser)
+
+    @extend_schema(
+        responses={
+            200: inline_serializer(
+                name="UnreadNotificationCount",
+                fields={
+                    "unread": drf_serializers.IntegerField(),
+                    "manager_unread": drf_serializers.IntegerField(required=False),
+                },
+            )
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Count the unread notifications
+
+            Returns the number of unread notifications of the user, and for a **Company Manager** the number of
+            notifications of their employees they did not see yet
+        """
+        app_user = permissions.get_request_app_user(request)
+        return Response(counters.get_unread_counts(app_user), status=status.HTTP_200_OK)
+
+
+class WebsocketTicketView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=None,
+        responses={
+            200: inline_serializer(
+                name="WebsocketTicket",
+                fields={"ticket": drf_serializers.CharField()},
+            )
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        """
+        Get a websocket ticket
+
+            Returns a ticket valid for 30 seconds to open the notifications websocket with `?ticket=<ticket>`,
+            for clients that can not send the auth cookie with it
+        """
+        return Response({"ticket": get_websocket_ticket(request.user)}, status=status.HTTP_200_OK)
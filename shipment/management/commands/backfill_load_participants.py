@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+import shipment.utilities as utils
+
+
+class Command(BaseCommand):
+    help = "Fills the load participants table from the parties of the existing loads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of loads handled per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        created = utils.backfill_load_participants(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Added {created} load participants."))
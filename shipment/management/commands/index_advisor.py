@@ -0,0 +1,110 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+import logs.models as log_models
+import shipment.models as models
+import shipment.utilities as utils
+import authentication.models as auth_models
+import notifications.models as notif_models
+
+# plan lines reading a whole table, for postgres and sqlite
+SEQUENTIAL_SCAN = re.compile(r"Seq Scan on (\w+)|^.*SCAN (\w+)(?!.* USING (COVERING )?INDEX)")
+
+
+def get_hot_queries(app_user, load):
+    """Returns the querysets behind the most requested endpoints, sampled on an existing app user and load."""
+    company_employee = auth_models.CompanyEmployee.objects.filter(
+        app_user=app_user).first()
+    company = company_employee.company_id if company_employee else None
+    return {
+        "visible loads": models.Load.objects.filter(utils.get_load_access_filter(app_user))
+        .exclude(status="Canceled")
+        .order_by("-id")[:5],
+        "customer loads by status": models.Load.objects.filter(
+            customer=load.customer_id, status=load.status
+        ).order_by("-id")[:5],
+        "dispatcher loads by status": models.Load.objects.filter(
+            dispatcher=load.dispatcher_id, status=load.status
+        ).order_by("-id")[:5],
+        "carrier loads by status": models.Load.objects.filter(
+            carrier=load.carrier_id, status=load.status
+        ).order_by("-id")[:5],
+        "shipment loads": models.Load.objects.filter(shipment=load.shipment_id).order_by("-id")[:5],
+        "load offers": models.Offer.objects.filter(
+            load=load.id, to="carrier", party_2=app_user.id
+        ),
+        "accepted offers": models.Offer.objects.filter(
+            load=load.id, to="customer", status="Accepted"
+        ),
+        "unread notifications": notif_models.Notification.objects.filter(
+            user=app_user.id, seen=False
+        ).order_by("-id")[:5],
+        "manager unread notifications": notif_models.Notification.objects.filter(
+            user=app_user.id, manager_seen=False
+        ).order_by("-id")[:5],
+        "company logs": log_models.Log.objects.filter(
+            app_user__companyemployee__company=company
+        ).order_by("-timestamp")[:5],
+        "dashboard rollup": models.LoadStatusRollup.objects.filter(
+            app_user=app_user.id, role=utils.get_load_access_role(app_user)
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Explains the hot queries of the project and reports the ones reading whole tables. "
+        "Small tables are often scanned on purpose, run it against a database with production sized tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="App user to sample the queries with.")
+        parser.add_argument(
+            "--verbose-plans", action="store_true", help="Print every query plan."
+        )
+        parser.add_argument(
+            "--fail-on-scan",
+            action="store_true",
+            help="Exit with an error when a sequential scan is found.",
+        )
+
+    def handle(self, *args, **options):
+        app_users = auth_models.AppUser.objects.all()
+        if options["username"]:
+            app_users = app_users.filter(user__username=options["username"])
+        app_user = app_users.first()
+        load = models.Load.objects.order_by("-id").first()
+        if app_user is None or load is None:
+            raise CommandError("At least one app user and one load are needed to sample the queries.")
+
+        explain_options = {}
+        if connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+
+        scans = 0
+        for name, queryset in get_hot_queries(app_user, load).items():
+            plan = queryset.explain(**explain_options)
+            tables = sorted(
+                {
+                    table
+                    for line in plan.splitlines()
+                    for match in [SEQUENTIAL_SCAN.search(line)]
+                    if match
+                    for table in match.groups()[:2]
+                    if table
+                }
+            )
+            if tables:
+                scans += 1
+                self.stdout.write(
+                    self.style.WARNING(f"{name}: sequential scan on {', '.join(tables)}")
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{name}: indexed"))
+            if options["verbose_plans"] or tables:
+                self.stdout.write(plan)
+
+        if scans and options["fail_on_scan"]:
+            raise CommandError(f"{scans} hot queries read whole tables.")
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+import shipment.models as models
+import shipment.utilities as utils
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the load status rollup used by the dashboards from the loads table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the rollup against live counts and report the differences.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            rows = utils.rebuild_load_status_rollup()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup rows."))
+            return
+
+        expected = utils.count_load_status_rollup()
+        stored = {}
+        for rollup in models.LoadStatusRollup.objects.filter(count__gt=0).iterator():
+            key = tuple(getattr(rollup, field) for field in utils.LOAD_ROLLUP_KEY)
+            stored[key] = rollup.count
+
+        mismatches = [
+            (key, stored.get(key, 0), count)
+            for key, count in expected.items()
+            if stored.get(key, 0) != count
+        ]
+        mismatches += [
+            (key, count, 0) for key, count in stored.items() if key not in expected
+        ]
+        for key, found, count in mismatches:
+            self.stdout.write(
+                f"{dict(zip(utils.LOAD_ROLLUP_KEY, key))}: stored {found}, expected {count}"
+            )
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} rollup rows are out of date.")
+        self.stdout.write(self.style.SUCCESS("The rollup matches the loads."))
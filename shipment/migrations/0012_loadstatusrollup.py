@@ -0,0 +1,149 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:35
+
+import itertools
+from collections import Counter
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+# the rollup as it was laid out by this migration, kept here so later changes to shipment/utilities.py
+# do not change what it does
+LOAD_PARTY_ROLES = {
+    "shipment party": ["customer__app_user", "shipper__app_user", "consignee__app_user"],
+    "dispatcher": ["dispatcher__app_user"],
+    "carrier": ["carrier__app_user"],
+}
+LOAD_SNAPSHOT_FIELDS = [
+    "created_at",
+    "created_by",
+    "status",
+    "load_type",
+    *[field for fields in LOAD_PARTY_ROLES.values() for field in fields],
+]
+LOAD_ROLLUP_KEY = ["app_user_id", "role", "company_id", "year", "month", "status", "load_type"]
+
+
+def get_load_participants(load_row):
+    participants = {(load_row["created_by"], "creator")}
+    for role, fields in LOAD_PARTY_ROLES.items():
+        for field in fields:
+            if load_row[field] is not None:
+                participants.add((load_row[field], role))
+    return participants
+
+
+def get_load_rollup_keys(load_row, employers):
+    created_at = timezone.localtime(load_row["created_at"])
+    bucket = (created_at.year, created_at.month, load_row["status"], load_row["load_type"])
+    participants = get_load_participants(load_row)
+    views = {(load_row["created_by"], role) for role in ["", *LOAD_PARTY_ROLES]}
+    views.update(
+        (app_user, role) for app_user, role in participants if role != "creator"
+    )
+    companies = {
+        employers[app_user] for app_user, _ in participants if app_user in employers
+    }
+    keys = {(app_user, role, None, *bucket) for app_user, role in views}
+    keys.update((None, "", company, *bucket) for company in companies)
+    return keys
+
+
+def fill_load_status_rollup(apps, schema_editor):
+    # the dashboards read the rollup only, it is counted before they are deployed
+    Load = apps.get_model("shipment", "Load")
+    LoadStatusRollup = apps.get_model("shipment", "LoadStatusRollup")
+    CompanyEmployee = apps.get_model("authentication", "CompanyEmployee")
+    load_rows = Load.objects.values(*LOAD_SNAPSHOT_FIELDS).iterator(chunk_size=2000)
+    counts = Counter()
+    for batch in iter(lambda: list(itertools.islice(load_rows, 2000)), []):
+        app_users = {
+            app_user for load_row in batch for app_user, _ in get_load_participants(load_row)
+        }
+        employers = dict(
+            CompanyEmployee.objects.filter(app_user__in=app_users).values_list(
+                "app_user", "company"
+            )
+        )
+        for load_row in batch:
+            counts.update(get_load_rollup_keys(load_row, employers))
+    LoadStatusRollup.objects.bulk_create(
+        [
+            LoadStatusRollup(**dict(zip(LOAD_ROLLUP_KEY, key)), count=count)
+            for key, count in counts.items()
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0020_alter_company_scac"),
+        ("shipment", "0011_load_actual_delivery_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LoadStatusRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("role", models.CharField(blank=True, default="", max_length=14)),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("status", models.CharField(max_length=20)),
+                ("load_type", models.CharField(max_length=3)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "app_user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="authentication.appuser",
+                    ),
+                ),
+                (
+                    "company",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="authentication.company",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="loadstatusrollup",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(("app_user__isnull", False), ("company__isnull", True)),
+                    models.Q(("app_user__isnull", True), ("company__isnull", False)),
+                    _connector="OR",
+                ),
+                name="load status rollup belongs to either an app user or a company",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="loadstatusrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("company__isnull", True)),
+                fields=("app_user", "role", "year", "month", "status", "load_type"),
+                name="unique app user load status rollup",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="loadstatusrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("app_user__isnull", True)),
+                fields=("company", "year", "month", "status", "load_type"),
+                name="unique company load status rollup",
+            ),
+        ),
+        migrations.RunPython(fill_load_status_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# the parties of a load as they were when the participants were added, kept here so later changes to
+# shipment/utilities.py do not change what this migration does
+LOAD_PARTY_ROLES = {
+    "shipment party": ["customer__app_user", "shipper__app_user", "consignee__app_user"],
+    "dispatcher": ["dispatcher__app_user"],
+    "carrier": ["carrier__app_user"],
+}
+LOAD_PARTY_FIELDS = [field for fields in LOAD_PARTY_ROLES.values() for field in fields]
+
+
+def get_load_participants(load_row):
+    participants = {(load_row["created_by"], "creator")}
+    for role, fields in LOAD_PARTY_ROLES.items():
+        for field in fields:
+            if load_row[field] is not None:
+                participants.add((load_row[field], role))
+    return participants
+
+
+def fill_load_participants(apps, schema_editor):
+    Load = apps.get_model("shipment", "Load")
+    LoadParticipant = apps.get_model("shipment", "LoadParticipant")
+    participants = []
+    for load_row in Load.objects.values("id", "created_by", *LOAD_PARTY_FIELDS).iterator(chunk_size=2000):
+        participants += [
+            LoadParticipant(load_id=load_row["id"], app_user_id=app_user, role=role)
+            for app_user, role in get_load_participants(load_row)
+        ]
+        if len(participants) >= 2000:
+            LoadParticipant.objects.bulk_create(participants)
+            participants = []
+    LoadParticipant.objects.bulk_create(participants)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0020_alter_company_scac"),
+        ("shipment", "0012_loadstatusrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LoadParticipant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[
+                            ("creator", "creator"),
+                            ("shipment party", "shipment party"),
+                            ("dispatcher", "dispatcher"),
+                            ("carrier", "carrier"),
+                        ],
+                        max_length=14,
+                    ),
+                ),
+                (
+                    "app_user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="authentication.appuser",
+                    ),
+                ),
+                (
+                    "load",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="participants",
+                        to="shipment.load",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["app_user", "-load"],
+                        name="participant_app_user_load_idx",
+                    )
+                ],
+                "unique_together": {("load", "app_user", "role")},
+            },
+        ),
+        migrations.RunPython(fill_load_participants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the indexes are built without locking the table against writes
+    atomic = False
+
+    dependencies = [
+        ("shipment", "0013_loadparticipant"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="load",
+            index=models.Index(
+                fields=["customer", "status", "-id"], name="load_customer_status_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="load",
+            index=models.Index(
+                fields=["dispatcher", "status", "-id"],
+                name="load_dispatcher_status_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="load",
+            index=models.Index(
+                condition=models.Q(("carrier__isnull", False)),
+                fields=["carrier", "status", "-id"],
+                name="load_carrier_status_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="load",
+            index=models.Index(fields=["shipment", "-id"], name="load_shipment_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="offer",
+            index=models.Index(
+                fields=["load", "to", "party_2"], name="offer_load_to_party_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="offer",
+            index=models.Index(
+                condition=models.Q(("status", "Accepted")),
+                fields=["load", "to"],
+                name="offer_accepted_idx",
+            ),
+        ),
+    ]
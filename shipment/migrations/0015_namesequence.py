@@ -0,0 +1,22 @@
+# Generated by Django 4.2.5 on 2026-10-17 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shipment", "0014_load_load_customer_status_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NameSequence",
+            fields=[
+                (
+                    "prefix",
+                    models.CharField(max_length=5, primary_key=True, serialize=False),
+                ),
+                ("next_value", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,158 @@
+# Generated by Django 4.2.5 on 2026-10-17 07:27
+
+import itertools
+from collections import Counter
+from django.db import migrations, models
+from django.db.models import F, Q
+from django.utils import timezone
+
+# the rollup as it was laid out by this migration, kept here so later changes to shipment/utilities.py
+# do not change what it does
+HEAVY_HAUL_WEIGHT = 80000
+LOAD_PARTY_ROLES = {
+    "shipment party": ["customer__app_user", "shipper__app_user", "consignee__app_user"],
+    "dispatcher": ["dispatcher__app_user"],
+    "carrier": ["carrier__app_user"],
+}
+LOAD_SNAPSHOT_FIELDS = [
+    "created_at",
+    "created_by",
+    "status",
+    "load_type",
+    *[field for fields in LOAD_PARTY_ROLES.values() for field in fields],
+]
+LOAD_ROLLUP_KEY = [
+    "app_user_id", "role", "company_id", "year", "month", "status", "load_type", "heavy_haul"
+]
+
+
+def get_load_participants(load_row):
+    participants = {(load_row["created_by"], "creator")}
+    for role, fields in LOAD_PARTY_ROLES.items():
+        for field in fields:
+            if load_row[field] is not None:
+                participants.add((load_row[field], role))
+    return participants
+
+
+def get_load_rollup_keys(load_row, employers, heavy_haul):
+    created_at = timezone.localtime(load_row["created_at"])
+    bucket = (
+        created_at.year, created_at.month, load_row["status"], load_row["load_type"], heavy_haul
+    )
+    participants = get_load_participants(load_row)
+    views = {(load_row["created_by"], role) for role in ["", *LOAD_PARTY_ROLES]}
+    views.update(
+        (app_user, role) for app_user, role in participants if role != "creator"
+    )
+    companies = {
+        employers[app_user] for app_user, _ in participants if app_user in employers
+    }
+    keys = {(app_user, role, None, *bucket) for app_user, role in views}
+    keys.update((None, "", company, *bucket) for company in companies)
+    return keys
+
+
+def move_heavy_haul_loads(apps, schema_editor):
+    # the existing rows count every load as not heavy haul, only the heavy loads are moved to their own rows
+    Load = apps.get_model("shipment", "Load")
+    LoadStatusRollup = apps.get_model("shipment", "LoadStatusRollup")
+    CompanyEmployee = apps.get_model("authentication", "CompanyEmployee")
+    load_rows = (
+        Load.objects.filter(weight__gte=HEAVY_HAUL_WEIGHT)
+        .values(*LOAD_SNAPSHOT_FIELDS)
+        .iterator(chunk_size=2000)
+    )
+    heavy_counts = Counter()
+    for batch in iter(lambda: list(itertools.islice(load_rows, 2000)), []):
+        app_users = {
+            app_user for load_row in batch for app_user, _ in get_load_participants(load_row)
+        }
+        employers = dict(
+            CompanyEmployee.objects.filter(app_user__in=app_users).values_list(
+                "app_user", "company"
+            )
+        )
+        for load_row in batch:
+            heavy_counts.update(get_load_rollup_keys(load_row, employers, True))
+
+    LoadStatusRollup.objects.bulk_create(
+        [
+            LoadStatusRollup(**dict(zip(LOAD_ROLLUP_KEY, key)), count=count)
+            for key, count in heavy_counts.items()
+        ],
+        batch_size=2000,
+    )
+    keys_by_count = {}
+    for key, count in heavy_counts.items():
+        keys_by_count.setdefault(count, []).append(key[:-1] + (False,))
+    for count, keys in keys_by_count.items():
+        for i in range(0, len(keys), 100):
+            query = Q()
+            for key in keys[i:i + 100]:
+                query |= Q(**dict(zip(LOAD_ROLLUP_KEY, key)))
+            LoadStatusRollup.objects.filter(query).update(count=F("count") - count)
+
+
+def merge_heavy_haul_rows(apps, schema_editor):
+    LoadStatusRollup = apps.get_model("shipment", "LoadStatusRollup")
+    heavy_rows = LoadStatusRollup.objects.filter(heavy_haul=True)
+    for row in heavy_rows.iterator():
+        key = {field: getattr(row, field) for field in LOAD_ROLLUP_KEY[:-1]}
+        rollup, _ = LoadStatusRollup.objects.get_or_create(**key, heavy_haul=False)
+        LoadStatusRollup.objects.filter(id=rollup.id).update(count=F("count") + row.count)
+    heavy_rows.delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shipment", "0015_namesequence"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="loadstatusrollup",
+            name="unique app user load status rollup",
+        ),
+        migrations.RemoveConstraint(
+            model_name="loadstatusrollup",
+            name="unique company load status rollup",
+        ),
+        migrations.AddField(
+            model_name="loadstatusrollup",
+            name="heavy_haul",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddConstraint(
+            model_name="loadstatusrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("company__isnull", True)),
+                fields=(
+                    "app_user",
+                    "role",
+                    "year",
+                    "month",
+                    "status",
+                    "load_type",
+                    "heavy_haul",
+                ),
+                name="unique app user load status rollup",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="loadstatusrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("app_user__isnull", True)),
+                fields=(
+                    "company",
+                    "year",
+                    "month",
+                    "status",
+                    "load_type",
+                    "heavy_haul",
+                ),
+                name="unique company load status rollup",
+            ),
+        ),
+        migrations.RunPython(move_heavy_haul_loads, merge_heavy_haul_rows),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from django.db.models import CheckConstraint, Q, F
+from django.db.models import CheckConstraint, UniqueConstraint, Q, F
 from authentication.models import (
     User,
     AppUser,
@@ -7,10 +7,64 @@ from authentication.models import (
     Dispatcher,
     Carrier,
     Address,
+    Company,
 )
 
 
-class Facility(models.Model):
+class ChangeTrackingMixin:
+    """Keeps the column values an instance was loaded with, its saves record the columns they changed
+
+    The values are the raw ones, ids for the foreign keys, so diffing them costs no query. After a save,
+    `saved_changes` holds the old and new values of the changed columns keyed by field name.
+    """
+
+    @property
+    def saved_changes(self):
+        # fresh dicts for an instance that was not saved yet, so no two instances share them
+        return getattr(self, "_saved_changes", ({}, {}))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # field_names are the attnames of the loaded columns, the deferred ones are missing
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _tracked_fields(self, update_fields=None):
+        return [
+            field
+            for field in self._meta.concrete_fields
+            if not getattr(field, "auto_now", False)
+            and field.attname in self.__dict__
+            and (update_fields is None or field.name in update_fields or field.attname in update_fields)
+        ]
+
+    def get_changes(self, update_fields=None):
+        """Returns the old and new values of the columns changed since the instance was loaded or saved"""
+        loaded = getattr(self, "_loaded_values", {})
+        old = {}
+        new = {}
+        for field in self._tracked_fields(update_fields):
+            value = getattr(self, field.attname)
+            if field.attname in loaded and loaded[field.attname] != value:
+                old[field.name] = loaded[field.attname]
+                new[field.name] = value
+        return old, new
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        changes = self.get_changes(update_fields)
+        super().save(*args, **kwargs)
+        self._saved_changes = changes
+        loaded = getattr(self, "_loaded_values", {})
+        loaded.update(
+            (field.attname, getattr(self, field.attname))
+            for field in self._tracked_fields(update_fields)
+        )
+        self._loaded_values = loaded
+
+
+class Facility(ChangeTrackingMixin, models.Model):
     owner = models.ForeignKey(
         to=User, null=False, blank=False, on_delete=models.CASCADE
     )
@@ -32,7 +86,7 @@ class Trailer(models.Model):
     max_width = models.FloatField()
 
 
-class Shipment(models.Model):
+class Shipment(ChangeTrackingMixin, models.Model):
     created_by = models.ForeignKey(
         to=AppUser, null=False, on_delete=models.CASCADE, related_name="customer"
     )
@@ -45,7 +99,7 @@ class Shipment(models.Model):
         return self.name
 
 
-class Load(models.Model):
+class Load(ChangeTrackingMixin, models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(to=AppUser, null=False, on_delete=models.CASCADE)
     name = models.CharField(max_length=255, unique=True, null=False, blank=False)
@@ -126,6 +180,16 @@ class Load(models.Model):
                 name="pick up location and drop off location cannot be equal",
             ),
         ]
+        indexes = [
+            models.Index(fields=["customer", "status", "-id"], name="load_customer_status_idx"),
+            models.Index(fields=["dispatcher", "status", "-id"], name="load_dispatcher_status_idx"),
+            models.Index(
+                fields=["carrier", "status", "-id"],
+                condition=Q(carrier__isnull=False),
+                name="load_carrier_status_idx",
+            ),
+            models.Index(fields=["shipment", "-id"], name="load_shipment_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -143,7 +207,7 @@ class Contact(models.Model):
         unique_together = (("origin", "contact"),)
 
 
-class Offer(models.Model):
+class Offer(ChangeTrackingMixin, models.Model):
     party_1 = models.ForeignKey(
         to=Dispatcher, null=False, on_delete=models.CASCADE, related_name="bidder"
     )
@@ -173,6 +237,14 @@ class Offer(models.Model):
 
     class Meta:
         unique_together = (("party_1", "party_2", "load", "to"),)
+        indexes = [
+            models.Index(fields=["load", "to", "party_2"], name="offer_load_to_party_idx"),
+            models.Index(
+                fields=["load", "to"],
+                condition=Q(status="Accepted"),
+                name="offer_accepted_idx",
+            ),
+        ]
 
 
 class ShipmentAdmin(models.Model):
@@ -181,3 +253,71 @@ class ShipmentAdmin(models.Model):
 
     class Meta:
         unique_together = (("shipment", "admin"),)
+
+
+class LoadParticipant(models.Model):
+    """An app user taking part in a load, kept in sync with the load's parties to look up the loads of a user."""
+
+    load = models.ForeignKey(
+        to=Load, null=False, on_delete=models.CASCADE, related_name="participants"
+    )
+    app_user = models.ForeignKey(to=AppUser, null=False, on_delete=models.CASCADE)
+    role = models.CharField(
+        choices=[
+            ("creator", "creator"),
+            ("shipment party", "shipment party"),
+            ("dispatcher", "dispatcher"),
+            ("carrier", "carrier"),
+        ],
+        max_length=14,
+        null=False,
+    )
+
+    class Meta:
+        unique_together = (("load", "app_user", "role"),)
+        indexes = [
+            models.Index(fields=["app_user", "-load"], name="participant_app_user_load_idx"),
+        ]
+
+
+class LoadStatusRollup(models.Model):
+    """Number of loads per month, status, load type and heavy haul flag visible to an app user or a company.
+
+    App user rows are kept per dashboard role, an empty role holding the loads the user created.
+    """
+
+    app_user = models.ForeignKey(to=AppUser, null=True, on_delete=models.CASCADE)
+    role = models.CharField(max_length=14, blank=True, default="")
+    company = models.ForeignKey(to=Company, null=True, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField(null=False)
+    month = models.PositiveSmallIntegerField(null=False)
+    status = models.CharField(max_length=20, null=False)
+    load_type = models.CharField(max_length=3, null=False)
+    heavy_haul = models.BooleanField(null=False, default=False)
+    count = models.IntegerField(null=False, default=0)
+
+    class Meta:
+        constraints = [
+            CheckConstraint(
+                check=Q(app_user__isnull=False, company__isnull=True)
+                | Q(app_user__isnull=True, company__isnull=False),
+                name="load status rollup belongs to either an app user or a company",
+            ),
+            UniqueConstraint(
+                fields=["app_user", "role", "year", "month", "status", "load_type", "heavy_haul"],
+                condition=Q(company__isnull=True),
+                name="unique app user load status rollup",
+            ),
+            UniqueConstraint(
+                fields=["company", "year", "month", "status", "load_type", "heavy_haul"],
+                condition=Q(app_user__isnull=True),
+                name="unique company load status rollup",
+            ),
+        ]
+
+
+class NameSequence(models.Model):
+    """Next counter value of a name prefix, workers reserve blocks of values from it to name new rows."""
+
+    prefix = models.CharField(max_length=5, primary_key=True)
+    next_value = models.BigIntegerField(null=False, default=0)
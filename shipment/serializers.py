@@ -158,6 +158,29 @@ class LoadCreateRetrieveSerializer(serializers.ModelSerializer):
         return rep
 
 
+class LoadBulkRowSerializer(serializers.ModelSerializer):
+    """Validates the plain fields of a bulk upload row, the parties and facilities are checked by the view."""
+
+    class Meta:
+        model = models.Load
+        fields = [
+            "pick_up_date",
+            "delivery_date",
+            "length",
+            "width",
+            "height",
+            "weight",
+            "quantity",
+            "commodity",
+            "equipment",
+            "goods_info",
+            "load_type",
+        ]
+        extra_kwargs = {
+            "quantity": {"required": False},
+        }
+
+
 class ShipmentAdminSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.ShipmentAdmin
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 import shipment.models as models
-from shipment.utilities import send_notifications_to_load_parties
+import authentication.models as auth_models
+from shipment.utilities import (
+    send_notifications_to_load_parties,
+    move_employees_load_status_rollup,
+)
 from notifications.utilities import handle_notification
 
 
@@ -47,3 +51,37 @@ def offer_notification_handler(sender, instance: models.Offer, created, **kwargs
             load=instance.load,
             sender=instance.party_1.app_user,
         )
+
+
+@receiver(pre_save, sender=auth_models.CompanyEmployee)
+def remember_previous_employment(sender, instance: auth_models.CompanyEmployee, **kwargs):
+    # an employee row can be moved to another company or app user, the old one's loads are moved out of it
+    instance._previous_employment = (
+        auth_models.CompanyEmployee.objects.filter(pk=instance.pk)
+        .values_list("app_user", "company")
+        .first()
+        if instance.pk is not None
+        else None
+    )
+
+
+@receiver(post_save, sender=auth_models.CompanyEmployee)
+def company_employee_load_status_rollup_handler(
+    sender, instance: auth_models.CompanyEmployee, **kwargs
+):
+    companies = {instance.app_user_id: (None, instance.company_id)}
+    previous = getattr(instance, "_previous_employment", None)
+    if previous is not None:
+        previous_app_user, previous_company = previous
+        companies[previous_app_user] = (
+            previous_company,
+            companies.get(previous_app_user, (None, None))[1],
+        )
+    move_employees_load_status_rollup(companies)
+
+
+@receiver(post_delete, sender=auth_models.CompanyEmployee)
+def company_employee_deleted_load_status_rollup_handler(
+    sender, instance: auth_models.CompanyEmployee, **kwargs
+):
+    move_employees_load_status_rollup({instance.app_user_id: (instance.company_id, None)})
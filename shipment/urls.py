@@ -6,6 +6,7 @@ urlpatterns = [
     path("facility/<id>/", views.FacilityView.as_view()),
     path("load/", views.LoadView.as_view()),
     path("load/<id>/", views.LoadView.as_view()),
+    path("bulk-load/", views.BulkLoadView.as_view()),
     path("list-load/", views.ListLoadView.as_view()),
     path("load-details/<id>/", views.RetrieveLoadView.as_view()),
     path("contact/", views.ContactView.as_view()),
@@ -1,97 +1,141 @@
-import string, random
-from django.db.models import Q
+import io, csv, json, os, string, itertools, threading, calendar
+from collections import Counter
+from datetime import date, datetime
+from django.db import connection, transaction
+from django.db.models import Q, F, Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
 import shipment.models as models
 import authentication.models as auth_models
 import rest_framework.exceptions as exceptions
-from notifications.utilities import handle_notification
+from notifications.utilities import handle_notifications
+from authentication.utilities import get_app_user_with_roles
 
 
-def get_shipment_party_by_username(username):
-    try:
-        user = auth_models.User.objects.get(username=username)
-        user = auth_models.AppUser.objects.get(user=user.id)
-        user = auth_models.ShipmentParty.objects.get(app_user=user.id)
-        return user
-    except (
-        auth_models.User.DoesNotExist,
-        auth_models.AppUser.DoesNotExist,
-        auth_models.ShipmentParty.DoesNotExist,
-    ):
+def get_shipment_party_by_username(username, request=None):
+    app_user = get_app_user_with_roles(username, request=request)
+    if app_user is None or not hasattr(app_user, "shipmentparty"):
         raise exceptions.NotFound(detail="shipment party does not exist.")
-    except BaseException as e:
-        print(f"Unexpected {e=}, {type(e)=}")
-        raise exceptions.ParseError(detail=f"{e.args[0]}")
+    return app_user.shipmentparty
 
 
-def get_carrier_by_username(username):
-    try:
-        user = auth_models.User.objects.get(username=username)
-        user = auth_models.AppUser.objects.get(user=user.id)
-        user = auth_models.Carrier.objects.get(app_user=user.id)
-        return user
-    except (
-        auth_models.User.DoesNotExist,
-        auth_models.AppUser.DoesNotExist,
-        auth_models.Carrier.DoesNotExist,
-    ):
+def get_carrier_by_username(username, request=None):
+    app_user = get_app_user_with_roles(username, request=request)
+    if app_user is None or not hasattr(app_user, "carrier"):
         raise exceptions.NotFound(detail="carrier does not exist.")
-    except BaseException as e:
-        print(f"Unexpected {e=}, {type(e)=}")
-        raise exceptions.ParseError(detail=f"{e.args[0]}")
+    return app_user.carrier
 
 
-def get_dispatcher_by_username(username):
-    try:
-        user = auth_models.User.objects.get(username=username)
-        user = auth_models.AppUser.objects.get(user=user.id)
-        user = auth_models.Dispatcher.objects.get(app_user=user.id)
-        return user
-    except (
-        auth_models.User.DoesNotExist,
-        auth_models.AppUser.DoesNotExist,
-        auth_models.Dispatcher.DoesNotExist,
-    ):
+def get_dispatcher_by_username(username, request=None):
+    app_user = get_app_user_with_roles(username, request=request)
+    if app_user is None or not hasattr(app_user, "dispatcher"):
         raise exceptions.NotFound(detail="dispatcher does not exist.")
-    except BaseException as e:
-        print(f"Unexpected {e=}, {type(e)=}")
-        raise exceptions.ParseError(detail=f"{e.args[0]}")
+    return app_user.dispatcher
 
 
-def get_app_user_by_username(username):
-    try:
-        user = auth_models.User.objects.get(username=username)
-        user = auth_models.AppUser.objects.get(user=user.id)
-        return user
-    except (auth_models.User.DoesNotExist, auth_models.AppUser.DoesNotExist):
+def get_app_user_by_username(username, request=None):
+    app_user = get_app_user_with_roles(username, request=request)
+    if app_user is None:
         raise exceptions.NotFound(detail="app user does not exist.")
-    except BaseException as e:
-        print(f"Unexpected {e=}, {type(e)=}")
-        raise exceptions.ParseError(detail=f"{e.args[0]}")
+    return app_user
+
+
+NAME_ALPHABET = string.digits + string.ascii_uppercase
+NAME_BLOCK_SIZE = 100
+
+
+class NameAllocator:
+    """Hands out unique names like `L-4K2Z9Q` without retrying inserts.
+
+    Every name comes from a counter kept in NameSequence, the counter value is scrambled with a
+    bijection over the name space so the names keep looking random. Each process reserves blocks
+    of values and hands them out from memory, so concurrent workers never share a name nor wait
+    on each other for every insert.
+    """
+
+    def __init__(self, model, prefix, length, multiplier, offset):
+        self.model = model
+        self.prefix = prefix
+        self.length = length
+        self.size = len(NAME_ALPHABET) ** length
+        # a multiplier coprime with the size of the name space maps every value to a distinct name
+        self.multiplier = multiplier
+        self.offset = offset
+        self.values = iter(())
+        self.lock = threading.Lock()
+
+    def allocate(self, count=1):
+        """Returns `count` unused names.
+
+        Names reserved inside a transaction are only kept for that transaction, its rollback
+        releases the block so it cannot be handed out twice.
+        """
+        names = []
+        reserved_in_transaction = False
+        with self.lock:
+            while len(names) < count:
+                candidates = list(itertools.islice(self.values, count - len(names)))
+                if not candidates:
+                    reserved_in_transaction = transaction.get_connection().in_atomic_block
+                    self._reserve(max(count - len(names), NAME_BLOCK_SIZE))
+                    continue
+                candidates = [self._format(value) for value in candidates]
+                # names given before the allocator existed were random, skip the ones already taken
+                taken = set(
+                    self.model.objects.filter(name__in=candidates).values_list("name", flat=True)
+                )
+                names += [name for name in candidates if name not in taken]
+            if reserved_in_transaction:
+                self.values = iter(())
+        return names
+
+    def _reserve(self, block_size):
+        with transaction.atomic():
+            sequence, _ = models.NameSequence.objects.select_for_update().get_or_create(
+                prefix=self.prefix
+            )
+            start = sequence.next_value
+            if start + block_size > self.size:
+                raise exceptions.APIException(detail=f"No {self.prefix} names are left.")
+            sequence.next_value = start + block_size
+            sequence.save(update_fields=["next_value"])
+        self.values = iter(range(start, start + block_size))
+
+    def _format(self, value):
+        value = (value * self.multiplier + self.offset) % self.size
+        characters = []
+        for _ in range(self.length):
+            value, index = divmod(value, len(NAME_ALPHABET))
+            characters.append(NAME_ALPHABET[index])
+        return self.prefix + "".join(reversed(characters))
+
+
+load_names = NameAllocator(
+    models.Load, "L-", length=6, multiplier=1_235_791_213, offset=493_817_251
+)
+shipment_names = NameAllocator(
+    models.Shipment, "SH-", length=5, multiplier=48_271_043, offset=27_318_209
+)
 
 
 def generate_load_name() -> string:
-    name = "L-" + (
-        "".join(random.choice(string.ascii_uppercase + string.digits) for _ in range(6))
-    )
-    return name
+    return load_names.allocate()[0]
+
+
+def generate_load_names(count):
+    """Returns `count` load names that are not taken yet."""
+    return load_names.allocate(count)
 
 
 def generate_shipment_name() -> string:
-    name = "SH-" + (
-        "".join(random.choice(string.ascii_uppercase + string.digits) for _ in range(5))
-    )
-    return name
+    return shipment_names.allocate()[0]
 
 
 def get_company_by_role(app_user, user_type="user"):
     try:
-        company = None
         if app_user.user_type == "manager":
-            company = auth_models.Company.objects.get(manager=app_user)
-        else:
-            company_employee = auth_models.CompanyEmployee.objects.get(app_user=app_user)
-            company = auth_models.Company.objects.get(id=company_employee.company.id)
-        return company
+            return app_user.company
+        return app_user.companyemployee.company
     except auth_models.CompanyEmployee.DoesNotExist:
         raise exceptions.NotFound(detail=f"{user_type} has no company")
     except BaseException as e:
@@ -101,7 +145,7 @@ def get_company_by_role(app_user, user_type="user"):
 
 def get_user_tax_by_role(app_user, user_type="user"):
     try:
-        return auth_models.UserTax.objects.get(app_user=app_user)
+        return app_user.usertax
     except auth_models.UserTax.DoesNotExist:
         raise exceptions.NotFound(detail=f"{user_type} has no tax information")
     except BaseException as e:
@@ -126,9 +170,9 @@ def get_user_tax_or_company(app_user, user_type="user"):
     )
 
 
-def check_parties_tax_info(customer_username, dispatcher_username):
-    customer_app_user = get_app_user_by_username(customer_username)
-    dispatcher_app_user = get_app_user_by_username(dispatcher_username)
+def check_parties_tax_info(customer_username, dispatcher_username, request=None):
+    customer_app_user = get_app_user_by_username(customer_username, request=request)
+    dispatcher_app_user = get_app_user_by_username(dispatcher_username, request=request)
     get_user_tax_or_company(customer_app_user, user_type="customer")
     get_user_tax_or_company(dispatcher_app_user, user_type="dispatcher")
 
@@ -167,70 +211,539 @@ def extract_billing_info(billing_info, party):
 
 
 def is_app_user_customer_of_load(app_user: auth_models.AppUser, load: models.Load):
-    if load.customer.app_user == app_user:
+    if load.customer.app_user_id == app_user.id:
         return True
     return False
 
 
 def is_app_user_dispatcher_of_load(app_user: auth_models.AppUser, load: models.Load):
-    if load.dispatcher.app_user == app_user:
+    if load.dispatcher.app_user_id == app_user.id:
         return True
     return False
 
 
 def is_app_user_carrier_of_load(app_user: auth_models.AppUser, load: models.Load):
-    if load.carrier.app_user == app_user:
+    if load.carrier.app_user_id == app_user.id:
         return True
     return False
 
 
 def send_notifications_to_load_parties(load: models.Load, action, event=None):
-    notified_usernames = set()
-    roles = ["dispatcher", "shipper", "consignee", "customer"]
-
-    for role in roles:
-        actor = getattr(load, role)
-        app_user = actor.app_user
-        username = app_user.user.username
-
-        if username not in notified_usernames:
-            if event == "load_created" and username == load.created_by.user.username:
-                continue
-            if event == "load_created":
-                handle_notification(
-                    action=action, app_user=app_user, load=load, sender=load.created_by
-                )
-            elif event == "load_status_changed":
-                handle_notification(
-                    action=action, app_user=app_user, load=load, sender=None
-                )
-            notified_usernames.add(username)
+    """Notifies every party of the load once, the creator excepted when the load was just created"""
+    if event not in ["load_created", "load_status_changed"]:
+        return None
+
+    # same order as the roles listed in the notification messages
+    all_roles = ["customer", "shipper", "consignee", "dispatcher", "carrier"]
+    parties = (
+        models.Load.objects.filter(id=load.id)
+        .values(*[f"{role}__app_user" for role in all_roles])
+        .first()
+    )
+    roles = {}
+    for role in all_roles:
+        if parties[f"{role}__app_user"] is not None:
+            roles.setdefault(parties[f"{role}__app_user"], []).append(role)
+
+    recipient_ids = {
+        parties[f"{role}__app_user"] for role in ["dispatcher", "shipper", "consignee", "customer"]
+    }
+    sender = None
+    if event == "load_created":
+        recipient_ids.discard(load.created_by_id)
+        sender = load.created_by
+
+    handle_notifications(
+        auth_models.AppUser.objects.filter(id__in=recipient_ids).select_related("user"),
+        action=action,
+        load=load,
+        sender=sender,
+        roles=roles,
+    )
 
 
-def apply_load_access_filters_for_user(filter_query, app_user: auth_models.AppUser):
-    if app_user.selected_role == "shipment party":
+def get_load_access_role(app_user: auth_models.AppUser):
+    """Returns the party role the app user sees loads as, empty when they only see the loads they created."""
+    accessors = {"shipment party": "shipmentparty", "dispatcher": "dispatcher", "carrier": "carrier"}
+    role = app_user.selected_role
+    if role in accessors and hasattr(app_user, accessors[role]):
+        return role
+    return ""
+
+
+def get_load_access_filter(app_user: auth_models.AppUser):
+    """Filters the loads the app user created or takes part in under their selected role."""
+    roles = ["creator"]
+    role = get_load_access_role(app_user)
+    if role:
+        roles.append(role)
+    participations = models.LoadParticipant.objects.filter(
+        app_user=app_user.id, role__in=roles)
+    return Q(id__in=participations.values("load"))
+
+
+DASHBOARD_STATUSES = {
+    "pending": [
+        "Created",
+        "Awaiting Customer",
+        "Assigning Carrier",
+        "Awaiting Carrier",
+        "Awaiting Dispatcher",
+    ],
+    "ready_for_pick_up": ["Ready For Pickup"],
+    "in_transit": ["In Transit"],
+    "delivered": ["Delivered"],
+    "canceled": ["Canceled"],
+}
+
+# party role => load fields whose app user takes part in the load under that role
+LOAD_PARTY_ROLES = {
+    "shipment party": ["customer__app_user", "shipper__app_user", "consignee__app_user"],
+    "dispatcher": ["dispatcher__app_user"],
+    "carrier": ["carrier__app_user"],
+}
+# loads of at least this weight are counted as heavy haul
+HEAVY_HAUL_WEIGHT = 80000
+LOAD_SNAPSHOT_FIELDS = [
+    "created_at",
+    "created_by",
+    "status",
+    "load_type",
+    "weight",
+    *[field for fields in LOAD_PARTY_ROLES.values() for field in fields],
+]
+LOAD_ROLLUP_KEY = [
+    "app_user_id", "role", "company_id", "year", "month", "status", "load_type", "heavy_haul"
+]
+
+
+def get_dashboard_period(query_params):
+    """Returns the (start, end) dates of the dashboard chart.
+
+    A `start_date`/`end_date` pair (YYYY-MM-DD) takes precedence over `year`; without either the current year is used.
+    """
+    start_date = query_params.get("start_date", None)
+    end_date = query_params.get("end_date", None)
+    if start_date or end_date:
+        if not (start_date and end_date):
+            raise exceptions.ParseError(
+                detail="Both start_date and end_date are required to filter by a date range."
+            )
         try:
-            shipment_party = models.ShipmentParty.objects.get(app_user=app_user.id)
-            filter_query |= (
-                Q(shipper=shipment_party.id)
-                | Q(consignee=shipment_party.id)
-                | Q(customer=shipment_party.id)
+            start = date.fromisoformat(start_date)
+            end = date.fromisoformat(end_date)
+        except ValueError:
+            raise exceptions.ParseError(
+                detail="Dates must be in the YYYY-MM-DD format."
             )
-        except models.ShipmentParty.DoesNotExist:
-            pass
+        if start > end:
+            raise exceptions.ParseError(
+                detail="start_date must not be after end_date."
+            )
+        return start, end
 
-    elif app_user.selected_role == "dispatcher":
-        try:
-            dispatcher = models.Dispatcher.objects.get(app_user=app_user.id)
-            filter_query |= Q(dispatcher=dispatcher.id)
-        except models.Dispatcher.DoesNotExist:
-            pass
-        
-    elif app_user.selected_role == "carrier":
-        try:
-            carrier = models.Carrier.objects.get(app_user=app_user.id)
-            filter_query |= Q(carrier=carrier.id)
-        except models.Carrier.DoesNotExist:
-            pass
+    year = query_params.get("year", datetime.now().year)
+    try:
+        year = int(year)
+        return date(year, 1, 1), date(year, 12, 31)
+    except (ValueError, OverflowError):
+        raise exceptions.ParseError(detail="Please enter a valid year.")
+
+
+def is_whole_months_period(start, end):
+    # the last day of the month is looked up, adding a day to 9999-12-31 overflows
+    return start.day == 1 and end.day == calendar.monthrange(end.year, end.month)[1]
+
+
+def build_dashboard_chart(months, start, end):
+    """Lays out the monthly counts of the period, `months` mapping (year, month) to the counts of that month."""
+    month_format = "%b" if start.year == end.year else "%b %Y"
+    keys = ["total", *DASHBOARD_STATUSES]
+    chart = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        counts = months.get((year, month), {})
+        obj = {"name": date(year, month, 1).strftime(month_format)}
+        for key in keys:
+            obj[key] = counts.get(key, 0)
+        chart.append(obj)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return chart
+
+
+def get_dashboard_stats(loads, start, end):
+    """Builds the dashboard cards and monthly chart of the loads using a single grouped query.
+
+    The cards count every load while the chart only counts the loads created between start and end.
+    Returns None when there are no loads at all.
+    """
+    if loads.query.distinct:
+        # grouping a distinct queryset would count its joined duplicates
+        loads = models.Load.objects.filter(id__in=loads.order_by().values("id"))
+
+    in_period = Q(created_at__date__gte=start, created_at__date__lte=end)
+    aggregates = {
+        "total": Count("id"),
+        "period_total": Count("id", filter=in_period),
+    }
+    for key, statuses in DASHBOARD_STATUSES.items():
+        aggregates[key] = Count("id", filter=Q(status__in=statuses))
+        aggregates["period_" + key] = Count(
+            "id", filter=Q(status__in=statuses) & in_period)
+
+    rows = (
+        loads.order_by()
+        .annotate(month=TruncMonth("created_at"))
+        .values("month")
+        .annotate(**aggregates)
+    )
+
+    keys = ["total", *DASHBOARD_STATUSES]
+    cards = dict.fromkeys(keys, 0)
+    months = {}
+    for row in rows:
+        for key in keys:
+            cards[key] += row[key]
+        months[(row["month"].year, row["month"].month)] = {
+            key: row["period_" + key] for key in keys
+        }
+
+    if cards["total"] == 0:
+        return None
+
+    return {"cards": cards, "chart": build_dashboard_chart(months, start, end)}
 
-    return filter_query
+
+def get_dashboard_stats_from_rollup(rollups, start, end):
+    """Same as get_dashboard_stats but reads the rollup rows of one app user role or company.
+
+    The rollup is kept per month, so the period has to cover whole months.
+    """
+    rows = (
+        rollups.filter(count__gt=0)
+        .values("year", "month", "status")
+        .annotate(count=Sum("count"))
+        .order_by()
+    )
+    card_of_status = {
+        status: key for key, statuses in DASHBOARD_STATUSES.items() for status in statuses
+    }
+    cards = dict.fromkeys(["total", *DASHBOARD_STATUSES], 0)
+    months = {}
+    for row in rows:
+        key = card_of_status[row["status"]]
+        cards["total"] += row["count"]
+        cards[key] += row["count"]
+        if start <= date(row["year"], row["month"], 1) <= end:
+            counts = months.setdefault((row["year"], row["month"]), {"total": 0})
+            counts["total"] += row["count"]
+            counts[key] = counts.get(key, 0) + row["count"]
+
+    if cards["total"] == 0:
+        return None
+
+    return {"cards": cards, "chart": build_dashboard_chart(months, start, end)}
+
+
+def get_load_participants(load_row):
+    """Returns the (app user id, role) pairs taking part in the load described by `load_row`."""
+    participants = {(load_row["created_by"], "creator")}
+    for role, fields in LOAD_PARTY_ROLES.items():
+        for field in fields:
+            if load_row[field] is not None:
+                participants.add((load_row[field], role))
+    return participants
+
+
+def get_load_rollup_keys(load_row, employers):
+    """Returns the rollup rows a load counts towards.
+
+    `load_row` holds the LOAD_SNAPSHOT_FIELDS of the load and `employers` maps app user ids to their company id.
+    """
+    created_at = timezone.localtime(load_row["created_at"])
+    bucket = (
+        created_at.year,
+        created_at.month,
+        load_row["status"],
+        load_row["load_type"],
+        load_row["weight"] >= HEAVY_HAUL_WEIGHT,
+    )
+
+    participants = get_load_participants(load_row)
+    # the creator sees the load whatever role they selected
+    views = {(load_row["created_by"], role) for role in ["", *LOAD_PARTY_ROLES]}
+    views.update(
+        (app_user, role) for app_user, role in participants if role != "creator"
+    )
+
+    companies = {
+        employers[app_user] for app_user, _ in participants if app_user in employers
+    }
+    keys = {(app_user, role, None, *bucket) for app_user, role in views}
+    keys.update((None, "", company, *bucket) for company in companies)
+    return keys
+
+
+def get_load_snapshot(load_id, lock=False):
+    """Returns the LOAD_SNAPSHOT_FIELDS of the load and the employers of its participants, None if it does not exist."""
+    loads = models.Load.objects.filter(id=load_id)
+    if lock:
+        loads = loads.select_for_update(of=("self",))
+    load_row = loads.values(*LOAD_SNAPSHOT_FIELDS).first()
+    if load_row is None:
+        return None
+
+    return {"row": load_row, "employers": get_load_rows_employers([load_row])}
+
+
+def get_load_rows_employers(load_rows):
+    """Maps the app users taking part in the loads to the id of the company employing them."""
+    app_users = {
+        app_user for load_row in load_rows for app_user, _ in get_load_participants(load_row)
+    }
+    return dict(
+        auth_models.CompanyEmployee.objects.filter(app_user__in=app_users).values_list(
+            "app_user", "company"
+        )
+    )
+
+
+def _filter_rollup_keys(keys):
+    query = Q()
+    for key in keys:
+        query |= Q(**dict(zip(LOAD_ROLLUP_KEY, key)))
+    return models.LoadStatusRollup.objects.filter(query)
+
+
+def apply_load_status_rollup_deltas(deltas):
+    """Adds each delta to its rollup row, creating the rows that do not exist yet."""
+    added = [key for key, delta in deltas.items() if delta > 0]
+    if added:
+        models.LoadStatusRollup.objects.bulk_create(
+            [models.LoadStatusRollup(**dict(zip(LOAD_ROLLUP_KEY, key))) for key in added],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+    keys_by_delta = {}
+    for key, delta in deltas.items():
+        if delta:
+            keys_by_delta.setdefault(delta, []).append(key)
+    for delta, keys in keys_by_delta.items():
+        for i in range(0, len(keys), 100):
+            _filter_rollup_keys(keys[i:i + 100]).update(count=F("count") + delta)
+
+
+def update_load_status_rollup(previous_keys, keys):
+    """Moves a load from the rollup rows it used to count towards to its current ones."""
+    deltas = Counter(keys)
+    deltas.subtract(previous_keys)
+    apply_load_status_rollup_deltas(deltas)
+
+
+def update_load_participants(load_id, previous_participants, participants):
+    removed = previous_participants - participants
+    added = participants - previous_participants
+    if removed:
+        query = Q()
+        for app_user, role in removed:
+            query |= Q(app_user=app_user, role=role)
+        models.LoadParticipant.objects.filter(query, load=load_id).delete()
+    if added:
+        models.LoadParticipant.objects.bulk_create(
+            [
+                models.LoadParticipant(load_id=load_id, app_user_id=app_user, role=role)
+                for app_user, role in added
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def update_load_derived_rows(load_id, previous, current):
+    """Brings the status rollup and participants of a load from its `previous` snapshot to its `current` one."""
+    rollup_keys = [set(), set()]
+    participants = [set(), set()]
+    for i, snapshot in enumerate([previous, current]):
+        if snapshot is not None:
+            rollup_keys[i] = get_load_rollup_keys(snapshot["row"], snapshot["employers"])
+            participants[i] = get_load_participants(snapshot["row"])
+    update_load_status_rollup(*rollup_keys)
+    update_load_participants(load_id, *participants)
+
+
+def save_load(load, **kwargs):
+    """Saves the load and updates its status rollup and participants in the same transaction."""
+    with transaction.atomic():
+        previous = None
+        if load.pk is not None:
+            previous = get_load_snapshot(load.pk, lock=True)
+        load.save(**kwargs)
+        update_load_derived_rows(load.pk, previous, get_load_snapshot(load.pk))
+
+
+def record_created_loads(load_rows):
+    """Adds the participants and rollup counts of bulk created loads, each row holding the id and LOAD_SNAPSHOT_FIELDS."""
+    employers = get_load_rows_employers(load_rows)
+    deltas = Counter()
+    participants = []
+    for load_row in load_rows:
+        deltas.update(get_load_rollup_keys(load_row, employers))
+        participants += [
+            models.LoadParticipant(load_id=load_row["id"], app_user_id=app_user, role=role)
+            for app_user, role in get_load_participants(load_row)
+        ]
+    models.LoadParticipant.objects.bulk_create(participants, batch_size=1000)
+    apply_load_status_rollup_deltas(deltas)
+
+
+def get_load_snapshot_row(load):
+    """Returns the id and LOAD_SNAPSHOT_FIELDS of a load whose parties are already loaded."""
+    load_row = {
+        "id": load.id,
+        "created_at": load.created_at,
+        "created_by": load.created_by_id,
+        "status": load.status,
+        "load_type": load.load_type,
+        "weight": load.weight,
+    }
+    for fields in LOAD_PARTY_ROLES.values():
+        for field in fields:
+            party = getattr(load, field.split("__")[0])
+            load_row[field] = party.app_user_id if party is not None else None
+    return load_row
+
+
+def count_load_status_rollup(loads=None, batch_size=2000):
+    """Counts the rollup rows of the loads from scratch, reading the employers of each batch's participants."""
+    if loads is None:
+        loads = models.Load.objects.all()
+    load_rows = loads.values(*LOAD_SNAPSHOT_FIELDS).iterator(chunk_size=batch_size)
+    counts = Counter()
+    for batch in iter(lambda: list(itertools.islice(load_rows, batch_size)), []):
+        employers = get_load_rows_employers(batch)
+        for load_row in batch:
+            counts.update(get_load_rollup_keys(load_row, employers))
+    return counts
+
+
+def rebuild_load_status_rollup():
+    """Counts every rollup row again, the loads saved meanwhile apply their deltas on top of the new rows."""
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # the deltas of the loads saved during the count wait for the commit instead of being wiped
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {models.LoadStatusRollup._meta.db_table} IN SHARE ROW EXCLUSIVE MODE"
+                )
+        counts = count_load_status_rollup()
+        models.LoadStatusRollup.objects.all().delete()
+        models.LoadStatusRollup.objects.bulk_create(
+            [
+                models.LoadStatusRollup(**dict(zip(LOAD_ROLLUP_KEY, key)), count=count)
+                for key, count in counts.items()
+            ],
+            batch_size=2000,
+        )
+    return len(counts)
+
+
+def move_employees_load_status_rollup(companies):
+    """Moves the loads of app users who joined, left or changed company between the rows of their companies.
+
+    `companies` maps the app user ids to their (previous company id, company id), None when not employed.
+    The loads are locked like in save_load, so a load saved meanwhile is moved from its current rows.
+    """
+    companies = {
+        app_user: (previous_company, company)
+        for app_user, (previous_company, company) in companies.items()
+        if previous_company != company
+    }
+    if not companies:
+        return
+    with transaction.atomic():
+        participations = models.LoadParticipant.objects.filter(app_user__in=companies)
+        load_rows = list(
+            models.Load.objects.filter(id__in=participations.values("load"))
+            .select_for_update(of=("self",))
+            .order_by("id")
+            .values(*LOAD_SNAPSHOT_FIELDS)
+        )
+        employers = get_load_rows_employers(load_rows)
+        previous_employers = dict(employers)
+        for app_user, (previous_company, company) in companies.items():
+            for app_user_employers, company_id in [
+                (previous_employers, previous_company),
+                (employers, company),
+            ]:
+                app_user_employers.pop(app_user, None)
+                if company_id is not None:
+                    app_user_employers[app_user] = company_id
+
+        deltas = Counter()
+        for load_row in load_rows:
+            deltas.update(get_load_rollup_keys(load_row, employers))
+            deltas.subtract(get_load_rollup_keys(load_row, previous_employers))
+        apply_load_status_rollup_deltas(deltas)
+
+
+def backfill_load_participants(batch_size=2000):
+    """Adds the missing participants of every load and drops the ones that no longer take part in it."""
+    created = 0
+    loads = models.Load.objects.values("id", *LOAD_SNAPSHOT_FIELDS).order_by("id")
+    last_id = 0
+    while True:
+        load_rows = list(loads.filter(id__gt=last_id)[:batch_size])
+        if not load_rows:
+            return created
+        last_id = load_rows[-1]["id"]
+        existing = {}
+        for load, app_user, role in models.LoadParticipant.objects.filter(
+            load__in=[load_row["id"] for load_row in load_rows]
+        ).values_list("load", "app_user", "role"):
+            existing.setdefault(load, set()).add((app_user, role))
+        with transaction.atomic():
+            for load_row in load_rows:
+                participants = get_load_participants(load_row)
+                previous_participants = existing.get(load_row["id"], set())
+                created += len(participants - previous_participants)
+                update_load_participants(
+                    load_row["id"], previous_participants, participants)
+
+
+BULK_LOAD_MAX_ROWS = 10000
+
+
+def read_bulk_load_rows(uploaded_file):
+    """Reads a CSV (with a header line) or JSONL upload into one dict per load.
+
+    A JSONL line that is not an object is returned as a ParseError so it gets reported with its row.
+    """
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    try:
+        content = uploaded_file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise exceptions.ParseError(detail="The file must be UTF-8 encoded.")
+
+    if extension == ".csv":
+        rows = list(csv.DictReader(io.StringIO(content)))
+    elif extension in [".jsonl", ".ndjson"]:
+        rows = []
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                row = exceptions.ParseError(detail="This line is not a valid JSON object.")
+            rows.append(row)
+    else:
+        raise exceptions.ParseError(detail="Only .csv and .jsonl files are supported.")
+
+    if not rows:
+        raise exceptions.ParseError(detail="The file does not contain any load.")
+    if len(rows) > BULK_LOAD_MAX_ROWS:
+        raise exceptions.ParseError(
+            detail=f"A file cannot contain more than {BULK_LOAD_MAX_ROWS} loads."
+        )
+    return rows
@@ -8,7 +8,7 @@ import document.models as doc_models
 import shipment.serializers as serializers
 import authentication.permissions as permissions
 import logs.utilities as log_utils
-from authentication.utilities import create_address
+from authentication.utilities import create_address, get_app_users_with_roles
 from notifications.utilities import handle_notification
 from shipment.utilities import send_notifications_to_load_parties
 
@@ -16,7 +16,7 @@ from shipment.utilities import send_notifications_to_load_parties
 from django.db.models import Q
 from django.http import Http404
 from django.http import QueryDict
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.db.models.query import QuerySet
 from django.shortcuts import get_object_or_404
 
@@ -28,7 +28,7 @@ import rest_framework.exceptions as exceptions
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import serializers as drf_serializers
-from rest_framework.pagination import PageNumberPagination
+from freightmonster.pagination import ListPagination
 from rest_framework.mixins import (
     CreateModelMixin,
     UpdateModelMixin,
@@ -55,6 +55,12 @@ ASSIGNING_CARRIER = "Assigning Carrier"
 AWAITING_CUSTOMER = "Awaiting Customer"
 ERR_FIRST_PART = "should either include a `queryset` attribute,"
 ERR_SECOND_PART = "or override the `get_queryset()` method."
+INVALID_DATES = "Invalid pick up or drop off date's, please double check the dates and try again"
+EQUAL_LOCATIONS = "pick up location and drop off location cannot be equal, please double check the locations and try again"
+FACILITY_NOT_FOUND = "No Facility matches the given query."
+PICK_UP_NOT_SHIPPERS = "The pickup location you are trying to use does not belong to the shipper."
+DESTINATION_NOT_CONSIGNEES = "The destination you are trying to use does not belong to the consignee."
+NO_MUTUAL_CONTACT = "You do not share mutual contact(s) with one or more of the users you are attempting to add to this load."
 
 
 class FacilityView(
@@ -264,12 +270,14 @@ class FacilityView(
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
 
-        log_utils.handle_log(
-            user=self.request.user,
+        log_utils.record_log(
+            permissions.get_request_app_user(self.request),
             action="Create",
             model="Facility",
-            details=serializer.data,
-            log_fields=["id", "building_name"]
+            new={
+                "id": serializer.data["id"],
+                "building_name": serializer.data["building_name"],
+            },
         )
 
         return Response(
@@ -436,66 +444,81 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         if isinstance(request.data, QueryDict):
             request.data._mutable = True
 
-        app_user = models.AppUser.objects.get(user=request.user)
+        app_user = permissions.get_request_app_user(request)
         request.data["created_by"] = str(app_user.id)
         request.data["name"] = utils.generate_load_name()
 
         self._check_for_any_missing_load_parties(request)
+        all_parties = ["shipper", "consignee", "customer", "dispatcher"]
+        # one query resolves every party, the checks below read them from the request memo
+        get_app_users_with_roles(
+            [request.data[party] for party in all_parties], request=request
+        )
         self._check_facility_belongs_to_shipment_parties(
+            request=request,
             pick_up_location_id=request.data["pick_up_location"],
             destination_id=request.data["destination"],
             shipper_username=request.data["shipper"],
             consignee_username=request.data["consignee"],
         )
 
-        all_parties = ["shipper", "consignee", "customer", "dispatcher"]
-        for party in all_parties:
-            self._check_mutual_contact(request.user.id, request.data[party])
+        self._check_mutual_contacts(
+            request, [request.data[party] for party in all_parties]
+        )
 
         utils.check_parties_tax_info(
             customer_username=request.data["customer"],
             dispatcher_username=request.data["dispatcher"],
+            request=request,
         )
 
         required_fields = ["shipper", "consignee", "customer"]
         for field in required_fields:
             party = utils.get_shipment_party_by_username(
-                username=request.data[field])
+                username=request.data[field], request=request)
             request.data[field] = str(party.id)
 
         dispatcher = utils.get_dispatcher_by_username(
-            username=request.data["dispatcher"]
+            username=request.data["dispatcher"], request=request
         )
         request.data["dispatcher"] = str(dispatcher.id)
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        while True:
-            try:
-                self.perform_create(serializer)
-                break
-            except IntegrityError as e:
-                request.data["name"] = utils.generate_load_name()
-                if "name" in str(e.__cause__):
-                    continue
-                else:
-                    print(f"Unexpected {e=}, {type(e)=}")
-                    return self._handle_exception_errors(e)
+        try:
+            self.perform_create(serializer)
+        except IntegrityError as e:
+            print(f"Unexpected {e=}, {type(e)=}")
+            return self._handle_exception_errors(e)
 
         headers = self.get_success_headers(serializer.data)
 
-        log_utils.handle_log(
-            user=self.request.user,
+        log_utils.record_log(
+            permissions.get_request_app_user(self.request),
             action="Create",
             model="Load",
-            details=serializer.data,
-            log_fields=["id", "name"]
+            new={"id": serializer.data["id"], "name": serializer.data["name"]},
         )
 
         return Response(
             serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
 
+    # override
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            load = serializer.save()
+            utils.update_load_derived_rows(
+                load.id, None, utils.get_load_snapshot(load.id))
+
+    # override
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            previous = utils.get_load_snapshot(serializer.instance.id, lock=True)
+            load = serializer.save()
+            utils.update_load_derived_rows(
+                load.id, previous, utils.get_load_snapshot(load.id))
+
     # override
     def update(self, request, *args, **kwargs):
         if isinstance(request.data, QueryDict):
@@ -518,18 +541,16 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             )
 
     def _update_created_load(self, request, instance, kwargs):
-        original_instance, original_request = log_utils.get_original_instance_and_original_request(
-            request, instance)
-
         all_parties = ["shipper", "consignee", "customer", "dispatcher"]
-        for party in all_parties:
-            self._check_mutual_contact(request.user.id, request.data[party])
+        usernames = [request.data[party] for party in all_parties]
+        get_app_users_with_roles(usernames, request=request)
+        self._check_mutual_contacts(request, usernames)
         party_types = ["customer", "shipper", "consignee"]
         request = self._handle_shipment_parties(request, party_types)
 
         if "dispatcher" in request.data:
             dispatcher = utils.get_dispatcher_by_username(
-                username=request.data["dispatcher"]
+                username=request.data["dispatcher"], request=request
             )
             request.data["dispatcher"] = str(dispatcher.id)
 
@@ -539,9 +560,9 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         serializer.is_valid(raise_exception=True)
 
         # check that the user requesting to update the load is the one who created it
-        user = models.AppUser.objects.get(user=self.request.user.id)
+        user = permissions.get_request_app_user(request)
 
-        if instance.created_by == user:
+        if instance.created_by_id == user.id:
             self.perform_update(serializer)
 
         else:
@@ -559,14 +580,10 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             # forcibly invalidate the prefetch cache on the instance.
             instance._prefetched_objects_cache = {}
 
-        self._handle_update_log(request_data=original_request,
-                                original_instance=original_instance)
+        self._handle_update_log(instance)
         return Response(serializer.data)
 
     def _update_assigning_carrier_load(self, request, instance, kwargs):
-        original_instance, original_request = log_utils.get_original_instance_and_original_request(
-            request, instance)
-
         if "carrier" not in request.data:
             return Response(
                 [
@@ -585,7 +602,7 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        self._check_mutual_contact(request.user.id, request.data["carrier"])
+        self._check_mutual_contacts(request, [request.data["carrier"]])
 
         editor = utils.get_dispatcher_by_username(
             username=request.user.username)
@@ -624,20 +641,19 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             # If 'prefetch_related' has been applied to a queryset, we need to
             # forcibly invalidate the prefetch cache on the instance.
             instance._prefetched_objects_cache = {}
-        self._handle_update_log(request_data=original_request,
-                                original_instance=original_instance)
+        self._handle_update_log(instance)
         return Response(serializer.data)
 
     def _handle_shipment_parties(self, request, party_types):
         for party_type in party_types:
             if party_type in request.data:
                 party = utils.get_shipment_party_by_username(
-                    username=request.data[party_type]
+                    username=request.data[party_type], request=request
                 )
 
                 if party_type == "customer":
                     app_user = utils.get_app_user_by_username(
-                        username=request.data[party_type]
+                        username=request.data[party_type], request=request
                     )
                     utils.get_user_tax_or_company(app_user=app_user)
                     request.data[party_type] = str(party.id)
@@ -662,9 +678,7 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         if "delivery_date_check" in str(e.__cause__):
             return Response(
                 {
-                    "detail": [
-                        "Invalid pick up or drop off date's, please double check the dates and try again"
-                    ]
+                    "detail": [INVALID_DATES]
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
@@ -672,9 +686,7 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         elif "pick up location" in str(e.__cause__):
             return Response(
                 {
-                    "detail": [
-                        "pick up location and drop off location cannot be equal, please double check the locations and try again"
-                    ]
+                    "detail": [EQUAL_LOCATIONS]
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
@@ -685,66 +697,291 @@ class LoadView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         )
 
     def _check_facility_belongs_to_shipment_parties(
-        self, pick_up_location_id, destination_id, shipper_username, consignee_username
+        self, request, pick_up_location_id, destination_id, shipper_username, consignee_username
     ):
-        pick_up_location = get_object_or_404(
-            models.Facility, id=pick_up_location_id)
+        facilities = models.Facility.objects.in_bulk(
+            [pick_up_location_id, destination_id])
+
+        pick_up_location = facilities.get(int(pick_up_location_id))
+        if pick_up_location is None:
+            raise Http404(FACILITY_NOT_FOUND)
 
         shipper_app_user = utils.get_app_user_by_username(
-            username=shipper_username)
+            username=shipper_username, request=request)
 
-        if pick_up_location.owner != shipper_app_user.user:
+        if pick_up_location.owner_id != shipper_app_user.user_id:
             raise exceptions.PermissionDenied(
-                detail="The pickup location you are trying to use does not belong to the shipper."
+                detail=PICK_UP_NOT_SHIPPERS
             )
 
-        destination = get_object_or_404(models.Facility, id=destination_id)
+        destination = facilities.get(int(destination_id))
+        if destination is None:
+            raise Http404(FACILITY_NOT_FOUND)
         consignee_app_user = utils.get_app_user_by_username(
-            username=consignee_username)
+            username=consignee_username, request=request)
 
-        if destination.owner != consignee_app_user.user:
+        if destination.owner_id != consignee_app_user.user_id:
             raise exceptions.PermissionDenied(
-                detail="The destination you are trying to use does not belong to the consignee."
+                detail=DESTINATION_NOT_CONSIGNEES
             )
 
         return None
 
-    def _check_mutual_contact(self, origin_id, contact_username):
-        contact_app_user = utils.get_app_user_by_username(
-            username=contact_username)
+    def _check_mutual_contacts(self, request, contact_usernames):
+        contact_app_users = [
+            utils.get_app_user_by_username(username=username, request=request)
+            for username in contact_usernames
+        ]
         # if you are adding yourself then we would not need to check for mutual contact
-        if contact_app_user.user.id == origin_id:
+        contact_ids = {
+            app_user.id
+            for app_user in contact_app_users
+            if app_user.user_id != request.user.id
+        }
+        if not contact_ids:
             return None
-        try:
-            get_object_or_404(
-                models.Contact, origin=origin_id, contact=contact_app_user.id
-            )
-        except Http404:
-            raise exceptions.NotFound(
-                "You do not share mutual contact(s) with one or more of the users you are attempting to add to this load."
-            )
+        mutual_contact_ids = set(
+            models.Contact.objects.filter(
+                origin=request.user.id, contact__in=contact_ids
+            ).values_list("contact", flat=True)
+        )
+        if contact_ids - mutual_contact_ids:
+            raise exceptions.NotFound(NO_MUTUAL_CONTACT)
         return True
 
-    def _handle_update_log(self, request_data, original_instance):
-        updated_fields = []
-        for field in request_data:
-            if field == "action":
-                continue
-            updated_fields.append(field)
-        details = {}
-        details["old"] = {}
-        details["new"] = {}
-        for field in updated_fields:
-            details["old"][field] = original_instance[field]
-            details["new"][field] = request_data[field]
-        log_utils.handle_log(
-            user=self.request.user,
+    def _handle_update_log(self, instance):
+        old, new = instance.saved_changes
+        log_utils.record_log(
+            permissions.get_request_app_user(self.request),
             action="Update",
             model="Load",
-            details=details,
-            log_fields=updated_fields,
+            # the id is logged like in the other entries, so the entries of a record are found by it
+            new={"id": instance.id, **new},
+            old=old,
+        )
+
+
+class BulkLoadView(APIView):
+    permission_classes = [
+        IsAuthenticated,
+        permissions.IsShipmentPartyOrDispatcher,
+    ]
+    all_parties = ["shipper", "consignee", "customer", "dispatcher"]
+
+    @extend_schema(
+        request={
+            "multipart/form-data": inline_serializer(
+                name="BulkLoadCreate",
+                fields={
+                    "shipment": drf_serializers.IntegerField(),
+                    "file": drf_serializers.FileField(),
+                },
+            )
+        },
+        responses={
+            201: inline_serializer(
+                name="BulkLoadReport",
+                fields={
+                    "created": drf_serializers.IntegerField(),
+                    "failed": drf_serializers.IntegerField(),
+                    "rows": drf_serializers.ListField(child=drf_serializers.DictField()),
+                },
+            )
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        """
+        Create many Loads at once
+
+            Upload a **CSV** file with a header line, or a **JSONL** file with one object per line, holding the loads of a
+            **Shipment**. Each row takes the same fields as a single load, parties are given by username and facilities
+            by id. Valid rows are created and the others are reported back with their errors.
+
+            **Example**
+                >>> shipment: 1
+                >>> file: loads.csv
+        """
+        if "shipment" not in request.data or "file" not in request.data:
+            raise exceptions.ParseError(detail="shipment and file are required.")
+
+        shipment = get_object_or_404(models.Shipment, id=request.data["shipment"])
+        rows = utils.read_bulk_load_rows(request.data["file"])
+        app_user = permissions.get_request_app_user(request)
+
+        # resolve every user, facility and contact of the file upfront, the rows are then checked without queries
+        get_app_users_with_roles(
+            {
+                str(row[party]).strip()
+                for row in rows
+                if isinstance(row, dict)
+                for party in self.all_parties
+                if row.get(party)
+            },
+            request=request,
+        )
+        facility_ids = {
+            self._parse_facility_id(row.get(location))
+            for row in rows
+            if isinstance(row, dict)
+            for location in ["pick_up_location", "destination"]
+        }
+        facility_ids.discard(None)
+        facilities = models.Facility.objects.in_bulk(facility_ids)
+        contact_ids = set(
+            models.Contact.objects.filter(origin=request.user.id).values_list(
+                "contact", flat=True
+            )
+        )
+        checked_tax_info = set()
+
+        report = [None] * len(rows)
+        loads = []
+        for index, row in enumerate(rows):
+            try:
+                load = self._build_load(
+                    request, row, shipment, app_user, facilities, contact_ids, checked_tax_info
+                )
+                loads.append((index, load))
+            except exceptions.APIException as e:
+                report[index] = {"row": index + 1, "status": "error", "details": e.detail}
+
+        if loads:
+            self._create_loads([load for _, load in loads])
+            for index, load in loads:
+                report[index] = {
+                    "row": index + 1,
+                    "status": "created",
+                    "id": load.id,
+                    "name": load.name,
+                }
+            self._notify_load_parties(app_user, shipment, [load for _, load in loads])
+            log_utils.record_log(
+                app_user,
+                action="Create",
+                model="Load",
+                new={"shipment": shipment.id, "loads": [load.name for _, load in loads]},
+            )
+
+        return Response(
+            {"created": len(loads), "failed": len(rows) - len(loads), "rows": report},
+            status=status.HTTP_201_CREATED if loads else status.HTTP_400_BAD_REQUEST,
+        )
+
+    def _build_load(self, request, row, shipment, app_user, facilities, contact_ids, checked_tax_info):
+        if isinstance(row, exceptions.APIException):
+            raise row
+
+        missing_fields = [
+            field
+            for field in ["dispatcher", "customer", "shipper", "consignee", "pick_up_location", "destination"]
+            if not str(row.get(field) or "").strip()
+        ]
+        if missing_fields:
+            raise exceptions.ParseError(
+                detail=[f"{field} is required." for field in missing_fields]
+            )
+        usernames = {party: str(row[party]).strip() for party in self.all_parties}
+
+        pick_up_location = self._get_facility(facilities, row["pick_up_location"])
+        shipper_app_user = utils.get_app_user_by_username(
+            username=usernames["shipper"], request=request)
+        if pick_up_location.owner_id != shipper_app_user.user_id:
+            raise exceptions.PermissionDenied(detail=PICK_UP_NOT_SHIPPERS)
+
+        destination = self._get_facility(facilities, row["destination"])
+        consignee_app_user = utils.get_app_user_by_username(
+            username=usernames["consignee"], request=request)
+        if destination.owner_id != consignee_app_user.user_id:
+            raise exceptions.PermissionDenied(detail=DESTINATION_NOT_CONSIGNEES)
+
+        for username in usernames.values():
+            contact = utils.get_app_user_by_username(username=username, request=request)
+            # if you are adding yourself then we would not need to check for mutual contact
+            if contact.user_id != request.user.id and contact.id not in contact_ids:
+                raise exceptions.NotFound(NO_MUTUAL_CONTACT)
+
+        for user_type in ["customer", "dispatcher"]:
+            if (usernames[user_type], user_type) not in checked_tax_info:
+                utils.get_user_tax_or_company(
+                    utils.get_app_user_by_username(
+                        username=usernames[user_type], request=request),
+                    user_type=user_type,
+                )
+                checked_tax_info.add((usernames[user_type], user_type))
+
+        parties = {
+            party: utils.get_shipment_party_by_username(
+                username=usernames[party], request=request)
+            for party in ["shipper", "consignee", "customer"]
+        }
+        parties["dispatcher"] = utils.get_dispatcher_by_username(
+            username=usernames["dispatcher"], request=request
         )
 
+        serializer = serializers.LoadBulkRowSerializer(
+            data={
+                field: value
+                for field, value in row.items()
+                if field in serializers.LoadBulkRowSerializer.Meta.fields
+                and value not in ["", None]
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+
+        if pick_up_location.id == destination.id:
+            raise exceptions.ParseError(detail=EQUAL_LOCATIONS)
+        if serializer.validated_data["delivery_date"] <= serializer.validated_data["pick_up_date"]:
+            raise exceptions.ParseError(detail=INVALID_DATES)
+
+        return models.Load(
+            created_by=app_user,
+            shipment=shipment,
+            pick_up_location=pick_up_location,
+            destination=destination,
+            **parties,
+            **serializer.validated_data,
+        )
+
+    def _parse_facility_id(self, facility_id):
+        # isdigit() lets through characters like "²" that int() rejects
+        try:
+            return int(str(facility_id or "").strip())
+        except ValueError:
+            return None
+
+    def _get_facility(self, facilities, facility_id):
+        facility = facilities.get(self._parse_facility_id(facility_id))
+        if facility is None:
+            raise exceptions.NotFound(detail=FACILITY_NOT_FOUND)
+        return facility
+
+    def _create_loads(self, loads):
+        for load, name in zip(loads, utils.generate_load_names(len(loads))):
+            load.name = name
+        with transaction.atomic():
+            models.Load.objects.bulk_create(loads, batch_size=1000)
+            utils.record_created_loads(
+                [utils.get_load_snapshot_row(load) for load in loads]
+            )
+        return loads
+
+    def _notify_load_parties(self, sender, shipment, loads):
+        recipients = {}
+        for load in loads:
+            for party in self.all_parties:
+                app_user = getattr(load, party).app_user
+                if app_user.id != sender.id:
+                    recipients.setdefault(app_user.id, (app_user, {}))[1][load.id] = load
+
+        for app_user, recipient_loads in recipients.values():
+            handle_notification(
+                app_user=app_user,
+                action="add_to_loads",
+                sender=sender,
+                shipment=shipment,
+                loads=list(recipient_loads.values()),
+            )
+
 
 class ListLoadView(GenericAPIView, ListModelMixin):
     permission_classes = [
@@ -776,10 +1013,7 @@ class ListLoadView(GenericAPIView, ListModelMixin):
         )
 
         app_user = models.AppUser.objects.get(user=self.request.user.id)
-        filter_query = Q(created_by=app_user.id)
-
-        filter_query = utils.apply_load_access_filters_for_user(
-            filter_query, app_user)
+        filter_query = utils.get_load_access_filter(app_user)
 
         queryset = (
             queryset.filter(filter_query)
@@ -799,7 +1033,17 @@ class RetrieveLoadView(
         permissions.HasRole,
     ]
     serializer_class = serializers.LoadCreateRetrieveSerializer
-    queryset = models.Load.objects.all()
+    queryset = models.Load.objects.select_related(
+        "created_by__user",
+        "customer__app_user__user",
+        "shipper__app_user__user",
+        "consignee__app_user__user",
+        "dispatcher__app_user__user",
+        "carrier__app_user__user",
+        "pick_up_location__address",
+        "destination__address",
+        "shipment__created_by__user",
+    )
     lookup_field = "id"
 
     @extend_schema(
@@ -818,46 +1062,45 @@ class RetrieveLoadView(
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        shipment = get_object_or_404(models.Shipment, id=instance.shipment.id)
         app_user = utils.get_app_user_by_username(
-            username=request.user.username)
+            username=request.user.username, request=request)
         authorized = False
 
-        if instance.created_by == app_user:
+        if instance.created_by_id == app_user.id:
             authorized = True
 
         elif (
             app_user.selected_role == "dispatcher"
-            and instance.dispatcher
-            == utils.get_dispatcher_by_username(username=request.user.username)
+            and instance.dispatcher_id
+            == utils.get_dispatcher_by_username(
+                username=request.user.username, request=request).id
         ):
             authorized = True
 
         elif (
             app_user.selected_role == "carrier"
-            and instance.carrier
-            == utils.get_carrier_by_username(username=request.user.username)
+            and instance.carrier_id
+            == utils.get_carrier_by_username(
+                username=request.user.username, request=request).id
         ):
             authorized = True
 
         elif app_user.selected_role == SHIPMENT_PARTY:
             shipment_party = utils.get_shipment_party_by_username(
-                username=request.user.username
+                username=request.user.username, request=request
             )
-            if (
-                instance.shipper == shipment_party
-                or instance.consignee == shipment_party
-                or instance.customer == shipment_party
+            if shipment_party.id in (
+                instance.shipper_id,
+                instance.consignee_id,
+                instance.customer_id,
             ):
                 authorized = True
 
-    
-        try:
-            models.ShipmentAdmin.objects.get(
-                shipment=shipment, admin=app_user)
+        if models.ShipmentAdmin.objects.filter(
+            shipment=instance.shipment_id, admin=app_user
+        ).exists():
             authorized = True
-        except models.ShipmentAdmin.DoesNotExist:
-            pass
+
         if authorized:
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
@@ -949,12 +1192,11 @@ class ContactView(GenericAPIView, CreateModelMixin, ListModelMixin):
                 self.perform_create(serializer)
                 headers = self.get_success_headers(serializer.data)
 
-                log_utils.handle_log(
-                    user=self.request.user,
+                log_utils.record_log(
+                    permissions.get_request_app_user(self.request),
                     action="Create",
                     model="Contact",
-                    details=serializer.data,
-                    log_fields=["contact"]
+                    new={"contact": serializer.data["contact"]},
                 )
 
                 return Response(
@@ -1118,31 +1360,26 @@ class ShipmentView(
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        while True:
-            try:
-                self.perform_create(serializer)
-                headers = self.get_success_headers(serializer.data)
+        try:
+            self.perform_create(serializer)
+        except BaseException as e:
+            print(f"Unexpected {e=}, {type(e)=}")
+            return Response(
+                {"detail": [f"{e.args[0]}"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        headers = self.get_success_headers(serializer.data)
 
-                log_utils.handle_log(
-                    user=self.request.user,
-                    action="Create",
-                    model="Shipment",
-                    details=serializer.data,
-                    log_fields=["id", "name"]
-                )
+        log_utils.record_log(
+            permissions.get_request_app_user(self.request),
+            action="Create",
+            model="Shipment",
+            new={"id": serializer.data["id"], "name": serializer.data["name"]},
+        )
 
-                return Response(
-                    serializer.data, status=status.HTTP_201_CREATED, headers=headers
-                )
-            except IntegrityError:
-                request.data["name"] = utils.generate_shipment_name()
-                continue
-            except BaseException as e:
-                print(f"Unexpected {e=}, {type(e)=}")
-                return Response(
-                    {"detail": [f"{e.args[0]}"]},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
 
     # override -- UNCOMPLETED
     def update(self, request, *args, **kwargs):
@@ -1189,7 +1426,7 @@ class ShipmentFilterView(GenericAPIView, ListModelMixin):
         try:
             app_user = models.AppUser.objects.get(user=self.request.user.id)
         except models.AppUser.DoesNotExist:
-            queryset = []
+            queryset = self.queryset.none()
             return queryset
 
         shipments = models.ShipmentAdmin.objects.filter(admin=app_user.id).values_list(
@@ -1444,9 +1681,7 @@ class LoadFilterView(GenericAPIView, ListModelMixin):
                 return self.queryset.none()
 
         if keyword is not None:
-            filters = Q(created_by=app_user.id)
-            filters = utils.apply_load_access_filters_for_user(
-                filters, app_user)
+            filters = utils.get_load_access_filter(app_user)
             filters &= Q(name__icontains=keyword)
 
         queryset = queryset.filter(filters).order_by("-id")
@@ -1471,10 +1706,10 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         if self.kwargs:
             queryset = models.Offer.objects.filter(load=self.kwargs["id"])
             party = utils.get_app_user_by_username(
-                username=request.user.username)
+                username=request.user.username, request=request)
             if party.selected_role == "dispatcher":
                 party = utils.get_dispatcher_by_username(
-                    username=request.user.username)
+                    username=request.user.username, request=request)
                 queryset = queryset.filter(party_1=party.id)
             else:
                 queryset = queryset.filter(party_2=party.id)
@@ -1514,7 +1749,7 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             request.data._mutable = True
 
         dispatcher = utils.get_dispatcher_by_username(
-            username=request.user.username)
+            username=request.user.username, request=request)
         request.data["party_1"] = dispatcher.id
 
         load = models.Load.objects.get(id=request.data["load"])
@@ -1557,9 +1792,11 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
         instance = self.get_object()
-        load = models.Load.objects.get(id=instance.load.id)
+        load = models.Load.objects.select_related(
+            "customer", "dispatcher", "carrier"
+        ).get(id=instance.load_id)
         app_user = utils.get_app_user_by_username(
-            username=request.user.username)
+            username=request.user.username, request=request)
 
         if instance.status != "Pending":
             return Response(
@@ -1581,6 +1818,7 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         )
         is_customer = utils.is_app_user_customer_of_load(
             app_user=app_user, load=load)
+        is_carrier = False
         if load.carrier is not None:
             is_carrier = utils.is_app_user_carrier_of_load(
                 app_user=app_user, load=load)
@@ -1613,14 +1851,12 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
     def _process_accept_action(
         self, request, load: models.Load, instance: models.Offer, partial
     ):
-        original_instance, original_request = log_utils.get_original_instance_and_original_request(
-            request, instance)
         if load.status == AWAITING_CUSTOMER:
             load.status = ASSIGNING_CARRIER
-            load.save()
+            utils.save_load(load)
         elif load.status == AWAITING_CARRIER:
             load.status = READY_FOR_PICKUP
-            load.save()
+            utils.save_load(load)
             self._create_final_agreement(load=load)
             send_notifications_to_load_parties(
                 load=load, action="load_status_changed", event="load_status_changed"
@@ -1628,11 +1864,11 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         elif load.status == AWAITING_DISPATCHER:
             if instance.to == "customer":
                 load.status = ASSIGNING_CARRIER
-                load.save()
+                utils.save_load(load)
 
             elif instance.to == "carrier":
                 load.status = READY_FOR_PICKUP
-                load.save()
+                utils.save_load(load)
                 self._create_final_agreement(load=load)
                 send_notifications_to_load_parties(
                     load=load, action="load_status_changed", event="load_status_changed"
@@ -1662,24 +1898,22 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             # forcibly invalidate the prefetch cache on the instance.
             instance._prefetched_objects_cache = {}
 
-        self._handle_update_log(request_data=original_request,
-                                original_instance=original_instance)
+        self._handle_update_log(instance)
 
         return Response(serializer.data)
 
     def _process_reject_action(
         self, request, load: models.Load, instance: models.Offer, partial
     ):
-        original_instance, original_request = log_utils.get_original_instance_and_original_request(
-            request, instance)
-        user = utils.get_app_user_by_username(username=request.user.username)
+        user = utils.get_app_user_by_username(
+            username=request.user.username, request=request)
         if "carrier" in user.user_type and instance.to == "carrier":
             load.status = ASSIGNING_CARRIER
             load.carrier = None
-            load.save()
+            utils.save_load(load)
         else:
             load.status = "Canceled"
-            load.save()
+            utils.save_load(load)
             send_notifications_to_load_parties(
                 load=load, action="load_status_changed", event="load_status_changed"
             )
@@ -1699,28 +1933,26 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             # forcibly invalidate the prefetch cache on the instance.
             instance._prefetched_objects_cache = {}
 
-        self._handle_update_log(request_data=original_request,
-                                original_instance=original_instance)
+        self._handle_update_log(instance)
 
         return Response(serializer.data)
 
     def _proccess_counter_action(
         self, request, load: models.Load, instance: models.Offer, partial
     ):
-        original_instance, original_request = log_utils.get_original_instance_and_original_request(
-            request, instance)
         if "current" not in request.data:
             return Response(
                 [{"details": "current is required"}],
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        app_user = utils.get_app_user_by_username(request.user.username)
+        app_user = utils.get_app_user_by_username(
+            request.user.username, request=request)
         if (
             SHIPMENT_PARTY in app_user.user_type or "carrier" in app_user.user_type
         ) and (load.status == AWAITING_CUSTOMER or load.status == AWAITING_CARRIER):
             load.status = AWAITING_DISPATCHER
-            load.save()
+            utils.save_load(load)
             handle_notification(
                 app_user=instance.party_1.app_user,
                 load=load,
@@ -1730,10 +1962,10 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
         elif "dispatcher" in app_user.user_type and load.status == AWAITING_DISPATCHER:
             if instance.to == "customer":
                 load.status = AWAITING_CUSTOMER
-                load.save()
+                utils.save_load(load)
             elif instance.to == "carrier":
                 load.status = AWAITING_CARRIER
-                load.save()
+                utils.save_load(load)
             handle_notification(
                 app_user=instance.party_2,
                 load=load,
@@ -1752,8 +1984,7 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             # forcibly invalidate the prefetch cache on the instance.
             instance._prefetched_objects_cache = {}
 
-        self._handle_update_log(request_data=original_request,
-                                original_instance=original_instance)
+        self._handle_update_log(instance)
 
         return Response(serializer.data)
 
@@ -1775,21 +2006,24 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
                 self.perform_create(serializer)
                 headers = self.get_success_headers(serializer.data)
                 load.status = ASSIGNING_CARRIER
-                load.save()
+                utils.save_load(load)
             else:
                 serializer = self.get_serializer(data=request.data)
                 serializer.is_valid(raise_exception=True)
                 self.perform_create(serializer)
                 headers = self.get_success_headers(serializer.data)
                 load.status = AWAITING_CUSTOMER
-                load.save()
+                utils.save_load(load)
 
-            log_utils.handle_log(
-                user=self.request.user,
+            log_utils.record_log(
+                permissions.get_request_app_user(self.request),
                 action="Create",
                 model="Offer",
-                details=serializer.data,
-                log_fields=["id", "to", "initial"]
+                new={
+                    "id": serializer.data["id"],
+                    "to": serializer.data["to"],
+                    "initial": serializer.data["initial"],
+                },
             )
 
             return Response(
@@ -1822,7 +2056,7 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
                 self.perform_create(serializer)
                 headers = self.get_success_headers(serializer.data)
                 load.status = READY_FOR_PICKUP
-                load.save()
+                utils.save_load(load)
                 self_accepting = True
             else:
                 serializer = self.get_serializer(data=request.data)
@@ -1830,16 +2064,19 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
                 self.perform_create(serializer)
                 headers = self.get_success_headers(serializer.data)
                 load.status = AWAITING_CARRIER
-                load.save()
+                utils.save_load(load)
             if self_accepting:
                 self._create_final_agreement(load=load)
 
-            log_utils.handle_log(
-                user=self.request.user,
+            log_utils.record_log(
+                permissions.get_request_app_user(self.request),
                 action="Create",
                 model="Offer",
-                details=serializer.data,
-                log_fields=["id", "to", "initial"]
+                new={
+                    "id": serializer.data["id"],
+                    "to": serializer.data["to"],
+                    "initial": serializer.data["initial"],
+                },
             )
 
             return Response(
@@ -1958,24 +2195,15 @@ class OfferView(GenericAPIView, CreateModelMixin, UpdateModelMixin):
             load_type=load.load_type,
         )
 
-    def _handle_update_log(self, request_data, original_instance):
-        updated_fields = []
-        for field in request_data:
-            if field == "action":
-                continue
-            updated_fields.append(field)
-        details = {}
-        details["old"] = {}
-        details["new"] = {}
-        for field in updated_fields:
-            details["old"][field] = original_instance[field]
-            details["new"][field] = request_data[field]
-        log_utils.handle_log(
-            user=self.request.user,
+    def _handle_update_log(self, instance):
+        old, new = instance.saved_changes
+        log_utils.record_log(
+            permissions.get_request_app_user(self.request),
             action="Update",
             model="Offer",
-            details=details,
-            log_fields=updated_fields,
+            # the id is logged like in the other entries, so the entries of a record are found by it
+            new={"id": instance.id, **new},
+            old=old,
         )
 
 
@@ -2082,12 +2310,11 @@ class ShipmentAdminView(
             self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
 
-            log_utils.handle_log(
-                user=self.request.user,
+            log_utils.record_log(
+                permissions.get_request_app_user(self.request),
                 action="Create",
                 model="Shipment Admin",
-                details=serializer.data,
-                log_fields=["shipment", "admin"]
+                new={"shipment": serializer.data["shipment"], "admin": serializer.data["admin"]},
             )
 
             return Response(
@@ -2110,7 +2337,7 @@ class ShipmentAdminView(
             queryset = models.ShipmentAdmin.objects.filter(
                 shipment=shipment_id)
         else:
-            queryset = []
+            queryset = models.ShipmentAdmin.objects.none()
 
         return queryset
 
@@ -2119,12 +2346,11 @@ class ShipmentAdminView(
         app_user = models.AppUser.objects.get(user=request.user.id)
         if shipment.created_by.id == app_user.id:
             instance = self.get_object()
-            log_utils.handle_log(
-                user=self.request.user,
+            log_utils.record_log(
+                app_user,
                 action="Delete",
                 model="Shipment Admin",
-                details=serializers.ShipmentAdminSerializer(instance).data,
-                log_fields=["id", "shipment", "admin"]
+                new={"id": instance.id, "shipment": instance.shipment_id, "admin": instance.admin_id},
             )
             self.perform_destroy(instance)
             return Response(status=status.HTTP_204_NO_CONTENT)
@@ -2160,17 +2386,16 @@ class DispatcherRejectView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
         load.status = "Canceled"
-        load.save()
+        utils.save_load(load)
         send_notifications_to_load_parties(
             load=load, action="load_status_changed", event="load_status_changed"
         )
 
-        log_utils.handle_log(
-            user=self.request.user,
+        log_utils.record_log(
+            permissions.get_request_app_user(self.request),
             action="Reject",
             model="Load",
-            details=serializers.LoadCreateRetrieveSerializer(load).data,
-            log_fields=["id", "name"]
+            new={"id": load.id, "name": load.name},
         )
 
         return Response({"detail": "load canceled."}, status=status.HTTP_200_OK)
@@ -2214,7 +2439,7 @@ class UpdateLoadStatus(APIView):
                 )
 
             load.status = IN_TRANSIT
-            load.save()
+            utils.save_load(load)
             send_notifications_to_load_parties(
                 load=load, action="load_status_changed", event="load_status_changed"
             )
@@ -2227,7 +2452,7 @@ class UpdateLoadStatus(APIView):
                 )
             load.status = "Delivered"
             load.actual_delivery_date = datetime.now().date()
-            load.save()
+            utils.save_load(load)
             send_notifications_to_load_parties(
                 load=load, action="load_status_changed", event="load_status_changed"
             )
@@ -2238,12 +2463,11 @@ class UpdateLoadStatus(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        log_utils.handle_log(
-            user=self.request.user,
+        log_utils.record_log(
+            permissions.get_request_app_user(self.request),
             action="Update status",
             model="Load",
-            details=serializers.LoadCreateRetrieveSerializer(load).data,
-            log_fields=["id", "name", "status"]
+            new={"id": load.id, "name": load.name, "status": load.status},
         )
 
         return Response(
@@ -2256,6 +2480,26 @@ class DashboardView(APIView):
     permission_classes = [IsAuthenticated, permissions.HasRole]
 
     @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="year",
+                description="year of the monthly chart, defaults to the current year",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="start_date",
+                description="start of the monthly chart's date range (YYYY-MM-DD), overrides year",
+                required=False,
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                name="end_date",
+                description="end of the monthly chart's date range (YYYY-MM-DD), overrides year",
+                required=False,
+                type=OpenApiTypes.DATE,
+            ),
+        ],
         responses={
             200: inline_serializer(
                 name="Dashboard",
@@ -2295,84 +2539,40 @@ class DashboardView(APIView):
     )
     def get(self, request, *args, **kwargs):
         app_user = utils.get_app_user_by_username(
-            username=request.user.username)
-        filter_query = Q(created_by=app_user.id)
-        filter_query = utils.apply_load_access_filters_for_user(
-            filter_query=filter_query, app_user=app_user
-        )
+            username=request.user.username, request=request)
+        filter_query = utils.get_load_access_filter(app_user)
+        start, end = utils.get_dashboard_period(request.query_params)
         loads = models.Load.objects.filter(filter_query)
-        if loads.exists() is False:
+        if utils.is_whole_months_period(start, end):
+            rollups = models.LoadStatusRollup.objects.filter(
+                app_user=app_user, role=utils.get_load_access_role(app_user)
+            )
+            result = utils.get_dashboard_stats_from_rollup(rollups, start, end)
+        else:
+            result = utils.get_dashboard_stats(loads, start, end)
+        if result is None:
             return Response(
                 data={"detail": "No loads found."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        result = {}
-        cards = {}
-        cards["total"] = loads.count()
-        cards["pending"] = loads.filter(
-            status__in=[
-                "Created",
-                AWAITING_CUSTOMER,
-                ASSIGNING_CARRIER,
-                AWAITING_CARRIER,
-                AWAITING_DISPATCHER,
-            ]
-        ).count()
-
-        cards["ready_for_pick_up"] = loads.filter(
-            status=READY_FOR_PICKUP).count()
-        cards["in_transit"] = loads.filter(status=IN_TRANSIT).count()
-        cards["delivered"] = loads.filter(status="Delivered").count()
-        cards["canceled"] = loads.filter(status="Canceled").count()
-
-        loads = loads.order_by("-id")[:3]
-
-        loads = serializers.LoadListSerializer(loads, many=True).data
-        cards["loads"] = loads
-        result["cards"] = cards
-        result["chart"] = []
-
-        year = datetime.now().year
-        loads = models.Load.objects.filter(filter_query)
-        for i in range(1, 13):
-            monthly_loads = loads.filter(
-                created_at__month=i, created_at__year=year)
-            obj = {}
-            obj["name"] = datetime.strptime(str(i), "%m").strftime("%b")
-            if monthly_loads.exists() is False:
-                obj["total"] = 0
-                obj["pending"] = 0
-                obj["ready_for_pick_up"] = 0
-                obj["in_transit"] = 0
-                obj["delivered"] = 0
-                obj["canceled"] = 0
-                result["chart"].append(obj)
-                continue
-            obj["total"] = monthly_loads.count()
-            obj["pending"] = monthly_loads.filter(
-                status__in=[
-                    "Created",
-                    AWAITING_CUSTOMER,
-                    ASSIGNING_CARRIER,
-                    AWAITING_CARRIER,
-                    AWAITING_DISPATCHER,
-                ]
-            ).count()
-
-            obj["ready_for_pick_up"] = monthly_loads.filter(
-                status=READY_FOR_PICKUP
-            ).count()
-            obj["in_transit"] = monthly_loads.filter(status=IN_TRANSIT).count()
-            obj["delivered"] = monthly_loads.filter(status="Delivered").count()
-            obj["canceled"] = monthly_loads.filter(status="Canceled").count()
-            result["chart"].append(obj)
+        loads = loads.select_related(
+            "customer__app_user__user",
+            "shipper__app_user__user",
+            "consignee__app_user__user",
+            "dispatcher__app_user__user",
+            "carrier__app_user__user",
+            "pick_up_location",
+            "destination",
+        ).order_by("-id")[:3]
+        result["cards"]["loads"] = serializers.LoadListSerializer(
+            loads, many=True).data
 
         return Response(data=result, status=status.HTTP_200_OK)
 
 
 class LoadSearchView(APIView):
     permission_classes = [IsAuthenticated, permissions.HasRole]
-    pagination_class = PageNumberPagination
+    pagination_class = ListPagination
 
     @extend_schema(
         parameters=[
@@ -2387,11 +2587,8 @@ class LoadSearchView(APIView):
     )
     def post(self, request, *args, **kwargs):
         app_user = utils.get_app_user_by_username(
-            username=request.user.username)
-        filter_query = Q(created_by=app_user.id)
-        filter_query = utils.apply_load_access_filters_for_user(
-            filter_query=filter_query, app_user=app_user
-        )
+            username=request.user.username, request=request)
+        filter_query = utils.get_load_access_filter(app_user)
         loads = models.Load.objects.filter(filter_query)
         if loads.exists() is False:
             return Response(
@@ -2,4 +2,6 @@
 python manage.py collectstatic
 python manage.py makemigrations --noinput
 python manage.py migrate
+python manage.py deliver_notifications &
+daphne freightmonster.asgi:application --bind 0.0.0.0 --port 8001 &
 gunicorn freightmonster.wsgi:application --bind 0.0.0.0:8000
\ No newline at end of file
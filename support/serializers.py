@@ -98,8 +98,8 @@ class CreateTicketSerializer(serializers.Serializer):
 
         sid_photo.name = sid_photo_name
         personal_photo.name = personal_photo_name
-        utils.upload_to_gcs(sid_photo)
-        utils.upload_to_gcs(personal_photo)
+        utils.upload_file(sid_photo)
+        utils.upload_file(personal_photo)
         validated_data["sid_photo"] = sid_photo_name
         validated_data["personal_photo"] = personal_photo_name
         company_fax_number = ""
@@ -196,10 +196,10 @@ class RetrieveTicketSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep["sid_photo"] = docs_utils.generate_signed_url(
-            instance.sid_photo, bucket_name=GS_COMPANY_MANAGER_BUCKET_NAME
-        )
-        rep["personal_photo"] = docs_utils.generate_signed_url(
-            instance.personal_photo, bucket_name=GS_COMPANY_MANAGER_BUCKET_NAME
+        urls = docs_utils.generate_signed_urls(
+            [instance.sid_photo, instance.personal_photo],
+            bucket_name=GS_COMPANY_MANAGER_BUCKET_NAME,
         )
+        rep["sid_photo"] = urls[instance.sid_photo]
+        rep["personal_photo"] = urls[instance.personal_photo]
         return rep